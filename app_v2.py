@@ -25,6 +25,7 @@ from core.queue_manager import get_queue_manager, Priority
 from core.events import get_event_bus
 from core.history_manager import get_history_manager
 from core.config_manager import get_config_manager
+from core.recognition_result import to_jsonable
 
 # 创建 Flask 应用
 app = Flask(__name__)
@@ -163,7 +164,7 @@ def api_recognize():
         
         return jsonify({
             'success': True,
-            'data': info
+            'data': info.to_dict()
         })
         
     except Exception as e:
@@ -239,7 +240,7 @@ def api_status():
     with status_lock:
         return jsonify({
             'success': True,
-            'data': processing_status.copy()
+            'data': to_jsonable(processing_status.copy())
         })
 
 
@@ -647,7 +648,7 @@ def handle_disconnect():
 def handle_request_progress():
     """客户端请求进度更新"""
     with status_lock:
-        emit('progress_update', processing_status.copy())
+        emit('progress_update', to_jsonable(processing_status.copy()))
 
 
 def emit_progress(current, total, current_file='', message=''):
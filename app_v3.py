@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import datetime
 import threading
 import time
+import atexit
 
 # 导入核心模块
 from core.smart_batch_processor import SmartBatchProcessor
@@ -25,6 +26,10 @@ from core.queue_manager import get_queue_manager, Priority
 from core.events import get_event_bus
 from core.history_manager import get_history_manager
 from core.config_manager import get_config_manager
+from core.recognition_result import to_jsonable
+from core.cache_snapshot import export_snapshot, get_snapshot_path, import_snapshot, load_snapshot_on_start, save_snapshot_on_exit
+from core.metadata_cache import get_metadata_cache
+from core.health_check import HealthCheck, create_health_check_endpoint
 
 # v3.0.0 新增：认证和数据库
 from core.models import db, init_db
@@ -62,6 +67,11 @@ processing_status = {
 }
 status_lock = threading.Lock()
 
+# 健康检查（熔断器断开时服务降级但仍可用，不作为关键检查）
+health_check = HealthCheck('media-renamer-web', '3.0.0')
+health_check.add_check('database', lambda: health_check.check_database(db))
+health_check.add_check('circuit_breakers', health_check.check_circuit_breakers, critical=False)
+
 
 def init_app():
     """初始化应用"""
@@ -96,6 +106,10 @@ def init_app():
     event_bus.on('batch.process.progress', on_batch_progress)
     event_bus.on('batch.process.complete', on_batch_complete)
     
+    # 缓存预热：启动时加载快照，正常退出时保存
+    load_snapshot_on_start([processor.recognizer, recognizer])
+    atexit.register(save_snapshot_on_exit, processor.recognizer)
+    
     print("✓ Web UI v3.0.0 初始化完成")
     print("✓ 数据库已初始化")
     print("✓ 认证系统已启用")
@@ -190,7 +204,7 @@ def api_recognize():
         
         return jsonify({
             'success': True,
-            'data': info
+            'data': info.to_dict()
         })
         
     except Exception as e:
@@ -266,10 +280,16 @@ def api_status():
     with status_lock:
         return jsonify({
             'success': True,
-            'data': processing_status.copy()
+            'data': to_jsonable(processing_status.copy())
         })
 
 
+@app.route('/health')
+def health():
+    """健康检查（包含豆瓣/TMDB 熔断器状态）"""
+    return create_health_check_endpoint(health_check)()
+
+
 @app.route('/api/templates')
 def api_templates():
     """获取模板列表"""
@@ -392,6 +412,55 @@ def api_stats():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """获取元数据缓存统计"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': get_metadata_cache().get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/cache/export', methods=['POST'])
+@admin_required
+def api_cache_export():
+    """导出缓存快照（写入服务器上的快照文件）"""
+    try:
+        path = get_snapshot_path()
+        counts = export_snapshot(path, recognizer=processor.recognizer)
+        
+        return jsonify({
+            'success': True,
+            'data': {'path': path, 'counts': counts}
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/cache/import', methods=['POST'])
+@admin_required
+def api_cache_import():
+    """导入缓存快照（服务器上的快照文件）"""
+    try:
+        path = get_snapshot_path()
+        if not os.path.exists(path):
+            return jsonify({'success': False, 'error': '快照文件不存在'})
+        counts = import_snapshot(path, recognizer=processor.recognizer)
+        
+        return jsonify({
+            'success': True,
+            'data': {'path': path, 'counts': counts}
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/history')
 def api_history_list():
     """获取历史记录列表"""
@@ -674,7 +743,7 @@ def handle_disconnect():
 def handle_request_progress():
     """客户端请求进度更新"""
     with status_lock:
-        emit('progress_update', processing_status.copy())
+        emit('progress_update', to_jsonable(processing_status.copy()))
 
 
 def emit_progress(current, total, current_file='', message=''):
@@ -718,6 +787,11 @@ if __name__ == '__main__':
     # 初始化
     init_app()
     
+    # docker stop 发送 SIGTERM：按正常退出处理，保存缓存快照
+    import signal
+    import sys
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
     # 获取环境配置
     env = get_environment()
     
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""python -m benchmarks.recognizer 入口"""
+
+import sys
+
+from benchmarks.recognizer.run import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别器基准语料生成器
+按固定随机种子生成真实风格的文件名，并给出每个文件名的期望字段
+
+语料分类：
+- western_movie: 欧美 Scene 电影（The.Matrix.1999.1080p.BluRay.x264-SPARKS.mkv）
+- western_tv: 欧美 Scene 剧集（Breaking.Bad.S01E02.720p.WEB-DL.H264-NTb.mkv）
+- chinese_pt: 国内 PT 站命名（流浪地球.2019.2160p.WEB-DL.H265.AAC-HHWEB.mp4）
+- anime_fansub: 字幕组动画（[LoliHouse] Frieren - 05 [1080p][CHS].mkv）
+- chinese_season_episode: 中文季集（狂飙.第1季第3集.1080p.WEB-DL.mp4）
+- mixed_numeral: 中文数字季集（三体.第二季第十二集.2160p.mkv）
+
+另外生成标题查询序列（iter_title_queries），同一作品随机使用不同写法，用于测量缓存键的命中率。
+
+期望字段是生成时的真实值（字段类型与识别结果一致，年份为字符串），不是识别器当前的输出，
+因此准确率可以用来比较不同提交之间识别质量的升降。
+"""
+
+import random
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+# 比较的字段（title 对 IntegratedRecognizer 使用 chinese_title）
+FIELDS = (
+    'title', 'year', 'season', 'episode', 'resolution',
+    'source', 'video_codec', 'audio_codec', 'release_group', 'is_tv',
+)
+
+# 欧美片名 -> 中文片名（离线桩使用的“TMDB/豆瓣”数据）
+WESTERN_MOVIES = {
+    'The Matrix': '黑客帝国',
+    'Inception': '盗梦空间',
+    'Interstellar': '星际穿越',
+    'The Dark Knight': '蝙蝠侠：黑暗骑士',
+    'Fight Club': '搏击俱乐部',
+    'Pulp Fiction': '低俗小说',
+    'Forrest Gump': '阿甘正传',
+    'The Shawshank Redemption': '肖申克的救赎',
+    'Gladiator': '角斗士',
+    'Titanic': '泰坦尼克号',
+    'Avatar': '阿凡达',
+    'Dune': '沙丘',
+    'Oppenheimer': '奥本海默',
+    'Parasite': '寄生虫',
+    'Joker': '小丑',
+    'Blade Runner': '银翼杀手',
+    'Mad Max Fury Road': '疯狂的麦克斯：狂暴之路',
+    'The Godfather': '教父',
+    'Whiplash': '爆裂鼓手',
+    'La La Land': '爱乐之城',
+    'Arrival': '降临',
+    'Heat': '盗火线',
+    'Alien': '异形',
+    'The Prestige': '致命魔术',
+    'Memento': '记忆碎片',
+    'Se7en': '七宗罪',
+    'Zodiac': '十二宫',
+    'Her': '她',
+    'Up': '飞屋环游记',
+    'Coco': '寻梦环游记',
+}
+
+WESTERN_SHOWS = {
+    'Breaking Bad': '绝命毒师',
+    'Game of Thrones': '权力的游戏',
+    'The Wire': '火线',
+    'True Detective': '真探',
+    'Stranger Things': '怪奇物语',
+    'The Crown': '王冠',
+    'Better Call Saul': '风骚律师',
+    'Westworld': '西部世界',
+    'The Mandalorian': '曼达洛人',
+    'Succession': '继承之战',
+    'The Last of Us': '最后生还者',
+    'Severance': '人生切割术',
+    'House of the Dragon': '龙之家族',
+    'The Boys': '黑袍纠察队',
+    'Chernobyl': '切尔诺贝利',
+    'Sherlock': '神探夏洛克',
+    'Friends': '老友记',
+    'The Office': '办公室',
+    'Dark': '暗黑',
+    'Fargo': '冰血暴',
+}
+
+CHINESE_TITLES = (
+    '流浪地球', '狂飙', '繁花', '漫长的季节', '隐秘的角落', '沉默的真相',
+    '庆余年', '琅琊榜', '长安十二时辰', '觉醒年代', '人世间', '山海情',
+    '满江红', '让子弹飞', '霸王别姬', '活着', '大话西游', '无间道',
+    '三体', '一代宗师', '八佰', '我不是药神', '你好李焕英', '消失的她',
+)
+
+ANIME_TITLES = (
+    'Sousou no Frieren', 'Kusuriya no Hitorigoto', 'Jujutsu Kaisen',
+    'Chainsaw Man', 'Bocchi the Rock', 'Oshi no Ko', 'Vinland Saga',
+    'Mushoku Tensei', 'Dungeon Meshi', 'Blue Lock', 'Kaiju No 8',
+    'Spy Family', 'Made in Abyss', 'Mob Psycho', 'Tengoku Daimakyou',
+)
+
+# 写法差异较大的作品：标准写法 -> 其他常见写法（& 与 and、罗马数字、撇号、冒号）
+TITLE_SPELLINGS = {
+    'Fast & Furious': ('Fast and Furious', 'Fast.&.Furious'),
+    'Law & Order': ('Law and Order', 'Law.and.Order'),
+    'Rocky II': ('Rocky 2', 'Rocky.II'),
+    'Star Wars Episode IV': ('Star Wars Episode 4', 'Star.Wars.Episode.IV'),
+    'Final Fantasy VII': ('Final Fantasy 7', 'FINAL FANTASY VII'),
+    "Ocean's Eleven": ('Oceans Eleven', 'Oceans.Eleven'),
+    "Schindler's List": ('Schindlers List', 'Schindlers.List'),
+    'Mission: Impossible': ('Mission Impossible', 'Mission - Impossible'),
+}
+
+# 识别器未剥离、残留在标题末尾的发布标签
+LEFTOVER_TAGS = ('PROPER', 'REPACK', 'EXTENDED', 'REMASTERED', 'UNCUT')
+
+RESOLUTIONS = ('720p', '1080p', '1080p', '1080p', '2160p', '2160p', '480p', '576p')
+SOURCES = ('BluRay', 'BluRay', 'WEB-DL', 'WEB-DL', 'WEBRip', 'HDTV', 'REMUX', 'BDMV', 'DVDRip')
+VIDEO_CODECS = ('x264', 'x265', 'H264', 'H.264', 'H265', 'HEVC', 'AVC', 'AV1')
+AUDIO_CODECS = ('AAC', 'AC3', 'DTS', 'DTS-HD', 'TrueHD', 'FLAC', 'DDP')
+HDR_TAGS = ('HDR10', 'HDR10+', 'DV', 'HLG')
+EXTENSIONS = ('mkv', 'mkv', 'mkv', 'mp4', 'mp4', 'avi', 'ts')
+
+# 欧美 Scene 组（不在内置发布组库中，走 -GROUP 结尾规则）与内置库中的 PT 组
+SCENE_GROUPS = ('SPARKS', 'GECKOS', 'AMIABLE', 'ROVERS', 'DRONES', 'KOGI', 'CAKES', 'SYNCOPY')
+PT_GROUPS = ('CHD', 'CHDWEB', 'HHWEB', 'FRDS', 'OurTV', 'HDSky', 'MTeam', 'PTerWEB', 'ADWeb', 'NTb', 'FLUX')
+FANSUB_GROUPS = ('LoliHouse', 'ANi', 'SweetSub', 'KTXP', 'MingY', '喵萌奶茶屋', '北宇治字幕组', '桜都字幕组')
+FANSUB_LANGS = ('CHS', 'CHT', '简日双语', '繁日双语', '简体内嵌')
+
+CHINESE_DIGIT_NAMES = ('零', '一', '二', '三', '四', '五', '六', '七', '八', '九')
+
+
+def chinese_numeral(value: int) -> str:
+    """1-99 的中文数字写法（十二、二十、三十九）"""
+    tens, ones = divmod(value, 10)
+    if tens == 0:
+        return CHINESE_DIGIT_NAMES[ones]
+    prefix = '' if tens == 1 else CHINESE_DIGIT_NAMES[tens]
+    return prefix + '十' + (CHINESE_DIGIT_NAMES[ones] if ones else '')
+
+
+def _empty_expected() -> Dict[str, Any]:
+    """生成空的期望字段"""
+    expected = {field: None for field in FIELDS}
+    expected['is_tv'] = False
+    expected['chinese_title'] = None
+    return expected
+
+
+def _join(parts: List[str], sep: str) -> str:
+    """用分隔符连接非空片段"""
+    return sep.join(part for part in parts if part)
+
+
+def _pick_tech(rng: random.Random, expected: Dict[str, Any], audio_rate: float = 0.6) -> List[str]:
+    """随机选取分辨率/来源/编码片段并写入期望字段"""
+    expected['resolution'] = rng.choice(RESOLUTIONS)
+    expected['source'] = rng.choice(SOURCES)
+    expected['video_codec'] = rng.choice(VIDEO_CODECS)
+    parts = [expected['resolution'], expected['source']]
+    if rng.random() < 0.3:
+        parts.append(rng.choice(HDR_TAGS))
+    parts.append(expected['video_codec'])
+    if rng.random() < audio_rate:
+        expected['audio_codec'] = rng.choice(AUDIO_CODECS)
+        parts.append(expected['audio_codec'])
+    return parts
+
+
+def _western_movie(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(list(WESTERN_MOVIES))
+    expected['title'] = title
+    expected['chinese_title'] = WESTERN_MOVIES[title]
+    expected['year'] = str(rng.randint(1960, 2024))
+    sep = '.' if rng.random() < 0.85 else ' '
+    parts = [title.replace(' ', sep), expected['year']] + _pick_tech(rng, expected)
+    expected['release_group'] = rng.choice(SCENE_GROUPS)
+    name = _join(parts, sep) + '-' + expected['release_group']
+    return name + '.' + rng.choice(EXTENSIONS), expected
+
+
+def _western_tv(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(list(WESTERN_SHOWS))
+    expected['title'] = title
+    expected['chinese_title'] = WESTERN_SHOWS[title]
+    expected['season'] = rng.randint(1, 12)
+    expected['episode'] = rng.randint(1, 24)
+    expected['is_tv'] = True
+    
+    if rng.random() < 0.85:
+        marker = f"S{expected['season']:02d}E{expected['episode']:02d}"
+    else:
+        marker = f"{expected['season']}x{expected['episode']:02d}"
+    parts = [title.replace(' ', '.'), marker] + _pick_tech(rng, expected, audio_rate=0.4)
+    expected['release_group'] = rng.choice(SCENE_GROUPS + ('NTb', 'FLUX'))
+    name = _join(parts, '.') + '-' + expected['release_group']
+    return name + '.' + rng.choice(EXTENSIONS), expected
+
+
+def _chinese_pt(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(CHINESE_TITLES)
+    expected['title'] = expected['chinese_title'] = title
+    parts = [title]
+    if rng.random() < 0.35:
+        expected['season'] = rng.randint(1, 5)
+        expected['episode'] = rng.randint(1, 40)
+        expected['is_tv'] = True
+        parts.append(f"S{expected['season']:02d}E{expected['episode']:02d}")
+    expected['year'] = str(rng.randint(1990, 2024))
+    parts.append(expected['year'])
+    parts += _pick_tech(rng, expected)
+    expected['release_group'] = rng.choice(PT_GROUPS)
+    name = _join(parts, '.') + '-' + expected['release_group']
+    return name + '.' + rng.choice(EXTENSIONS), expected
+
+
+def _anime_fansub(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(ANIME_TITLES)
+    expected['title'] = expected['chinese_title'] = title
+    expected['episode'] = rng.randint(1, 26)
+    expected['is_tv'] = True
+    expected['resolution'] = rng.choice(('1080p', '1080p', '720p'))
+    expected['release_group'] = rng.choice(FANSUB_GROUPS)
+    lang = rng.choice(FANSUB_LANGS)
+    
+    if rng.random() < 0.6:
+        name = f"[{expected['release_group']}] {title} - {expected['episode']:02d} [{expected['resolution']}][{lang}]"
+    else:
+        name = f"【{expected['release_group']}】[{title}][{expected['episode']:02d}][{expected['resolution']}][{lang}]"
+    return name + '.' + rng.choice(('mkv', 'mp4')), expected
+
+
+def _chinese_season_episode(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(CHINESE_TITLES)
+    expected['title'] = expected['chinese_title'] = title
+    expected['episode'] = rng.randint(1, 60)
+    expected['is_tv'] = True
+    if rng.random() < 0.7:
+        expected['season'] = rng.randint(1, 5)
+        marker = f"第{expected['season']}季第{expected['episode']}集"
+    else:
+        marker = f"第{expected['episode']:02d}集"
+    
+    expected['resolution'] = rng.choice(RESOLUTIONS)
+    parts = [title, marker, expected['resolution']]
+    if rng.random() < 0.5:
+        expected['source'] = rng.choice(('WEB-DL', 'HDTV', 'WEBRip'))
+        parts.append(expected['source'])
+    return _join(parts, rng.choice(('.', ' '))) + '.' + rng.choice(EXTENSIONS), expected
+
+
+def _mixed_numeral(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    expected = _empty_expected()
+    title = rng.choice(CHINESE_TITLES)
+    expected['title'] = expected['chinese_title'] = title
+    expected['season'] = rng.randint(1, 9)
+    expected['episode'] = rng.randint(1, 99)
+    expected['is_tv'] = True
+    
+    style = rng.random()
+    if style < 0.5:
+        marker = f"第{chinese_numeral(expected['season'])}季第{chinese_numeral(expected['episode'])}集"
+    elif style < 0.75:
+        marker = f"第{expected['season']}季第{chinese_numeral(expected['episode'])}集"
+    else:
+        marker = f"第{chinese_numeral(expected['season'])}季第{expected['episode']}集"
+    
+    expected['resolution'] = rng.choice(RESOLUTIONS)
+    return _join([title, marker, expected['resolution']], '.') + '.' + rng.choice(EXTENSIONS), expected
+
+
+# 分类 -> (生成函数, 权重)
+CATEGORIES = {
+    'western_movie': (_western_movie, 25),
+    'western_tv': (_western_tv, 25),
+    'chinese_pt': (_chinese_pt, 20),
+    'anime_fansub': (_anime_fansub, 15),
+    'chinese_season_episode': (_chinese_season_episode, 10),
+    'mixed_numeral': (_mixed_numeral, 5),
+}
+
+
+def iter_corpus(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    逐条生成基准语料（相同 count/seed 的输出完全一致）
+    
+    Args:
+        count: 生成条数
+        seed: 随机种子
+    
+    Yields:
+        {'filename': 文件名, 'category': 分类, 'expected': 期望字段}
+    """
+    rng = random.Random(seed)
+    names = list(CATEGORIES)
+    weights = [CATEGORIES[name][1] for name in names]
+    for _ in range(count):
+        category = rng.choices(names, weights)[0]
+        filename, expected = CATEGORIES[category][0](rng)
+        yield {'filename': filename, 'category': category, 'expected': expected}
+
+
+def generate_corpus(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """生成基准语料列表"""
+    return list(iter_corpus(count, seed))
+
+
+def title_table() -> Dict[str, str]:
+    """离线标题表：英文标题 -> 中文标题（供网络查询桩使用）"""
+    table = dict(WESTERN_MOVIES)
+    table.update(WESTERN_SHOWS)
+    return table
+
+
+def spelling_variants(title: str) -> List[str]:
+    """同一标题的常见写法（大小写、分隔符、冠词、& 与 and、罗马数字、残留标签）"""
+    variants = [title, title.replace(' ', '.'), title.replace(' ', '_'), title.lower(), title.upper()]
+    variants.extend(TITLE_SPELLINGS.get(title, ()))
+    if title.startswith('The '):
+        variants.append(title[4:])
+    if ' and ' in title:
+        variants.append(title.replace(' and ', ' & '))
+    variants.extend(f"{title.replace(' ', '.')}.{tag}" for tag in LEFTOVER_TAGS)
+    return variants
+
+
+def iter_title_queries(count: int, seed: int = 42) -> Iterator[Tuple[str, str, bool, str]]:
+    """
+    逐条生成标题查询（每部作品的年份固定，写法随机）
+    
+    Args:
+        count: 生成条数
+        seed: 随机种子
+    
+    Yields:
+        (查询标题, 年份, 是否为电视剧, 作品标准标题)
+    """
+    rng = random.Random(seed)
+    works = [(title, False) for title in list(WESTERN_MOVIES) + list(TITLE_SPELLINGS)]
+    works += [(title, True) for title in WESTERN_SHOWS]
+    years = {title: str(rng.randint(1960, 2024)) for title, _ in works}
+    variants = {title: spelling_variants(title) for title, _ in works}
+    for _ in range(count):
+        title, is_tv = rng.choice(works)
+        yield rng.choice(variants[title]), years[title], is_tv, title
+
+
+def compare_fields(expected: Dict[str, Any], actual: Dict[str, Any], title_key: str = 'title') -> Dict[str, bool]:
+    """
+    逐字段比较识别结果
+    
+    Args:
+        expected: 期望字段
+        actual: 识别结果
+        title_key: 标题期望值所在的键（'title' 或 'chinese_title'）
+    
+    Returns:
+        字段 -> 是否一致
+    """
+    matches = {}
+    for field in FIELDS:
+        want = expected[title_key] if field == 'title' else expected[field]
+        matches[field] = actual.get(field) == want
+    return matches
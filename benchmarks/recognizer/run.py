@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别器吞吐与准确率基准
+完全离线运行（TMDB/豆瓣查询由本地标题表代替），结果输出为 JSON，便于跨提交比较
+
+用法：
+    python -m benchmarks.recognizer --count 100000 --seed 42 --output bench.json
+    python -m benchmarks.recognizer --count 20000 --cases advanced
+    python -m benchmarks.recognizer --count 20000 --baseline bench.json   # 回归门禁：变慢或准确率下降时退出码为 1
+
+测量项（每个用例）：
+- files_per_sec: 吞吐量
+- latency_us: 单文件延迟 p50/p90/p99/max（微秒）
+- peak_memory_kb: tracemalloc 峰值内存（单独一轮，不计入计时）
+- accuracy: 各字段与期望值一致的比例（整体及按语料分类）
+
+缓存键（cache_keys，与用例无关）：同一组随机写法的标题查询分别用旧键和规范化键计算
+- hit_rate: 缓存命中率（每个不同的键第一次查询未命中，之后命中）
+- collisions: 被合并到同一个键的不同作品数（应为 0）
+- ns_per_key: 生成一个键的平均耗时（纳秒）
+
+回归门禁（--baseline）：与同一台机器上旧提交的报告比较，
+p50 延迟超出基线的 (1 + tolerance) 倍、或语料相同时完全一致率下降，都视为回归
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.recognizer.corpus import FIELDS, compare_fields, generate_corpus, iter_title_queries, title_table
+from core.advanced_recognizer import AdvancedRecognizer
+from core.chinese_title_resolver import ChineseTitleResolver, IntegratedRecognizer
+from core.metadata_cache import MetadataCache
+from core.title_key import canonical_key
+
+
+class OfflineTitleResolver(ChineseTitleResolver):
+    """离线中文标题解析器：用语料自带的标题表代替 TMDB/豆瓣网络查询"""
+    
+    def __init__(self, table: Dict[str, str]):
+        # 内存缓存、不使用本地标题索引：不读写 data/ 下的文件，每次运行互不影响
+        super().__init__(tmdb_api_key='offline', douban_cookie=None, cache=MetadataCache(':memory:'))
+        self.title_index = None
+        self.table = table
+    
+    def _query_douban(self, title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
+        return None
+    
+    def _query_tmdb(self, title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
+        return self.table.get(title)
+
+
+def build_advanced(cache_size: int = 0) -> AdvancedRecognizer:
+    """创建独立的高级识别器（默认关闭结果缓存，测量真实识别开销）"""
+    return AdvancedRecognizer(cache_size=cache_size)
+
+
+def build_integrated(cache_size: int = 0) -> IntegratedRecognizer:
+    """创建离线集成识别器（不共享全局单例，不访问网络）"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        recognizer = IntegratedRecognizer(cache_size=cache_size, title_resolver=OfflineTitleResolver(title_table()))
+        recognizer.advanced_recognizer = AdvancedRecognizer(cache_size=cache_size)
+    return recognizer
+
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(ratio * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _git_revision() -> Optional[str]:
+    """当前提交哈希（非 git 目录时返回 None）"""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        )
+        return output.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def measure(
+    name: str,
+    factory: Callable[[], Any],
+    call: Callable[[Any, str], Dict[str, Any]],
+    corpus: List[Dict[str, Any]],
+    title_key: str = 'title'
+) -> Dict[str, Any]:
+    """
+    测量一个识别用例
+    
+    Args:
+        name: 用例名称
+        factory: 创建识别器实例的函数（计时轮与内存轮各用一个新实例）
+        call: (识别器, 文件名) -> 识别结果
+        corpus: 基准语料
+        title_key: 标题期望值所在的键
+    
+    Returns:
+        用例报告
+    """
+    print(f"▶ {name}: {len(corpus)} 个文件")
+    filenames = [item['filename'] for item in corpus]
+    
+    # 计时轮：逐文件计时（识别器自身的日志输出被丢弃）
+    recognizer = factory()
+    latencies = []
+    results = []
+    clock = time.perf_counter
+    gc.collect()
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        started = clock()
+        for filename in filenames:
+            begin = clock()
+            results.append(call(recognizer, filename))
+            latencies.append(clock() - begin)
+            if sink.tell() > 1 << 20:
+                sink.seek(0)
+                sink.truncate()
+        elapsed = clock() - started
+    
+    # 内存轮：新实例，tracemalloc 会显著拖慢执行，因此不与计时轮合并
+    recognizer = factory()
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for filename in filenames:
+            call(recognizer, filename)
+            if sink.tell() > 1 << 20:
+                sink.seek(0)
+                sink.truncate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    # 准确率：整体 + 按分类
+    totals = {field: 0 for field in FIELDS}
+    categories: Dict[str, Dict[str, int]] = {}
+    exact = 0
+    for item, result in zip(corpus, results):
+        matches = compare_fields(item['expected'], result, title_key)
+        bucket = categories.setdefault(item['category'], {'count': 0, **{field: 0 for field in FIELDS}})
+        bucket['count'] += 1
+        for field, ok in matches.items():
+            if ok:
+                totals[field] += 1
+                bucket[field] += 1
+        if all(matches.values()):
+            exact += 1
+    
+    count = len(corpus) or 1
+    latencies.sort()
+    report = {
+        'files': len(corpus),
+        'seconds': round(elapsed, 4),
+        'files_per_sec': round(len(corpus) / elapsed, 1) if elapsed > 0 else None,
+        'latency_us': {
+            'mean': round(elapsed / count * 1e6, 2),
+            'p50': round(_percentile(latencies, 0.50) * 1e6, 2),
+            'p90': round(_percentile(latencies, 0.90) * 1e6, 2),
+            'p99': round(_percentile(latencies, 0.99) * 1e6, 2),
+            'max': round(latencies[-1] * 1e6, 2) if latencies else 0.0,
+        },
+        'peak_memory_kb': round(peak / 1024, 1),
+        'accuracy': {
+            'exact': round(exact / count, 4),
+            'fields': {field: round(totals[field] / count, 4) for field in FIELDS},
+            'by_category': {
+                category: {
+                    'count': bucket['count'],
+                    **{field: round(bucket[field] / bucket['count'], 4) for field in FIELDS},
+                }
+                for category, bucket in sorted(categories.items())
+            },
+        },
+    }
+    
+    print(
+        f"  ✓ {report['files_per_sec']} 文件/秒, "
+        f"p50 {report['latency_us']['p50']}µs, p99 {report['latency_us']['p99']}µs, "
+        f"峰值内存 {report['peak_memory_kb']}KB, 完全一致 {report['accuracy']['exact']:.2%}"
+    )
+    return report
+
+
+_SEPARATORS = re.compile(r'[\s._\-:·]+')
+
+# 缓存键名称 -> 键函数：原始拼接、只折叠大小写和分隔符（规范化键之前的两种做法）、规范化键
+KEY_FUNCTIONS = {
+    'raw': lambda title, year, is_tv: f"{title}_{year}_{is_tv}",
+    'separator_fold': lambda title, year, is_tv: (
+        f"{_SEPARATORS.sub(' ', title.casefold()).strip()}|{year or ''}|{'tv' if is_tv else 'movie'}"
+    ),
+    'canonical': canonical_key,
+}
+
+
+def measure_keys(count: int, seed: int = 42) -> Dict[str, Any]:
+    """
+    测量各缓存键函数的命中率
+    
+    Args:
+        count: 查询条数
+        seed: 随机种子
+    
+    Returns:
+        {'queries', 'works', 'ideal_hit_rate', 'keys': {键名称: 统计}}
+    """
+    print(f"测量缓存键: {count} 次查询")
+    queries = list(iter_title_queries(count, seed))
+    works = {(work, is_tv) for _, _, is_tv, work in queries}
+    report = {
+        'queries': len(queries),
+        'works': len(works),
+        'ideal_hit_rate': round(1 - len(works) / len(queries), 4) if queries else 0.0,
+        'keys': {},
+    }
+    for name, key_func in KEY_FUNCTIONS.items():
+        started = time.perf_counter()
+        keys = [key_func(title, year, is_tv) for title, year, is_tv, _ in queries]
+        elapsed = time.perf_counter() - started
+        
+        owners: Dict[str, set] = {}
+        for key, (_, _, is_tv, work) in zip(keys, queries):
+            owners.setdefault(key, set()).add((work, is_tv))
+        report['keys'][name] = {
+            'distinct_keys': len(owners),
+            'hit_rate': round(1 - len(owners) / len(queries), 4) if queries else 0.0,
+            'collisions': sum(len(works) - 1 for works in owners.values()),
+            'ns_per_key': round(elapsed / len(queries) * 1e9, 1) if queries else 0.0,
+        }
+        print(
+            f"  ✓ {name}: 命中率 {report['keys'][name]['hit_rate']:.2%}, "
+            f"{len(owners)} 个键, {report['keys'][name]['ns_per_key']}ns/键"
+        )
+    return report
+
+
+# 用例名称 -> (识别器工厂, 调用方式, 标题期望键)
+CASES = {
+    'advanced': (
+        build_advanced,
+        lambda recognizer, filename: recognizer.recognize(filename),
+        'title',
+    ),
+    'integrated': (
+        build_integrated,
+        lambda recognizer, filename: recognizer.recognize_with_chinese_title(filename),
+        'chinese_title',
+    ),
+}
+
+
+def run(count: int = 100000, seed: int = 42, cases: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    运行基准
+    
+    Args:
+        count: 语料条数
+        seed: 随机种子
+        cases: 要运行的用例（默认全部）
+    
+    Returns:
+        完整报告（可直接写为 JSON）
+    """
+    print(f"生成语料: {count} 条 (seed={seed})")
+    corpus = generate_corpus(count, seed)
+    
+    report = {
+        'meta': {
+            'revision': _git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'count': count,
+            'seed': seed,
+        },
+        'cases': {},
+    }
+    for name in cases or list(CASES):
+        factory, call, title_key = CASES[name]
+        report['cases'][name] = measure(name, factory, call, corpus, title_key)
+    report['cache_keys'] = measure_keys(count, seed)
+    return report
+
+
+# 回归门禁的默认延迟容差（p50 允许比基线慢 15%）
+DEFAULT_TOLERANCE = 0.15
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    对比报告与基线
+    
+    Args:
+        report: 本次报告
+        baseline: 基线报告（同一台机器上旧提交的 --output 结果）
+        tolerance: p50 延迟允许超出基线的比例
+    
+    Returns:
+        回归描述列表（为空表示通过）
+    """
+    regressions = []
+    same_corpus = all(
+        report['meta'].get(key) == baseline.get('meta', {}).get(key) for key in ('count', 'seed')
+    )
+    if not same_corpus:
+        print("⚠ 语料条数或随机种子与基线不同，只比较延迟")
+    
+    for name, case in report['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None:
+            print(f"⚠ 基线中没有用例 {name}，跳过")
+            continue
+        p50 = case['latency_us']['p50']
+        limit = base['latency_us']['p50'] * (1 + tolerance)
+        if p50 > limit:
+            regressions.append(
+                f"{name}: p50 {p50}µs 超出基线 {base['latency_us']['p50']}µs 的 {tolerance:.0%} 容差"
+            )
+        if same_corpus and case['accuracy']['exact'] < base['accuracy']['exact']:
+            regressions.append(
+                f"{name}: 完全一致率 {case['accuracy']['exact']:.2%} 低于基线 {base['accuracy']['exact']:.2%}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='识别器吞吐与准确率基准（离线）')
+    parser.add_argument('--count', type=int, default=100000, help='语料条数（默认 100000）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子（默认 42）')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help='要运行的用例（默认全部）')
+    parser.add_argument('--output', help='JSON 报告输出路径（默认输出到标准输出）')
+    parser.add_argument('--dump-corpus', help='把语料写为 JSON Lines 文件后退出')
+    parser.add_argument('--baseline', help='基线报告路径（回归门禁：变慢或准确率下降时退出码为 1）')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'p50 延迟相对基线的容差（默认 {DEFAULT_TOLERANCE}）')
+    args = parser.parse_args(argv)
+    
+    if args.dump_corpus:
+        with open(args.dump_corpus, 'w', encoding='utf-8') as f:
+            for item in generate_corpus(args.count, args.seed):
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        print(f"✓ 语料已写入: {args.dump_corpus}")
+        return 0
+    
+    report = run(args.count, args.seed, args.cases)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✓ 报告已写入: {args.output}")
+    else:
+        print(text)
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        if regressions:
+            for regression in regressions:
+                print(f"✗ {regression}")
+            return 1
+        print(f"✓ 未超出基线 {args.baseline}（容差 {args.tolerance:.0%}）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,13 +6,99 @@
 """
 
 import re
-from typing import Dict, Any, Optional, List, Tuple
+import sys
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+from core.anime_recognizer import looks_like_anime, parse_anime
+from core.lru_cache import LRUCache
+from core.media_tags import MediaTagDetector, get_media_tag_detector
+from core.recognition_result import RecognitionResult, intern_values
+from core.release_groups import ReleaseGroupMatcher, get_release_group_matcher
+from core.recognizer_tables import fold_lower, required_literals
+
+
+_BRACKETS = ('[', ']', '【', '】', '(', ')', '（', '）')
+
+# 自动机组名前的括号（括号内的组名不受位置限制）和末尾允许跟随的字符
+_GROUP_BRACKETS = ('[', '【')
+_TRAILING_CHARS = ' []【】()（）'
+
+# 季集信息的起点（只用于判断制作组/版本标签是否位于标题之后）
+_SEASON_EPISODE_START = re.compile(r'(?<![a-z0-9])(?:s\d{1,2}|ep?\d{1,3}|season|episode)|第\d')
+
+# 标签词元缓存上限（满后整体清空）
+_TOKEN_CACHE_SIZE = 65536
+
+# 识别结果 LRU 缓存默认容量（按原始文件名）
+DEFAULT_RESULT_CACHE_SIZE = 10000
+
+# 模式编译缓存上限（识别模式和标题中的整词移除模式）
+_PATTERN_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_PATTERN_CACHE_SIZE)
+def _compile(pattern: str):
+    """编译模式（IGNORECASE，按模式字符串缓存）"""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@lru_cache(maxsize=_PATTERN_CACHE_SIZE)
+def _compile_all(patterns: Tuple[str, ...]) -> Tuple[Tuple[Any, Tuple[str, ...]], ...]:
+    """
+    编译模式列表（按模式元组缓存，修改 patterns 后直接生效，无需重新编译）
+    
+    Returns:
+        ((正则, 必然包含的小写字面量), ...)，字面量一个都不在小写文本中时模式不可能匹配；
+        无法推导时为空元组（总是执行），见 core.recognizer_tables.required_literals
+    """
+    return tuple((_compile(pattern), required_literals(pattern) or ()) for pattern in patterns)
+
+
+def _candidates(patterns: List[str], low: str) -> List[Any]:
+    """按顺序返回可能匹配的正则（跳过必然包含的字面量都不出现的模式）"""
+    regexes = []
+    for regex, literals in _compile_all(tuple(patterns)):
+        if literals:
+            for literal in literals:
+                if literal in low:
+                    break
+            else:
+                continue
+        regexes.append(regex)
+    return regexes
+
+
+def copy_result(info: RecognitionResult) -> RecognitionResult:
+    """复制识别结果（调用方修改不影响缓存）"""
+    return info.copy()
 
 
 class AdvancedRecognizer:
     """高级识别器 - 融合多种识别算法"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        release_group_matcher: Optional[ReleaseGroupMatcher] = None,
+        strip_release_groups: bool = False,
+        anime_mode: bool = True
+    ):
+        """
+        初始化高级识别器
+        
+        Args:
+            cache_size: 识别结果 LRU 缓存容量（按原始文件名，0 表示不缓存）
+            release_group_matcher: 制作组匹配器（默认使用全局实例）
+            strip_release_groups: 提取标题前是否移除匹配到的制作组
+            anime_mode: 字幕组命名的文件名是否使用动漫解析（标题、季集）
+        """
+        self.result_cache = LRUCache(cache_size)
+        self.release_group_matcher = release_group_matcher or get_release_group_matcher()
+        self.strip_release_groups = strip_release_groups
+        self.anime_mode = anime_mode
+        self.media_tag_detector: MediaTagDetector = get_media_tag_detector()
+        
         # NAS-Tools 风格的正则模式（更全面）
         self.patterns = {
             'season': [
@@ -100,7 +186,9 @@ class AdvancedRecognizer:
             r'(\d{1,2})x(\d{1,3})',                  # 1x01
         ]
     
-    def recognize(self, filename: str) -> Dict[str, Any]:
+        self._token_cache = {}
+    
+    def recognize(self, filename: str) -> RecognitionResult:
         """
         识别文件名中的媒体信息
         
@@ -108,68 +196,174 @@ class AdvancedRecognizer:
             filename: 文件名
             
         Returns:
-            识别结果字典
+            识别结果（兼容字典读写，需要字典时调用 to_dict()）
         """
-        result = {
-            'original_name': filename,
-            'title': None,
-            'year': None,
-            'season': None,
-            'episode': None,
-            'resolution': None,
-            'video_codec': None,
-            'audio_codec': None,
-            'source': None,
-            'hdr': None,
-            'language': [],
-            'subtitle': [],
-            'release_group': None,
-            'is_tv': False,
-        }
+        return copy_result(self._recognize_cached(filename))
+        
+    def recognize_many(self, filenames: Iterable[str]) -> List[RecognitionResult]:
+        """
+        批量识别文件名（批内相同文件名只识别一次）
+        
+        Args:
+            filenames: 文件名序列
+            
+        Returns:
+            识别结果列表（与输入顺序一致）
+        """
+        seen = {}
+        results = []
+        for filename in filenames:
+            info = seen.get(filename)
+            if info is None:
+                info = seen[filename] = self._recognize_cached(filename)
+            results.append(copy_result(info))
+        return results
+    
+    def add_release_groups(self, patterns: Iterable[str]) -> int:
+        """
+        添加自定义制作组（识别结果缓存随之清空）
+        
+        Args:
+            patterns: 组名列表（字面量或 (?:a|b) 分支写法）
+            
+        Returns:
+            新增的组名数量
+        """
+        added = self.release_group_matcher.add_groups(patterns)
+        if added:
+            self.result_cache.clear()
+        return added
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取识别结果缓存统计"""
+        return self.result_cache.get_stats()
+    
+    def clear_cache(self):
+        """清空识别结果缓存"""
+        self.result_cache.clear()
+    
+    def _recognize_cached(self, filename: str) -> RecognitionResult:
+        """从 LRU 缓存获取识别结果，未命中时识别并写入（返回缓存中的对象，不可修改）"""
+        info = self.result_cache.get(filename)
+        if info is None:
+            info = self._recognize(filename)
+            self.result_cache.put(filename, info)
+        return info
+    
+    def _recognize(self, filename: str) -> RecognitionResult:
+        """识别文件名（不经过缓存）"""
+        result = RecognitionResult(filename)
         
         # 清理文件名
         clean_name = self._clean_filename(filename)
+        low = fold_lower(clean_name)
+        
+        # 字幕组命名走动漫解析（括号结构检查很廉价，通用命名不受影响）
+        anime = parse_anime(filename) if self.anime_mode and looks_like_anime(filename) else None
         
         # 识别季集信息（组合模式）
-        season, episode = self._extract_season_episode(clean_name)
+        if anime:
+            season, episode = anime['season'], anime['episode']
+        else:
+            season, episode = self._extract_season_episode(clean_name, low)
         if season or episode:
-            result['season'] = season
-            result['episode'] = episode
-            result['is_tv'] = True
-        
-        # 识别各种属性
-        result['year'] = self._extract_first(clean_name, self.patterns['year'])
-        result['resolution'] = self._extract_first(clean_name, self.patterns['resolution'])
-        result['video_codec'] = self._extract_first(clean_name, self.patterns['video_codec'])
-        result['audio_codec'] = self._extract_first(clean_name, self.patterns['audio_codec'])
-        result['source'] = self._extract_first(clean_name, self.patterns['source'])
-        result['hdr'] = self._extract_first(clean_name, self.patterns['hdr'])
-        result['release_group'] = self._extract_first(clean_name, self.patterns['release_group'])
+            result.season = season
+            result.episode = episode
+            result.is_tv = True
+        
+        # 识别各种属性（取值驻留，批量结果中相同的编码/来源等只保留一份字符串）
+        intern = sys.intern
+        patterns = self.patterns
+        for key in ('year', 'resolution', 'video_codec', 'audio_codec', 'source', 'hdr', 'release_group'):
+            value = self._extract_first(clean_name, low, patterns[key])
+            if value is not None:
+                setattr(result, key, intern(value))
         
         # 识别语言和字幕（可能有多个）
-        result['language'] = self._extract_all(clean_name, self.patterns['language'])
-        result['subtitle'] = self._extract_all(clean_name, self.patterns['subtitle'])
+        result.language = intern_values(self._extract_all(clean_name, low, patterns['language']))
+        result.subtitle = intern_values(self._extract_all(clean_name, low, patterns['subtitle']))
+        
+        # 标题之后的信息（年份、季集、技术标签）的起点：版本标签和制作组只在此之后（或括号内、末尾）接受
+        info_start = self._info_start(low, result)
         
-        # 提取标题（移除所有识别到的信息）
-        result['title'] = self._extract_title(clean_name, result)
+        # 识别流媒体平台和版本标签（提取标题前移除，避免同一作品因标签不同得到不同标题）
+        platform, edition, tag_spans = self.media_tag_detector.detect(
+            clean_name, low, self._tag_tokens(low), info_start
+        )
+        result.platform = intern(platform) if platform else None
+        result.edition = intern(edition) if edition else None
+        title_source = self.media_tag_detector.strip(clean_name, tag_spans)
+        
+        # 识别制作组/字幕组（自动机优先，未命中时保留末尾标签的识别结果）
+        # 自动机只接受括号内、末尾或年份/季集/技术标签之后的组名，标题中的 Dead-Zone、Stan-Lee 不算制作组
+        trailing_group = result.release_group
+        spans = self._accept_group_spans(clean_name, self.release_group_matcher.find(clean_name), info_start)
+        if spans:
+            groups = []
+            for start, end in spans:
+                group = clean_name[start:end]
+                if group not in groups:
+                    groups.append(group)
+            result.release_group = intern('@'.join(groups))
+            if self.strip_release_groups:
+                title_source = self.release_group_matcher.strip(title_source, spans)
+        
+        if anime:
+            # 末尾标签规则会把 [CHS] 之类当作制作组，字幕组以括号结构为准
+            if not spans:
+                result.release_group = intern(anime['release_group']) if anime['release_group'] else None
+            if not result.resolution and anime['resolution']:
+                result.resolution = intern(anime['resolution'])
+            if anime['title']:
+                result.title = anime['title']
+                return result
+        
+        # 提取标题（移除所有识别到的信息；自动机匹配的组名只在 strip_release_groups 时移除，见上）
+        result.title = self._extract_title(title_source, result, trailing_group)
         
         return result
     
+    @staticmethod
+    def _info_start(low: str, result: RecognitionResult) -> int:
+        """年份、季集或第一个技术标签在文件名中的起点（都没有时为文本长度）"""
+        start = len(low)
+        for value in (result.year, result.resolution, result.video_codec, result.audio_codec, result.source, result.hdr):
+            if value:
+                index = low.find(value.lower())
+                if 0 <= index < start:
+                    start = index
+        if result.is_tv:
+            match = _SEASON_EPISODE_START.search(low)
+            if match and match.start() < start:
+                start = match.start()
+        return start
+    
+    @staticmethod
+    def _accept_group_spans(text: str, spans: List[Tuple[int, int]], info_start: int) -> List[Tuple[int, int]]:
+        """保留括号内、位于末尾或在 info_start 之后的组名位置"""
+        accepted = []
+        for start, end in spans:
+            if (
+                start >= info_start
+                or text[start - 1] in _GROUP_BRACKETS
+                or not text[end:].strip(_TRAILING_CHARS)
+            ):
+                accepted.append((start, end))
+        return accepted
+    
     def _clean_filename(self, filename: str) -> str:
         """清理文件名"""
         # 移除文件扩展名
         name = filename.rsplit('.', 1)[0] if '.' in filename else filename
         
         # 替换常见分隔符为空格
-        name = re.sub(r'[._]', ' ', name)
+        return name.replace('.', ' ').replace('_', ' ')
         
-        return name
-    
-    def _extract_season_episode(self, text: str) -> Tuple[Optional[int], Optional[int]]:
+    def _extract_season_episode(self, text: str, low: str) -> Tuple[Optional[int], Optional[int]]:
         """提取季集信息（组合模式）"""
         # 尝试组合模式
-        for pattern in self.season_episode_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for regex in _candidates(self.season_episode_patterns, low):
+            match = regex.search(text)
             if match:
                 try:
                     season = int(match.group(1))
@@ -179,8 +373,8 @@ class AdvancedRecognizer:
                     pass
         
         # 单独提取
-        season = self._extract_first(text, self.patterns['season'])
-        episode = self._extract_first(text, self.patterns['episode'])
+        season = self._extract_first(text, low, self.patterns['season'])
+        episode = self._extract_first(text, low, self.patterns['episode'])
         
         try:
             season = int(season) if season else None
@@ -191,127 +385,110 @@ class AdvancedRecognizer:
         
         return season, episode
     
-    def _extract_first(self, text: str, patterns: List[str]) -> Optional[str]:
-        """提取第一个匹配的值"""
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+    def _extract_first(self, text: str, low: str, patterns: List[str]) -> Optional[str]:
+        """提取第一个匹配的值（low 为对齐的小写文本，用于跳过不可能匹配的模式）"""
+        for regex in _candidates(patterns, low):
+            match = regex.search(text)
             if match:
-                return match.group(1) if match.groups() else match.group(0)
+                return match.group(1) if regex.groups else match.group(0)
         return None
     
-    def _extract_all(self, text: str, patterns: List[str]) -> List[str]:
+    def _extract_all(self, text: str, low: str, patterns: List[str]) -> List[str]:
         """提取所有匹配的值"""
         results = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                value = match.group(1) if match.groups() else match.group(0)
+        for regex in _candidates(patterns, low):
+            for match in regex.finditer(text):
+                value = match.group(1) if regex.groups else match.group(0)
                 if value not in results:
                     results.append(value)
         return results
     
-    def _extract_title(self, text: str, info: Dict[str, Any]) -> str:
-        """提取标题（移除所有识别到的信息）"""
+    def _tag_tokens(self, low: str) -> List[Tuple[str, int, int]]:
+        """
+        标签词元（与 MediaTagDetector.tokenize 相同）
+        
+        每个不同的词元只做一次去括号处理，结果按词元缓存，同一批文件中重复的词元不重复计算
+        """
+        cache = self._token_cache
+        tokens = []
+        position = 0
+        for raw in low.split(' '):
+            if raw:
+                token = cache.get(raw)
+                if token is None:
+                    if len(cache) >= _TOKEN_CACHE_SIZE:
+                        cache.clear()
+                    token = cache[raw] = MediaTagDetector.token(raw) or ()
+                if token:
+                    tokens.append((token[0], position + token[1], position + token[2]))
+            position += len(raw) + 1
+        return tokens
+    
+    def _remove_words(self, title: str, values: List[str]) -> str:
+        """依次移除标题中的整词（\bvalue\b，忽略大小写；模式按值缓存）"""
+        for value in values:
+            title = _compile(rf'\b{re.escape(value)}\b').sub('', title)
+        return title
+    
+    def _extract_title(self, text: str, info: RecognitionResult, release_group: Optional[str] = None) -> str:
+        """提取标题（移除所有识别到的信息；制作组只移除末尾标签规则识别到的 release_group）"""
         title = text
         
-        # 移除年份
-        if info['year']:
-            title = re.sub(rf'\b{info["year"]}\b', '', title, flags=re.IGNORECASE)
+        # 移除年份（直接读属性，不经过字典兼容接口）
+        if info.year:
+            title = self._remove_words(title, (info.year,))
         
         # 移除季集信息
-        if info['season'] or info['episode']:
-            for pattern in self.season_episode_patterns:
-                title = re.sub(pattern, '', title, flags=re.IGNORECASE)
-            for pattern in self.patterns['season'] + self.patterns['episode']:
-                title = re.sub(pattern, '', title, flags=re.IGNORECASE)
-        
-        # 移除其他信息
-        for key in ['resolution', 'video_codec', 'audio_codec', 'source', 'hdr', 'release_group']:
-            if info[key]:
-                title = re.sub(rf'\b{re.escape(str(info[key]))}\b', '', title, flags=re.IGNORECASE)
-        
-        # 移除语言和字幕信息
-        for lang in info['language'] + info['subtitle']:
-            title = re.sub(rf'\b{re.escape(lang)}\b', '', title, flags=re.IGNORECASE)
-        
-        # 清理多余空格和特殊字符
-        title = re.sub(r'\s+', ' ', title)
-        title = re.sub(r'[\[\]【】()（）]', '', title)
+        if info.season or info.episode:
+            # 移除后可能拼出新的字面量，命中时重新生成小写文本
+            low = fold_lower(title)
+            patterns = self.season_episode_patterns + self.patterns['season'] + self.patterns['episode']
+            for regex, literals in _compile_all(tuple(patterns)):
+                if literals:
+                    for literal in literals:
+                        if literal in low:
+                            break
+                    else:
+                        continue
+                title, count = regex.subn('', title)
+                if count:
+                    low = fold_lower(title)
+        
+        # 移除其他信息、语言和字幕信息
+        values = [
+            str(value)
+            for value in (info.resolution, info.video_codec, info.audio_codec, info.source, info.hdr)
+            if value
+        ]
+        if release_group:
+            values.append(release_group)
+        values.extend(info.language)
+        values.extend(info.subtitle)
+        title = self._remove_words(title, values)
+        
+        # 清理多余空格和特殊字符（首尾空白随后会被 strip 去掉，split/join 与 \s+ 折叠等价）
+        title = ' '.join(title.split())
+        for bracket in _BRACKETS:
+            if bracket in title:
+                title = title.replace(bracket, '')
         title = title.strip(' -_.')
         
         return title if title else text
     
-    def get_quality_score(self, info: Dict[str, Any]) -> int:
+    def get_quality_score(self, info: Dict[str, Any], profile: Optional[str] = None) -> int:
         """
         计算文件质量分数（用于去重）
         
         Args:
             info: 识别结果
+            profile: 评分方案（默认使用配置中的 quality_profile）
             
         Returns:
             质量分数
         """
-        score = 0
-        
-        # 分辨率分数
-        resolution_scores = {
-            '8K': 8000, '8k': 8000,
-            '4K': 4000, '4k': 4000, 'UHD': 4000,
-            '2160p': 2160, '2160P': 2160,
-            '1080p': 1080, '1080P': 1080, 'FHD': 1080,
-            '720p': 720, '720P': 720, 'HD': 720,
-            '480p': 480, '480P': 480,
-            '360p': 360, '360P': 360,
-        }
-        if info['resolution']:
-            score += resolution_scores.get(info['resolution'], 0)
-        
-        # 来源分数
-        source_scores = {
-            'REMUX': 100,
-            'BluRay': 80, 'Blu-Ray': 80, 'BDMV': 80, 'BD': 80,
-            'WEB-DL': 60, 'WEBDL': 60,
-            'WEBRip': 40,
-            'HDRip': 30,
-            'BRRip': 25,
-            'HDTV': 20,
-            'DVDRip': 10,
-        }
-        if info['source']:
-            score += source_scores.get(info['source'], 0)
-        
-        # 编码分数
-        codec_scores = {
-            'H.265': 10, 'H265': 10, 'HEVC': 10, 'x265': 10,
-            'AV1': 15,
-            'H.264': 5, 'H264': 5, 'x264': 5, 'AVC': 5,
-        }
-        if info['video_codec']:
-            score += codec_scores.get(info['video_codec'], 0)
-        
-        # HDR 加分
-        hdr_scores = {
-            'HDR10+': 20,
-            'HDR10': 15,
-            'Dolby Vision': 25, 'DV': 25,
-            'HLG': 10,
-        }
-        if info['hdr']:
-            score += hdr_scores.get(info['hdr'], 0)
-        
-        # 音频编码加分
-        audio_scores = {
-            'TrueHD': 10,
-            'DTS-HD': 8,
-            'Atmos': 12,
-            'DTS': 5,
-            'AC3': 3, 'AC-3': 3,
-            'AAC': 2,
-        }
-        if info['audio_codec']:
-            score += audio_scores.get(info['audio_codec'], 0)
+        from core.quality_scorer import get_quality_scorer
         
-        return score
+        return get_quality_scorer().score(info, profile)
 
 
 # 全局实例
@@ -322,5 +499,11 @@ def get_advanced_recognizer() -> AdvancedRecognizer:
     """获取高级识别器实例（单例）"""
     global _advanced_recognizer
     if _advanced_recognizer is None:
-        _advanced_recognizer = AdvancedRecognizer()
+        from core.config import get_config
+        
+        config = get_config()
+        _advanced_recognizer = AdvancedRecognizer(
+            strip_release_groups=bool(config.get('strip_release_groups', False)),
+            anime_mode=bool(config.get('anime_recognition', True))
+        )
     return _advanced_recognizer
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动漫文件名识别
+移植自 MoviePilot 的 MetaAnime（reference/moviepilot/MoviePilot-2/app/core/meta/metaanime.py），
+不依赖 anitopy / zhconv：预处理规则保持一致，括号分段解析改为预编译正则
+
+字幕组命名（[LoliHouse] Title - 12 [1080p]、【喵萌奶茶屋】[Title][12][1080p]）的集号
+在括号结构中，通用模式 [\s._-](\d{2,3})[\s._-] 会把 " - 12 " 之外的数字（如分辨率、
+标题中的数字）误识别为集号；looks_like_anime 先做一次廉价的括号结构检查，
+只有字幕组结构的文件名才走动漫解析。
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 预处理（MetaAnime.__prepare_title）
+_SEASONAL_RE = re.compile(r"新番|月?番|[日美国][漫剧]")
+_SEASONAL_PREFIX_RE = re.compile(r".*番.|.*[日美国][漫剧].")
+_CATEGORY_RE = re.compile(
+    r"[动動漫画畫纪紀录錄片电電影视視连連续續剧劇集日美韩韓中港台海外亚亞洲华華语語大陆陸综綜艺藝原盘盤高清]{2,}"
+    r"|TV|Animation|Movie|Documentar|Anime",
+    re.IGNORECASE
+)
+_FIRST_BRACKET_RE = re.compile(r"^[^]]*]")
+_SIZE_RE = re.compile(r'[0-9.]+\s*[MGT]i?B(?![A-Z]+)', re.IGNORECASE)
+_TV_EPISODE_RE = re.compile(r"\[TV\s+(\d{1,4})", re.IGNORECASE)
+_4K_RE = re.compile(r'\[4k]', re.IGNORECASE)
+
+# 括号结构：[...] 或括号外的文本
+_SEGMENT_RE = re.compile(r'\[([^\[\]]*)\]?|([^\[\]]+)')
+
+# 括号内的集号：[12]、[12v2]、[12END]、[第12话]、[TV 12]（已预处理为 [12]）
+_BRACKET_EPISODE_RE = re.compile(r'^(?:第)?(\d{1,4})(?:v\d)?(?:[话話集])?(?:\s*END)?$', re.IGNORECASE)
+# 括号内的合集范围：[01-12]、[01~12 Fin]
+_BRACKET_RANGE_RE = re.compile(r'^(\d{1,4})\s*[-~]\s*(\d{1,4})(?:\s*(?:END|Fin))?', re.IGNORECASE)
+# 括号外的 "标题 - 12"、"标题 - 12v2 END"、"标题 - 01-12"（19xx/20xx 视为年份，见 parse_anime）
+_DASH_EPISODE_RE = re.compile(
+    r'^(.*?)\s+-\s+(\d{1,4})(?:\s*[-~]\s*\d{1,4})?(?:v\d)?(?:\s*END)?(?=\s|$)(.*)$',
+    re.IGNORECASE
+)
+# 括号外的 "标题 第12话" / "标题 EP12"
+_TEXT_EPISODE_RE = re.compile(r'^(.*?)\s*(?:第(\d{1,4})[话話集]|\bEP?(\d{1,4})\b)(.*)$', re.IGNORECASE)
+
+# 分辨率：1080p、1920x1080、1080P
+_RESOLUTION_RE = re.compile(r'(?<![0-9])(\d{3,4})[pP](?![0-9A-Za-z])|(?<![0-9])\d{3,4}\s*[xX×]\s*(\d{3,4})(?![0-9])')
+_YEAR_RE = re.compile(r'^(19\d{2}|20\d{2})$')
+
+# 元数据括号（编码、语言、格式、字幕组招募等），不会被当作标题
+_META_RE = re.compile(
+    r'(?<![A-Za-z])(?:\d{3,4}[pPiI]|\d{3,4}\s*[xX×]\s*\d{3,4}|[xXhH]\.?26[45]|HEVC|AVC|AV1|10[- ]?bit|8[- ]?bit|Hi10P'
+    r'|AAC|FLAC|AC-?3|DTS|OPUS|MP4|MKV|WEB-?DL|WEB-?Rip|BD-?Rip|Blu-?Ray|BDMV|Baha|CR|B-Global|Bilibili'
+    r'|CHS|CHT|GB|BIG5|JPN?|ENG|JPSC|JPTC|SRT|ASS|PGS)(?![A-Za-z])'
+    r'|简|繁|中文|日语|日文|双语|雙語|内嵌|內嵌|内封|內封|外挂|字幕|招募|合集|新番|月番',
+    re.IGNORECASE
+)
+
+# 标题中的季号：S2、Season 2、2nd Season、第二季
+_SEASON_PATTERNS = (
+    re.compile(r'\s+S(\d{1,2})$', re.IGNORECASE),
+    re.compile(r'\s*\bSeason\s*(\d{1,2})\b', re.IGNORECASE),
+    re.compile(r'\s*\b(\d{1,2})(?:st|nd|rd|th)\s+Season\b', re.IGNORECASE),
+    re.compile(r'\s*第([一二三四五六七八九十\d]{1,3})季'),
+)
+_NAME_NOSTRING_RE = re.compile(
+    r"S\d{2}\s*-\s*S\d{2}|S\d{2}|\s+S\d{1,2}|EP?\d{2,4}\s*-\s*EP?\d{2,4}|EP?\d{2,4}|\s+EP?\d{1,4}|\s+GB",
+    re.IGNORECASE
+)
+_CHINESE_RE = re.compile(r'[一-鿿]')
+_CHINESE_DIGITS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+
+# 不能作为标题的名称（MetaAnime._anime_no_words）
+_NO_WORDS = frozenset(('CHS&CHT', 'MP4', 'GB MP4', 'WEB-DL'))
+
+_VIDEO_EXTENSIONS = frozenset(('mkv', 'mp4', 'avi', 'mov', 'wmv', 'flv', 'm4v', 'ts', 'rmvb', 'webm'))
+
+
+def _strip_extension(name: str) -> str:
+    """移除视频扩展名"""
+    if '.' in name:
+        stem, ext = name.rsplit('.', 1)
+        if ext.lower() in _VIDEO_EXTENSIONS:
+            return stem
+    return name
+
+
+def looks_like_anime(filename: str) -> bool:
+    """
+    廉价的括号结构检查：是否为字幕组命名
+    
+    以 [ 或【 开头，且含有 " - 数字" 或只含数字的括号（集号）
+    """
+    if not filename or filename[0] not in '[【':
+        return False
+    close = filename.find(']' if filename[0] == '[' else '】')
+    if close <= 1:
+        return False
+    rest = filename[close + 1:]
+    if ' - ' in rest:
+        index = rest.find(' - ')
+        while index >= 0:
+            if rest[index + 3:index + 4].isdigit():
+                return True
+            index = rest.find(' - ', index + 1)
+    index = rest.find('[')
+    while index >= 0:
+        end = rest.find(']', index)
+        if end < 0:
+            break
+        inner = rest[index + 1:end]
+        if inner and (inner.isdigit() or _BRACKET_EPISODE_RE.match(inner) or _BRACKET_RANGE_RE.match(inner)):
+            return True
+        index = rest.find('[', end)
+    return False
+
+
+def prepare_title(title: str) -> str:
+    """命名预处理（与 MetaAnime.__prepare_title 一致，繁简转换改为繁简字符并列）"""
+    if not title:
+        return title
+    # 所有【】换成[]
+    title = title.replace("【", "[").replace("】", "]").strip()
+    # 截掉xx番剧漫
+    match = _SEASONAL_RE.search(title)
+    if match and match.span()[1] < len(title) - 1:
+        title = _SEASONAL_PREFIX_RE.sub("", title)
+    elif match:
+        title = title[:title.rfind('[')]
+    # 截掉分类
+    first_item = title.split(']')[0]
+    if first_item and _CATEGORY_RE.search(first_item):
+        title = _FIRST_BRACKET_RE.sub("", title).strip()
+    # 去掉大小
+    title = _SIZE_RE.sub("", title)
+    # 将TVxx改为xx
+    title = _TV_EPISODE_RE.sub(r"[\1", title)
+    # 将4K转为2160p
+    title = _4K_RE.sub('2160p', title)
+    return title
+
+
+def _segments(title: str) -> List[Tuple[str, bool]]:
+    """拆分为 (内容, 是否在括号内) 片段"""
+    parts = []
+    for match in _SEGMENT_RE.finditer(title):
+        bracket, text = match.groups()
+        if bracket is not None:
+            if bracket.strip():
+                parts.append((bracket.strip(), True))
+        elif text and text.strip():
+            parts.append((text.strip(), False))
+    return parts
+
+
+def _season_number(value: str) -> Optional[int]:
+    """季号（阿拉伯数字或十以内的中文数字）"""
+    if value.isdigit():
+        return int(value)
+    if value == '十':
+        return 10
+    if len(value) == 1:
+        return _CHINESE_DIGITS.get(value)
+    if len(value) == 2 and value[0] == '十':
+        ones = _CHINESE_DIGITS.get(value[1])
+        return 10 + ones if ones else None
+    return None
+
+
+def _pick_name(name: str) -> str:
+    """/ 分隔的多语言标题：优先中文名（可省去中文标题查询），否则取最后一个"""
+    if '/' not in name:
+        return name
+    names = [part.strip() for part in name.split('/') if part.strip()]
+    if not names:
+        return name
+    for part in names:
+        if _CHINESE_RE.search(part):
+            return part
+    return names[-1]
+
+
+def _clean_name(name: str) -> Tuple[str, Optional[int]]:
+    """清理标题并提取其中的季号"""
+    name = _pick_name(name)
+    season = None
+    for pattern in _SEASON_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            season = _season_number(match.group(1))
+            name = name[:match.start()] + name[match.end():]
+            break
+    name = _NAME_NOSTRING_RE.sub('', name)
+    name = ' '.join(name.replace('_', ' ').split()).strip(' -_.:：')
+    return name, season
+
+
+def _is_title_candidate(text: str) -> bool:
+    """括号内容能否作为标题"""
+    if text in _NO_WORDS or text.isdigit():
+        return False
+    if _YEAR_RE.match(text) or _BRACKET_RANGE_RE.match(text):
+        return False
+    if _META_RE.search(text):
+        return False
+    return len(text) >= 2 or bool(_CHINESE_RE.search(text))
+
+
+def parse_anime(filename: str) -> Optional[Dict[str, Any]]:
+    """
+    解析字幕组命名的文件名
+    
+    Args:
+        filename: 文件名
+    
+    Returns:
+        {'title', 'season', 'episode', 'end_episode', 'resolution', 'year', 'release_group'}，
+        未识别到集号时返回 None（交给通用识别）
+    """
+    title = prepare_title(_strip_extension(filename))
+    parts = _segments(title)
+    if not parts:
+        return None
+    
+    info = {
+        'title': None,
+        'season': None,
+        'episode': None,
+        'end_episode': None,
+        'resolution': None,
+        'year': None,
+        'release_group': None,
+    }
+    
+    # 第一个括号是字幕组（不是集号/元数据时）
+    start = 0
+    if parts[0][1] and not _BRACKET_EPISODE_RE.match(parts[0][0]) and not _META_RE.fullmatch(parts[0][0]):
+        info['release_group'] = parts[0][0]
+        start = 1
+    
+    candidates = []
+    for text, bracketed in parts[start:]:
+        if bracketed:
+            # [2023] 是年份，不是集号（先于集号检查）
+            if _YEAR_RE.match(text):
+                info['year'] = info['year'] or text
+                continue
+            match = _BRACKET_EPISODE_RE.match(text)
+            if match:
+                if info['episode'] is None:
+                    info['episode'] = int(match.group(1))
+                continue
+            match = _BRACKET_RANGE_RE.match(text)
+            if match:
+                if info['episode'] is None:
+                    info['episode'] = int(match.group(1))
+                    info['end_episode'] = int(match.group(2))
+                continue
+            resolution = _RESOLUTION_RE.search(text)
+            if resolution and info['resolution'] is None:
+                info['resolution'] = (resolution.group(1) or resolution.group(2)) + 'p'
+            if _is_title_candidate(text):
+                candidates.append(text)
+            continue
+        
+        # 括号外文本："标题 - 12 ..." / "标题 第12话" / 纯标题
+        match = _DASH_EPISODE_RE.match(text)
+        if match:
+            if match.group(1).strip():
+                candidates.insert(0, match.group(1))
+            if _YEAR_RE.match(match.group(2)):
+                # "标题 - 2023" 是年份（没有其他集号时交给通用识别）
+                info['year'] = info['year'] or match.group(2)
+            elif info['episode'] is None:
+                info['episode'] = int(match.group(2))
+            rest = match.group(3)
+        else:
+            match = _TEXT_EPISODE_RE.match(text)
+            if match and info['episode'] is None:
+                if match.group(1).strip():
+                    candidates.insert(0, match.group(1))
+                info['episode'] = int(match.group(2) or match.group(3))
+                rest = match.group(4)
+            else:
+                if text.strip(' -') and _is_title_candidate(text.strip(' -')):
+                    candidates.append(text)
+                rest = ''
+        resolution = _RESOLUTION_RE.search(rest) if rest else None
+        if resolution and info['resolution'] is None:
+            info['resolution'] = (resolution.group(1) or resolution.group(2)) + 'p'
+    
+    if info['episode'] is None:
+        return None
+    
+    # 与 MetaAnime 一致：找不到标题时取第一个括号的内容（预处理截掉字幕组后，它就是标题）
+    if info['release_group'] and _is_title_candidate(info['release_group']):
+        candidates.append(info['release_group'])
+    
+    for candidate in candidates:
+        name, season = _clean_name(candidate)
+        if name and name not in _NO_WORDS:
+            info['title'] = name
+            info['season'] = season
+            if candidate is info['release_group']:
+                info['release_group'] = None
+            break
+    return info
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步元数据解析引擎
+批量识别时先离线解析全部文件名，再用 asyncio 并发查询所有不同的标题：
+- 每个提供方（豆瓣、TMDB）单独限制进行中的请求数
+- 每个提供方可挂一个 RateLimiter，请求前按限制器给出的等待时间异步等待配额
+- 同一标题只查询一次（与同步解析器共用单飞：同时在其他线程中查询的标题同样只查询一次），结果按输入顺序返回
+- 开启对冲查询时，豆瓣超过对冲等待时间仍未返回就同时查询 TMDB，先得到中文结果的一方胜出
+
+提供方查询仍使用 ChineseTitleResolver 的同步实现（共用连接池、持久化缓存和统计），
+在线程池中执行，因此不需要额外的异步 HTTP 依赖。元数据缓存和本地标题索引（SQLite）
+的读写同样在线程中执行，不阻塞事件循环。
+"""
+
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from core.chinese_title_resolver import ChineseTitleResolver, IntegratedRecognizer
+from core.metadata_cache import MISS
+from core.rate_limiter import RateLimiter
+from core.recognition_result import RecognitionResult
+from core.title_key import canonical_key
+
+
+# 每个提供方默认的最大并发请求数
+DEFAULT_CONCURRENCY = {'douban': 2, 'tmdb': 8}
+
+# 等待速率配额的最短休眠时间（秒）
+MIN_RATE_WAIT = 0.001
+
+# 标题查询键：(标题, 年份, 是否为电视剧)
+TitleQuery = Tuple[str, Any, bool]
+
+
+class AsyncTitleResolver:
+    """异步中文标题解析器（包装 ChineseTitleResolver）"""
+    
+    def __init__(
+        self,
+        resolver: ChineseTitleResolver,
+        concurrency: Optional[Dict[str, int]] = None,
+        rate_limiters: Optional[Dict[str, RateLimiter]] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        初始化解析器
+        
+        Args:
+            resolver: 同步解析器（提供查询实现、缓存和统计）
+            concurrency: 提供方 -> 最大并发请求数
+            rate_limiters: 提供方 -> 速率限制器（可选）
+            executor: 执行同步查询的线程池（默认按总并发数创建，由本对象负责关闭）
+        """
+        self.resolver = resolver
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.rate_limiters = rate_limiters or {}
+        self._close_executor = None
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, sum(self.concurrency.values())),
+                thread_name_prefix='title-resolver'
+            )
+            # 未显式关闭时随本对象回收（或进程退出）关闭线程池
+            self._close_executor = weakref.finalize(self, executor.shutdown, wait=False)
+        self.executor = executor
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+    
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """提供方的并发信号量（每个事件循环重新创建）"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(max(1, self.concurrency.get(provider, 1)))
+        return semaphore
+    
+    async def _acquire_rate(self, provider: str):
+        """异步等待提供方的速率配额（按限制器给出的等待时间休眠，不轮询）"""
+        limiter = self.rate_limiters.get(provider)
+        if limiter is None:
+            return
+        # 限制器可能与其他线程共用：等待后仍可能被抢先，重新计算等待时间
+        while not limiter.allow():
+            await asyncio.sleep(max(limiter.get_wait_time(), MIN_RATE_WAIT))
+    
+    @staticmethod
+    async def _run_local(func, *args):
+        """
+        在事件循环的默认线程池中执行元数据缓存和本地索引的同步调用
+        （不占用提供方查询的线程池，不会排在慢速网络请求之后）
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _query(self, provider: str, query, title: str, year: Any, is_tv: bool) -> Tuple[Optional[str], bool]:
+        """受并发和速率限制的单次提供方查询"""
+        async with self._semaphore(provider):
+            await self._acquire_rate(provider)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self.resolver._call_provider, provider, query, title, year, is_tv
+            )
+    
+    async def _query_hedged(self, providers, title: str, year: Any, is_tv: bool) -> Tuple[Optional[str], bool]:
+        """对冲查询（语义与 ChineseTitleResolver._query_hedged 相同，落败的任务被取消）"""
+        resolver = self.resolver
+        (primary, primary_query), (secondary, secondary_query) = providers[:2]
+        delay = resolver._hedge_delay(primary)
+        
+        tasks = {asyncio.ensure_future(self._query(primary, primary_query, title, year, is_tv)): primary}
+        pending = set(tasks)
+        launched = False
+        results: Dict[str, Optional[str]] = {}
+        failed = False
+        
+        while pending or not launched:
+            done, pending = await asyncio.wait(
+                pending, timeout=None if launched else delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                provider = tasks[task]
+                value, provider_failed = task.result()
+                failed = failed or provider_failed
+                if resolver._is_chinese(value):
+                    for loser in pending:
+                        loser.cancel()
+                    if provider == secondary and pending:
+                        with resolver._stats_lock:
+                            resolver.hedge_wins += 1
+                    return value, failed
+                results[provider] = value
+            
+            # 主提供方超时或没有中文结果：查询备用提供方
+            if not launched:
+                launched = True
+                if pending:
+                    with resolver._stats_lock:
+                        resolver.hedged_queries += 1
+                task = asyncio.ensure_future(self._query(secondary, secondary_query, title, year, is_tv))
+                tasks[task] = secondary
+                pending.add(task)
+        
+        return results.get(primary) or results.get(secondary), failed
+    
+    async def resolve(self, title: str, year: Any = None, is_tv: bool = False) -> Optional[str]:
+        """
+        解析单个英文标题为中文标题（语义与 ChineseTitleResolver.resolve 相同）
+        
+        Args:
+            title: 英文标题
+            year: 年份
+            is_tv: 是否为电视剧
+        
+        Returns:
+            中文标题，查询失败返回 None
+        """
+        resolver = self.resolver
+        if resolver._is_chinese(title):
+            return title
+        
+        cached = await self._run_local(resolver._resolve_offline, title, year, is_tv)
+        if cached is not MISS:
+            return cached
+        
+        if not resolver.douban_cookie and not resolver.tmdb_api_key:
+            return await self._run_local(resolver._index_fallback, title, year, is_tv)
+        
+        chinese_title, _ = await resolver.single_flight.do_async(
+            canonical_key(title, year, is_tv),
+            lambda: self._lookup(title, year, is_tv)
+        )
+        return chinese_title
+    
+    async def _lookup(self, title: str, year: Any, is_tv: bool) -> Optional[str]:
+        """在线查询并写入缓存（单飞执行者；查询前后的处理与 ChineseTitleResolver._lookup 共用）"""
+        resolver = self.resolver
+        value, providers = await self._run_local(resolver._begin_lookup, title, year, is_tv)
+        if not providers:
+            return value
+        
+        started = time.perf_counter()
+        if resolver.hedge and len(providers) > 1:
+            chinese_title, failed = await self._query_hedged(providers, title, year, is_tv)
+        else:
+            # 按优先级依次查询，失败或无结果时使用下一个提供方（与同步实现一致）
+            chinese_title, failed = None, False
+            for provider, query in providers:
+                chinese_title, provider_failed = await self._query(provider, query, title, year, is_tv)
+                failed = failed or provider_failed
+                if chinese_title:
+                    break
+        return await self._run_local(resolver._finish_lookup, title, year, is_tv, chinese_title, failed, started)
+    
+    async def resolve_many(self, queries: Sequence[TitleQuery]) -> List[Optional[str]]:
+        """
+        并发解析一批标题（相同标题只查询一次）
+        
+        Args:
+            queries: (标题, 年份, 是否为电视剧) 序列
+        
+        Returns:
+            中文标题列表（与输入顺序一致）
+        """
+        unique: Dict[Hashable, TitleQuery] = {}
+        keys = []
+        for title, year, is_tv in queries:
+            key = canonical_key(title, year, is_tv)
+            unique.setdefault(key, (title, year, is_tv))
+            keys.append(key)
+        
+        values = await asyncio.gather(*(self.resolve(*query) for query in unique.values()))
+        resolved = dict(zip(unique, values))
+        return [resolved[key] for key in keys]
+    
+    def close(self):
+        """关闭线程池（传入的线程池由调用方负责关闭）"""
+        if self._close_executor is not None:
+            self._close_executor()
+
+
+class AsyncIntegratedRecognizer:
+    """异步集成识别器：离线解析 + 并发标题查询"""
+    
+    def __init__(self, recognizer: IntegratedRecognizer, **options):
+        """
+        初始化识别器
+        
+        Args:
+            recognizer: 同步集成识别器（共用识别器、结果缓存和标题解析器）
+            **options: 传给 AsyncTitleResolver 的参数（concurrency、rate_limiters、executor）
+        """
+        self.recognizer = recognizer
+        self.title_resolver = AsyncTitleResolver(recognizer.title_resolver, **options)
+    
+    async def recognize_many(
+        self,
+        filenames: Iterable[str],
+        convert_chinese_number: bool = True
+    ) -> List[RecognitionResult]:
+        """
+        批量识别文件并并发获取中文标题
+        
+        Args:
+            filenames: 文件名序列
+            convert_chinese_number: 是否转换中文数字
+        
+        Returns:
+            识别结果列表（与输入顺序一致）
+        """
+        from core.advanced_recognizer import copy_result
+        
+        recognizer = self.recognizer
+        filenames = list(filenames)
+        
+        # 1. 离线解析并按身份分组（结果缓存命中的文件直接使用）
+        infos, groups = recognizer._parse_batch(filenames, convert_chinese_number)
+        
+        # 2. 每个身份并发查询一次，再写回组内所有文件
+        titles = {}
+        if groups:
+            values = await self.title_resolver.resolve_many([query for query, _ in groups.values()])
+            titles = dict(zip(groups, values))
+        recognizer._fan_out(infos, groups, titles, convert_chinese_number)
+        
+        return [copy_result(infos[filename]) for filename in filenames]
+    
+    def recognize_many_sync(self, filenames: Iterable[str], convert_chinese_number: bool = True) -> List[RecognitionResult]:
+        """
+        同步调用入口（当前线程已有运行中的事件循环时退回逐个查询）
+        
+        Args:
+            filenames: 文件名序列
+            convert_chinese_number: 是否转换中文数字
+        
+        Returns:
+            识别结果列表（与输入顺序一致）
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.recognize_many(filenames, convert_chinese_number))
+        return self.recognizer.recognize_many_with_chinese_title(filenames, convert_chinese_number)
+    
+    def close(self):
+        """关闭线程池"""
+        self.title_resolver.close()
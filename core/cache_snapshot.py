@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存快照
+把元数据缓存（标题、作品、别名）和识别结果缓存导出为可移植的压缩文件（gzip JSON Lines），
+在新节点或重启后的容器中导入，避免冷启动时集中请求 TMDB/豆瓣
+
+文件格式：第一行为文件头，之后每行一条记录 [类型, 字段...]：
+    {"format": "media-renamer-cache", "version": 3, "key_version": 3, "created_at": 1700000000.0}
+    ["entries", key, value, created_at, expires_at]
+    ["media", provider, media_id, is_tv, title, details, updated_at, expires_at]
+    ["aliases", key, provider, media_id, is_tv]
+    ["results", filename, convert_chinese_number, {识别结果}, created_at]
+
+识别结果中的中文标题来自元数据缓存，按写入识别结果缓存的时间（created_at）与正向结果相同的
+有效期判断过期，导入时跳过已过期的结果（导入后保留原来的时间，反复导出导入不会延长有效期）。
+version 2 的快照没有逐条时间，按文件头的 created_at 计算。
+
+导出和导入都逐行流式处理，导入按批写入，内存占用与缓存大小无关。
+
+标题和别名的键由 core.title_key 生成，文件头记录键版本（version 1 的快照没有记录）。
+键版本与当前不一致时只导入按作品 ID 保存的 media 记录，按旧规则生成的 entries / aliases
+和用旧键查询得到的 results 跳过（规范化不可逆，无法转换为新键）。
+"""
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.metadata_cache import SNAPSHOT_TABLES
+from core.recognition_result import RecognitionResult
+from core.title_key import KEY_VERSION
+
+
+SNAPSHOT_FORMAT = "media-renamer-cache"
+SNAPSHOT_VERSION = 3
+DEFAULT_SNAPSHOT_PATH = "data/cache_snapshot.jsonl.gz"
+CHUNK_SIZE = 5000
+
+
+def _dump_line(record: Any) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def export_snapshot(path: str, cache=None, recognizer=None) -> Dict[str, int]:
+    """
+    导出缓存快照（先写临时文件，完成后替换，导出中断不会留下不完整的快照）
+    
+    Args:
+        path: 快照文件路径
+        cache: 元数据缓存（默认使用全局实例）
+        recognizer: 集成识别器（导出其识别结果缓存，可选）
+    
+    Returns:
+        各类型导出的记录数
+    """
+    if cache is None:
+        from core.metadata_cache import get_metadata_cache
+        cache = get_metadata_cache()
+    
+    counts = {kind: 0 for kind in SNAPSHOT_TABLES}
+    counts['results'] = 0
+    
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        f.write(_dump_line({
+            'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION, 'key_version': KEY_VERSION, 'created_at': time.time(),
+        }))
+        for kind, row in cache.export_rows(CHUNK_SIZE):
+            f.write(_dump_line([kind, *row]))
+            counts[kind] += 1
+        if recognizer is not None:
+            for (filename, convert), info, created_at in recognizer.result_cache.timed_items():
+                f.write(_dump_line(['results', filename, convert, info.to_dict(), created_at]))
+                counts['results'] += 1
+    os.replace(tmp_path, path)
+    return counts
+
+
+def import_snapshot(path: str, cache=None, recognizer=None, chunk_size: int = CHUNK_SIZE,
+                    kinds: Optional[Iterable[str]] = None, result_ttl: Optional[float] = None) -> Dict[str, int]:
+    """
+    导入缓存快照（逐行读取，按批写入）
+    
+    Args:
+        path: 快照文件路径
+        cache: 元数据缓存（默认使用全局实例）
+        recognizer: 集成识别器（导入识别结果缓存，可选）
+        chunk_size: 每批写入的记录数
+        kinds: 只导入这些类型（SNAPSHOT_TABLES 的键或 results，默认全部）
+        result_ttl: 识别结果的有效期（秒，默认与元数据缓存的正向结果相同）
+    
+    Returns:
+        各类型导入的记录数（已过期的记录不计入）
+    """
+    if cache is None:
+        from core.metadata_cache import get_metadata_cache
+        cache = get_metadata_cache()
+    
+    counts = {kind: 0 for kind in SNAPSHOT_TABLES}
+    counts['results'] = 0
+    pending: Dict[str, List[tuple]] = {kind: [] for kind in SNAPSHOT_TABLES}
+    wanted = set(kinds) if kinds is not None else set(counts)
+    if result_ttl is None:
+        result_ttl = cache.positive_ttl
+    now = time.time()
+    
+    def flush(kind: str):
+        counts[kind] += cache.import_rows(kind, pending[kind])
+        pending[kind] = []
+    
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline() or '{}')
+        if header.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"不是缓存快照文件: {path}")
+        if header.get('version', 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"快照版本过新: {header.get('version')}")
+        
+        # 版本 1 的快照按键版本 2 导出
+        key_version = header.get('key_version', 2)
+        if key_version != KEY_VERSION:
+            print(f"ℹ 快照的键版本为 {key_version}，当前为 {KEY_VERSION}，只导入按作品 ID 保存的元数据")
+        snapshot_created = header.get('created_at', 0)
+        skipped = 0
+        expired = 0
+        
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record[0]
+            if kind not in wanted:
+                continue
+            if key_version != KEY_VERSION and kind != 'media':
+                skipped += 1
+                continue
+            if kind in pending:
+                pending[kind].append(tuple(record[1:]))
+                if len(pending[kind]) >= chunk_size:
+                    flush(kind)
+            elif kind == 'results' and recognizer is not None:
+                filename, convert, data = record[1:4]
+                created_at = record[4] if len(record) > 4 else snapshot_created
+                if created_at + result_ttl <= now:
+                    expired += 1
+                    continue
+                recognizer.result_cache.put((filename, convert), RecognitionResult.from_dict(data), created_at)
+                counts['results'] += 1
+    
+    # 按表的先后顺序写入剩余记录
+    for kind in SNAPSHOT_TABLES:
+        if pending[kind]:
+            flush(kind)
+    if skipped:
+        print(f"  跳过旧键记录: {skipped} 条")
+    if expired:
+        print(f"  跳过过期识别结果: {expired} 条")
+    return counts
+
+
+def get_snapshot_path() -> str:
+    """配置中的快照路径（Web 启动加载、退出时保存）"""
+    from core.config import get_config
+    
+    return get_config().get('cache_snapshot_path', DEFAULT_SNAPSHOT_PATH) or DEFAULT_SNAPSHOT_PATH
+
+
+def load_snapshot_on_start(recognizers=()) -> Optional[Dict[str, int]]:
+    """
+    启动时加载快照（文件不存在或加载失败时返回 None，不影响启动）
+    
+    Args:
+        recognizers: 需要预热识别结果缓存的集成识别器
+    
+    Returns:
+        导入的记录数
+    """
+    path = get_snapshot_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        started = time.time()
+        recognizers = list(recognizers)
+        counts = import_snapshot(path, recognizer=recognizers[0] if recognizers else None)
+        
+        # 其余识别器直接复制已导入的识别结果（保留写入时间）
+        for recognizer in recognizers[1:]:
+            for key, info, created_at in recognizers[0].result_cache.timed_items():
+                recognizer.result_cache.put(key, info.copy(), created_at)
+        print(f"✓ 已加载缓存快照: {path} ({sum(counts.values())} 条, {time.time() - started:.1f}秒)")
+        return counts
+    except Exception as e:
+        print(f"⚠ 缓存快照加载失败: {e}")
+        return None
+
+
+def save_snapshot_on_exit(recognizer=None) -> Optional[Dict[str, int]]:
+    """
+    退出时保存快照（失败时只打印警告）
+    
+    Args:
+        recognizer: 导出识别结果缓存的集成识别器
+    
+    Returns:
+        导出的记录数
+    """
+    from core.config import get_config
+    
+    if not get_config().get('cache_snapshot_on_exit', True):
+        return None
+    path = get_snapshot_path()
+    try:
+        counts = export_snapshot(path, recognizer=recognizer)
+        print(f"✓ 已保存缓存快照: {path} ({sum(counts.values())} 条)")
+        return counts
+    except Exception as e:
+        print(f"⚠ 缓存快照保存失败: {e}")
+        return None
@@ -6,8 +6,11 @@
 """
 
 import re
+from functools import lru_cache
 from typing import Optional, Union
 
+from core.lru_cache import LRUCache
+
 
 # 中文数字映射
 CHINESE_DIGITS = {
@@ -19,19 +22,94 @@ CHINESE_DIGITS = {
     '拾': 10, '佰': 100, '仟': 1000, '萬': 10000,
 }
 
+# 可能触发转换的字符（cn2an 还会转换“两”）；文件名不含这些字符时直接跳过
+NUMERAL_CHARS = frozenset(CHINESE_DIGITS) | {'两'}
+
+# 内置转换器匹配的数字串（不以零开头，与旧版一样不转换大写数字）
+_NUMERAL_RUN = re.compile(r'[一二三四五六七八九十百千万][零〇一二三四五六七八九十百千万]*')
+
+# 转换结果缓存容量（按整个文本缓存）
+CONVERT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=1024)
+def chinese_to_number(chinese: str) -> Optional[int]:
+    """
+    中文数字转阿拉伯数字（查表解析，支持十/百/千/万组合）
+    
+    例：十五 → 15，二十 → 20，一百零五 → 105，三千 → 3000，一万五 → 15000
+    
+    Args:
+        chinese: 中文数字
+    
+    Returns:
+        阿拉伯数字；不是合法数字（如 一一、千、百万）或值为 0 时返回 None
+    """
+    if not chinese:
+        return None
+    
+    total = 0         # 万及以上部分
+    section = 0       # 万以下部分
+    digit = None      # 等待单位的数字
+    last_unit = 0     # 上一个单位（用于 一百二 → 120 这类省略写法）
+    zero = False      # 上一个单位后是否出现过零
+    for char in chinese:
+        value = CHINESE_DIGITS.get(char)
+        if value is None:
+            return None
+        if value < 10:
+            # 连续两个数字（一一、二零一九）不是数值写法
+            if digit is not None:
+                return None
+            if value == 0:
+                zero = True
+            else:
+                digit = value
+            continue
+        
+        if value == 10000:
+            section += digit or 0
+            if not section:
+                return None
+            total += section * 10000
+            section = 0
+        else:
+            # 只有“十”可以省略前面的一（十五）
+            if digit is None:
+                if value != 10:
+                    return None
+                digit = 1
+            # 单位必须从大到小（十百 不合法）
+            if last_unit and value >= last_unit:
+                return None
+            section += digit * value
+        digit = None
+        last_unit = value
+        zero = False
+    
+    if digit is not None:
+        # 一百二 = 120、一万五 = 15000（中间有零时为个位：一百零二 = 102）
+        if last_unit >= 100 and not zero:
+            digit *= last_unit // 10
+        section += digit
+    number = total + section
+    return number or None
+
 
 class ChineseNumber:
     """中文数字转换器"""
     
-    def __init__(self, use_cn2an: bool = True):
+    def __init__(self, use_cn2an: bool = True, cache_size: int = CONVERT_CACHE_SIZE):
         """
         初始化转换器
         
         Args:
             use_cn2an: 是否使用 cn2an 库（如果可用）
+            cache_size: 转换结果缓存条目数（0 表示不缓存）
         """
         self.use_cn2an = use_cn2an
         self.cn2an_available = False
+        self.cache = LRUCache(cache_size)
         
         if use_cn2an:
             try:
@@ -52,14 +130,19 @@ class ChineseNumber:
         Returns:
             转换后的文本
         """
-        if not text:
+        # 快速路径：纯 ASCII 或不含中文数字字符的文本原样返回
+        if not text or text.isascii() or NUMERAL_CHARS.isdisjoint(text):
             return text
         
-        # 优先使用 cn2an
-        if self.cn2an_available:
-            return self._convert_with_cn2an(text)
-        else:
-            return self._convert_builtin(text)
+        result = self.cache.get(text)
+        if result is None:
+            # 优先使用 cn2an
+            if self.cn2an_available:
+                result = self._convert_with_cn2an(text)
+            else:
+                result = self._convert_builtin(text)
+            self.cache.put(text, result)
+        return result
     
     def _convert_with_cn2an(self, text: str) -> str:
         """使用 cn2an 库转换"""
@@ -72,103 +155,17 @@ class ChineseNumber:
             return self._convert_builtin(text)
     
     def _convert_builtin(self, text: str) -> str:
-        """使用内置转换器"""
-        result = text
-        
-        # 常见模式
-        patterns = [
-            # 第X季/集/部
-            (r'第([一二三四五六七八九十]+)季', self._replace_season),
-            (r'第([一二三四五六七八九十]+)集', self._replace_episode),
-            (r'第([一二三四五六七八九十]+)部', self._replace_part),
-            
-            # 单独的数字
-            (r'([一二三四五六七八九十百千万]+)', self._replace_number),
-        ]
-        
-        for pattern, replacer in patterns:
-            result = re.sub(pattern, replacer, result)
-        
-        return result
-    
-    def _replace_season(self, match) -> str:
-        """替换季数"""
-        chinese = match.group(1)
-        number = self._chinese_to_number(chinese)
-        return f'第{number}季' if number else match.group(0)
-    
-    def _replace_episode(self, match) -> str:
-        """替换集数"""
-        chinese = match.group(1)
-        number = self._chinese_to_number(chinese)
-        return f'第{number}集' if number else match.group(0)
-    
-    def _replace_part(self, match) -> str:
-        """替换部数"""
-        chinese = match.group(1)
-        number = self._chinese_to_number(chinese)
-        return f'第{number}部' if number else match.group(0)
+        """使用内置转换器（一次扫描替换所有数字串，第X季/集/部 随之转换）"""
+        return _NUMERAL_RUN.sub(self._replace_number, text)
     
     def _replace_number(self, match) -> str:
         """替换数字"""
-        chinese = match.group(1)
-        
-        # 跳过非数字的中文
-        if not any(c in CHINESE_DIGITS for c in chinese):
-            return match.group(0)
-        
-        number = self._chinese_to_number(chinese)
+        number = chinese_to_number(match.group(0))
         return str(number) if number else match.group(0)
     
     def _chinese_to_number(self, chinese: str) -> Optional[int]:
-        """
-        中文数字转阿拉伯数字（简单实现）
-        
-        Args:
-            chinese: 中文数字
-            
-        Returns:
-            阿拉伯数字
-        """
-        if not chinese:
-            return None
-        
-        try:
-            # 简单映射
-            simple_map = {
-                '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-                '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-                '壹': 1, '贰': 2, '叁': 3, '肆': 4, '伍': 5,
-                '陆': 6, '柒': 7, '捌': 8, '玖': 9, '拾': 10,
-            }
-            
-            # 直接映射
-            if chinese in simple_map:
-                return simple_map[chinese]
-            
-            # 十几
-            if chinese.startswith('十'):
-                if len(chinese) == 1:
-                    return 10
-                elif len(chinese) == 2:
-                    return 10 + simple_map.get(chinese[1], 0)
-            
-            # X十
-            if len(chinese) == 2 and chinese[1] == '十':
-                return simple_map.get(chinese[0], 0) * 10
-            
-            # X十Y
-            if len(chinese) == 3 and chinese[1] == '十':
-                tens = simple_map.get(chinese[0], 0) * 10
-                ones = simple_map.get(chinese[2], 0)
-                return tens + ones
-            
-            # 复杂情况暂不处理
-            return None
-            
-        except Exception as e:
-            print(f"⚠ 转换失败: {chinese} - {e}")
-            return None
+        """中文数字转阿拉伯数字（见 chinese_to_number）"""
+        return chinese_to_number(chinese)
     
     def convert_season_episode(self, text: str) -> str:
         """
@@ -6,21 +6,84 @@
 """
 
 import re
-import json
-import urllib.request
-import urllib.parse
-from typing import Dict, Any, Optional, Tuple
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional, Tuple, Iterable, List
+
+from core.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from core.latency import LatencyHistogram
+from core.metadata_cache import MISS, MetadataCache, get_metadata_cache
+from core.recognition_result import RecognitionResult
+from core.single_flight import SingleFlight
+from core.title_index import TitleIndex, get_title_index
+from core.title_key import canonical_key
+
+
+# 对冲查询默认配置
+DEFAULT_HEDGE_DELAY = 0.8             # 主提供方最长等待多久再同时查询备用提供方（秒）
+DEFAULT_HEDGE_P95_THRESHOLD = 3.0     # 主提供方近期 p95 超过该值时立即同时查询（秒）
+HEDGE_MIN_SAMPLES = 20                # 近期样本达到该数量后才按直方图调整等待时间
+HEDGE_WORKERS = 16                    # 对冲查询线程池大小
 
 
 class ChineseTitleResolver:
     """中文标题解析器 - 确保所有标题都转换为中文"""
     
-    def __init__(self, tmdb_api_key: str = None, douban_cookie: str = None):
+    def __init__(
+        self,
+        tmdb_api_key: str = None,
+        douban_cookie: str = None,
+        cache: Optional[MetadataCache] = None,
+        title_index: Optional[TitleIndex] = None,
+        hedge: Optional[bool] = None,
+        hedge_delay: Optional[float] = None,
+        hedge_p95_threshold: Optional[float] = None
+    ):
+        from core.config import get_config
+        
         self.tmdb_api_key = tmdb_api_key
         self.douban_cookie = douban_cookie
         
-        # 缓存
-        self._cache = {}
+        # 对冲查询：豆瓣迟迟不返回时同时查询 TMDB，先得到中文结果的一方胜出
+        config = get_config()
+        self.hedge = bool(config.get('hedged_queries', True)) if hedge is None else hedge
+        self.hedge_delay = float(config.get('hedge_delay', DEFAULT_HEDGE_DELAY) if hedge_delay is None else hedge_delay)
+        self.hedge_p95_threshold = float(
+            config.get('hedge_p95_threshold', DEFAULT_HEDGE_P95_THRESHOLD)
+            if hedge_p95_threshold is None else hedge_p95_threshold
+        )
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+        # 统计计数器由多个查询线程和异步解析器的事件循环同时更新
+        self._stats_lock = threading.Lock()
+        self.hedged_queries = 0
+        self.hedge_wins = 0
+        
+        # 各提供方的请求延迟（决定对冲等待时间）
+        self.latency = {'douban': LatencyHistogram(), 'tmdb': LatencyHistogram()}
+        
+        # 各提供方的熔断器（全局共享：Cookie 被封或 TMDB 不可达时直接跳过，不再逐个等待超时）
+        self.breakers: Dict[str, CircuitBreaker] = {
+            'douban': get_circuit_breaker('douban'),
+            'tmdb': get_circuit_breaker('tmdb'),
+        }
+        self.short_circuits = 0
+        
+        # 持久化缓存（默认使用全局实例，进程重启后仍然有效）
+        self.cache = cache if cache is not None else get_metadata_cache()
+        
+        # 本地标题索引（由 media-renamer.py index build 构建，不存在时为 None）
+        self.title_index = title_index if title_index is not None else get_title_index()
+        
+        # 在线查询统计
+        self.query_count = 0
+        self.query_failures = 0
+        self.query_seconds = 0.0
+        self._local = threading.local()
+        
+        # 同一标题的并发查询只发出一次（其余线程等待共享结果）
+        self.single_flight = SingleFlight()
     
     def resolve(self, english_title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
         """
@@ -34,30 +97,240 @@ class ChineseTitleResolver:
         Returns:
             中文标题，如果查询失败则返回 None
         """
-        # 检查缓存
-        cache_key = f"{english_title}_{year}_{is_tv}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
         # 如果已经是中文，直接返回
         if self._is_chinese(english_title):
             return english_title
         
-        # 优先使用豆瓣（中文结果更准确）
-        chinese_title = None
-        if self.douban_cookie:
-            chinese_title = self._query_douban(english_title, year, is_tv)
+        # 本地索引和缓存（负向结果为 None，同样直接返回）
+        cached = self._resolve_offline(english_title, year, is_tv)
+        if cached is not MISS:
+            return cached
+        
+        if not self.douban_cookie and not self.tmdb_api_key:
+            return self._index_fallback(english_title, year, is_tv)
+        
+        chinese_title, _ = self.single_flight.do(
+            canonical_key(english_title, year, is_tv),
+            lambda: self._lookup(english_title, year, is_tv)
+        )
+        return chinese_title
+    
+    def _resolve_offline(self, english_title: str, year: int = None, is_tv: bool = False) -> Any:
+        """
+        不访问网络的查询：先查元数据缓存（在线查询过的结果），再查本地标题索引的可信结果
+        
+        Returns:
+            中文标题；缓存的负向结果为 None；都未命中时返回 MISS
+        """
+        cached = self.cache.get(english_title, year, is_tv)
+        if cached is not MISS or self.title_index is None:
+            return cached
+        try:
+            chinese_title = self.title_index.lookup(english_title, year, is_tv)
+        except Exception as e:
+            print(f"⚠ 本地标题索引查询失败: {e}")
+            return MISS
+        return chinese_title if chinese_title else MISS
+    
+    def _index_fallback(self, english_title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
+        """
+        无法在线查询时（未配置、熔断或查询失败）使用本地索引的相似匹配或有年份冲突的结果，
+        不写入缓存
+        """
+        if self.title_index is None:
+            return None
+        try:
+            match = self.title_index.match(english_title, year, is_tv)
+        except Exception as e:
+            print(f"⚠ 本地标题索引查询失败: {e}")
+            return None
+        return match[0] if match else None
+    
+    def _lookup(self, english_title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
+        """在线查询并写入缓存（由单飞调用执行，同一标题同一时刻只有一个线程在查询）"""
+        value, providers = self._begin_lookup(english_title, year, is_tv)
+        if not providers:
+            return value
+        
+        started = time.perf_counter()
+        if self.hedge and len(providers) > 1:
+            chinese_title, failed = self._query_hedged(providers, english_title, year, is_tv)
+        else:
+            # 按优先级依次查询（豆瓣中文结果更准确，失败或无结果时使用 TMDB）
+            chinese_title, failed = None, False
+            for provider, query in providers:
+                chinese_title, provider_failed = self._call_provider(provider, query, english_title, year, is_tv)
+                failed = failed or provider_failed
+                if chinese_title:
+                    break
+        return self._finish_lookup(english_title, year, is_tv, chinese_title, failed, started)
+    
+    def _begin_lookup(self, english_title: str, year: Any, is_tv: bool) -> Tuple[Any, List[Tuple[str, Any]]]:
+        """
+        单飞执行者查询前的检查（同步和异步解析器共用）
+        
+        Returns:
+            (结果, 可用的提供方)；提供方为空时不需要在线查询，结果即最终结果
+        """
+        # 等待单飞期间其他线程可能刚写入缓存
+        cached = self.cache.get(english_title, year, is_tv)
+        if cached is not MISS:
+            return cached, []
         
-        # 如果豆瓣失败，使用 TMDB
-        if not chinese_title and self.tmdb_api_key:
-            chinese_title = self._query_tmdb(english_title, year, is_tv)
+        # 所有提供方都已熔断：回退为本地索引的结果或英文标题（不写入负向缓存）
+        providers = self._providers()
+        if not providers:
+            with self._stats_lock:
+                self.short_circuits += 1
+            return self._index_fallback(english_title, year, is_tv), []
+        return None, providers
+    
+    def _finish_lookup(self, english_title: str, year: Any, is_tv: bool, chinese_title: Optional[str],
+                       failed: bool, started: float) -> Optional[str]:
+        """
+        在线查询后的统计和缓存写入（同步和异步解析器共用）
+        查询失败（超时、网络错误）与查不到结果区分开，失败不写入负向缓存，改用本地索引回退
+        """
+        with self._stats_lock:
+            self.query_count += 1
+            self.query_seconds += time.perf_counter() - started
+            if failed and not chinese_title:
+                self.query_failures += 1
         
-        # 缓存结果
         if chinese_title:
-            self._cache[cache_key] = chinese_title
+            self.cache.put(english_title, year, is_tv, chinese_title)
+        elif failed:
+            return self._index_fallback(english_title, year, is_tv)
+        else:
+            self.cache.put(english_title, year, is_tv, None)
         
         return chinese_title
     
+    def _providers(self) -> List[Tuple[str, Any]]:
+        """已配置且未熔断的提供方 [(名称, 查询函数)]，按优先级排列（豆瓣中文结果更准确）"""
+        providers = []
+        if self.douban_cookie and self.breakers['douban'].available():
+            providers.append(('douban', self._query_douban))
+        if self.tmdb_api_key and self.breakers['tmdb'].available():
+            providers.append(('tmdb', self._query_tmdb))
+        return providers
+    
+    def _call_provider(self, provider: str, query, title: str, year: int = None, is_tv: bool = False) -> Tuple[Optional[str], bool]:
+        """执行一次提供方查询并记录延迟和熔断统计，返回 (结果, 是否失败)"""
+        breaker = self.breakers[provider]
+        if not breaker.allow():
+            # 熔断中（或半开试探名额已满）：按失败处理，立即交给下一个提供方
+            return None, True
+        
+        self._local.failed = False
+        self._local.match = None
+        started = time.perf_counter()
+        try:
+            value = query(title, year, is_tv)
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            self.latency[provider].record(time.perf_counter() - started)
+        
+        if self._local.failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            if self._local.match is not None and self._is_chinese(value):
+                self._store_media(provider, self._local.match, value, title, year, is_tv)
+        return value, self._local.failed
+    
+    def _store_media(self, provider: str, match: Tuple[Any, List[Optional[str]], Any], chinese_title: str,
+                     title: str, year: Any, is_tv: bool):
+        """
+        按作品 ID 保存查询结果并登记别名：查询标题，以及原始标题（带/不带年份），
+        之后这些写法都直接经别名命中，不再访问网络
+        """
+        media_id, original_titles, media_year = match
+        if not media_id:
+            return
+        aliases = [(title, year)]
+        for original_title in original_titles:
+            if original_title and not self._is_chinese(original_title):
+                aliases.append((original_title, media_year or None))
+                aliases.append((original_title, None))
+        try:
+            self.cache.put_media(provider, media_id, is_tv, chinese_title, aliases)
+        except Exception as e:
+            print(f"⚠ 元数据写入失败: {e}")
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """
+        对冲等待时间：主提供方查询发出后多久同时查询备用提供方
+        
+        - 近期样本不足时使用配置的 hedge_delay
+        - 近期 p95 超过 hedge_p95_threshold 时立即对冲（0）
+        - 否则等待到近期 p90（大多数请求已返回，只对尾部请求对冲），不超过 hedge_delay
+        """
+        histogram = self.latency[provider]
+        p95 = histogram.percentile(0.95, HEDGE_MIN_SAMPLES)
+        if p95 is None:
+            return self.hedge_delay
+        if p95 >= self.hedge_p95_threshold:
+            return 0.0
+        return min(self.hedge_delay, histogram.percentile(0.90, HEDGE_MIN_SAMPLES))
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """对冲查询线程池（首次使用时创建）"""
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='hedged-query')
+        return self._hedge_executor
+    
+    def _query_hedged(self, providers: List[Tuple[str, Any]], title: str, year: int = None,
+                      is_tv: bool = False) -> Tuple[Optional[str], bool]:
+        """
+        对冲查询：先查询主提供方，超过对冲等待时间仍未返回（或没有中文结果）时查询备用提供方，
+        接受先通过中文检查的结果，并取消另一方（已发出的请求无法中断，其结果直接丢弃）
+        
+        Returns:
+            (中文标题, 是否有提供方查询失败)
+        """
+        (primary, primary_query), (secondary, secondary_query) = providers[:2]
+        executor = self._get_hedge_executor()
+        delay = self._hedge_delay(primary)
+        
+        futures = {executor.submit(self._call_provider, primary, primary_query, title, year, is_tv): primary}
+        pending = set(futures)
+        launched = False
+        results: Dict[str, Optional[str]] = {}
+        failed = False
+        
+        while pending or not launched:
+            done, pending = wait(pending, timeout=None if launched else delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = futures[future]
+                value, provider_failed = future.result()
+                failed = failed or provider_failed
+                if self._is_chinese(value):
+                    for loser in pending:
+                        loser.cancel()
+                    if provider == secondary and pending:
+                        with self._stats_lock:
+                            self.hedge_wins += 1
+                    return value, failed
+                results[provider] = value
+            
+            # 主提供方超时或没有中文结果：查询备用提供方
+            if not launched:
+                launched = True
+                if pending:
+                    with self._stats_lock:
+                        self.hedged_queries += 1
+                future = executor.submit(self._call_provider, secondary, secondary_query, title, year, is_tv)
+                futures[future] = secondary
+                pending.add(future)
+        
+        # 都没有中文结果：按优先级返回非空结果（与顺序查询一致）
+        return results.get(primary) or results.get(secondary), failed
+    
     def _is_chinese(self, text: str) -> bool:
         """检查文本是否包含中文"""
         if not text:
@@ -68,34 +341,38 @@ class ChineseTitleResolver:
     def _query_douban(self, title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
         """查询豆瓣获取中文标题"""
         try:
-            # 构建搜索URL
-            search_type = 'tv' if is_tv else 'movie'
+            from core.http_client import get_http_client
+            
+            # 构建搜索参数
             query = f"{title} {year}" if year else title
-            url = f"https://movie.douban.com/j/subject_suggest?q={urllib.parse.quote(query)}"
             
-            # 发送请求
+            # 发送请求（共用连接池）
             headers = {
-                'User-Agent': 'Mozilla/5.0',
                 'Cookie': self.douban_cookie,
                 'Referer': 'https://movie.douban.com/'
             }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            data = get_http_client().get_json(
+                'https://movie.douban.com/j/subject_suggest',
+                params={'q': query},
+                headers=headers
+            )
             
             # 解析结果
             if data and len(data) > 0:
-                # 优先匹配年份
+                # 优先匹配年份，否则使用第一个结果
+                item = data[0]
                 if year:
-                    for item in data:
-                        if str(year) in item.get('year', ''):
-                            return item.get('title')
+                    for candidate in data:
+                        if str(year) in candidate.get('year', ''):
+                            item = candidate
+                            break
                 
-                # 返回第一个结果
-                return data[0].get('title')
+                # 记录作品 ID 和原始标题（写入元数据库并登记别名）
+                self._local.match = (item.get('id'), [item.get('sub_title')], item.get('year'))
+                return item.get('title')
             
         except Exception as e:
+            self._local.failed = True
             print(f"豆瓣查询失败: {e}")
         
         return None
@@ -103,7 +380,9 @@ class ChineseTitleResolver:
     def _query_tmdb(self, title: str, year: int = None, is_tv: bool = False) -> Optional[str]:
         """查询 TMDB 获取中文标题"""
         try:
-            # 构建搜索URL
+            from core.http_client import get_http_client
+            
+            # 构建搜索参数
             endpoint = 'tv' if is_tv else 'movie'
             params = {
                 'api_key': self.tmdb_api_key,
@@ -113,12 +392,8 @@ class ChineseTitleResolver:
             if year:
                 params['year'] = year
             
-            url = f"https://api.themoviedb.org/3/search/{endpoint}?{urllib.parse.urlencode(params)}"
-            
-            # 发送请求
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            # 发送请求（共用连接池，配置了 tmdb_proxy 时经代理）
+            data = get_http_client().get_json(f"https://api.themoviedb.org/3/search/{endpoint}", params=params)
             
             # 解析结果
             if data.get('results') and len(data['results']) > 0:
@@ -127,32 +402,69 @@ class ChineseTitleResolver:
                 # 获取中文标题
                 chinese_title = result.get('title') if not is_tv else result.get('name')
                 
+                original_title = result.get('original_title') if not is_tv else result.get('original_name')
+                
                 # 如果 TMDB 返回的还是英文，尝试获取原始标题
                 if not self._is_chinese(chinese_title):
-                    chinese_title = result.get('original_title') if not is_tv else result.get('original_name')
+                    chinese_title = original_title
                 
+                # 记录作品 ID 和原始标题（写入元数据库并登记别名）
+                release_date = result.get('release_date') if not is_tv else result.get('first_air_date')
+                self._local.match = (result.get('id'), [original_title], (release_date or '')[:4])
                 return chinese_title
             
         except Exception as e:
+            self._local.failed = True
             print(f"TMDB 查询失败: {e}")
         
         return None
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取元数据缓存和在线查询统计"""
+        return {
+            **self.cache.get_stats(),
+            'queries': self.query_count,
+            'query_failures': self.query_failures,
+            'avg_query_ms': self.query_seconds / self.query_count * 1000 if self.query_count > 0 else 0.0,
+            'coalesced_queries': self.single_flight.coalesced,
+            'title_index': self.title_index.get_stats() if self.title_index is not None else None,
+            'in_flight_queries': self.single_flight.in_flight(),
+            'hedged_queries': self.hedged_queries,
+            'hedge_wins': self.hedge_wins,
+            'provider_latency': {provider: histogram.snapshot() for provider, histogram in self.latency.items()},
+            'short_circuits': self.short_circuits,
+            'circuit_breakers': {provider: breaker.get_stats() for provider, breaker in self.breakers.items()},
+        }
+    
     def clear_cache(self):
         """清空缓存"""
-        self._cache.clear()
+        self.cache.clear()
 
 
 class IntegratedRecognizer:
     """集成识别器 - 高级识别 + 中文标题解析"""
     
-    def __init__(self, tmdb_api_key: str = None, douban_cookie: str = None):
+    def __init__(
+        self,
+        tmdb_api_key: str = None,
+        douban_cookie: str = None,
+        cache_size: int = 10000,
+        title_resolver: Optional[ChineseTitleResolver] = None
+    ):
         from core.advanced_recognizer import get_advanced_recognizer
+        from core.lru_cache import TimedLRUCache
         
         self.advanced_recognizer = get_advanced_recognizer()
-        self.title_resolver = ChineseTitleResolver(tmdb_api_key, douban_cookie)
+        self.title_resolver = title_resolver or ChineseTitleResolver(tmdb_api_key, douban_cookie)
     
-    def recognize_with_chinese_title(self, filename: str, convert_chinese_number: bool = True) -> Dict[str, Any]:
+        # 识别结果缓存：(原始文件名, 是否转换中文数字) -> 识别结果
+        # 英文标题未能解析为中文时不缓存，下次继续查询；记录写入时间，快照导入时跳过过期结果
+        self.result_cache = TimedLRUCache(cache_size)
+        
+        # 批量识别按身份（标题/年份/类型）查询的次数
+        self.identity_lookups = 0
+    
+    def recognize_with_chinese_title(self, filename: str, convert_chinese_number: bool = True) -> RecognitionResult:
         """
         识别文件并获取中文标题（v2.4.0 增强）
         
@@ -161,8 +473,136 @@ class IntegratedRecognizer:
             convert_chinese_number: 是否转换中文数字（v2.4.0 新增）
             
         Returns:
-            识别结果（包含中文标题）
+            识别结果（包含中文标题，需要字典时调用 to_dict()）
+        """
+        from core.advanced_recognizer import copy_result
+        
+        return copy_result(self._recognize_cached(filename, convert_chinese_number))
+    
+    def recognize_many_with_chinese_title(
+        self,
+        filenames: Iterable[str],
+        convert_chinese_number: bool = True
+    ) -> List[RecognitionResult]:
+        """
+        批量识别文件并获取中文标题
+        
+        批内相同文件名只识别一次；先离线解析全部文件，再按 (标题, 年份, 类型) 分组，
+        每组只查询一次中文标题并写回组内所有文件。
+        
+        Args:
+            filenames: 文件名序列
+            convert_chinese_number: 是否转换中文数字
+        
+        Returns:
+            识别结果列表（与输入顺序一致）
+        """
+        from core.advanced_recognizer import copy_result
+        
+        filenames = list(filenames)
+        infos, groups = self._parse_batch(filenames, convert_chinese_number)
+        titles = {key: self.title_resolver.resolve(*query) for key, (query, _) in groups.items()}
+        self._fan_out(infos, groups, titles, convert_chinese_number)
+        return [copy_result(infos[filename]) for filename in filenames]
+    
+    def _parse_batch(
+        self,
+        filenames: List[str],
+        convert_chinese_number: bool
+    ) -> Tuple[Dict[str, RecognitionResult], Dict[str, Tuple[Tuple[str, Any, bool], List[str]]]]:
         """
+        离线解析一批文件，并把需要查询中文标题的文件按身份分组
+        
+        Returns:
+            (文件名 -> 识别结果, 身份键 -> ((标题, 年份, 是否为电视剧), [文件名, ...]))
+        """
+        infos: Dict[str, RecognitionResult] = {}
+        groups: Dict[str, Tuple[Tuple[str, Any, bool], List[str]]] = {}
+        for filename in filenames:
+            if filename in infos:
+                continue
+            info = self.result_cache.get((filename, convert_chinese_number))
+            if info is None:
+                info = self._parse(filename, convert_chinese_number)
+                if self._needs_title(info):
+                    query = (info['title'], info['year'], info['is_tv'])
+                    key = canonical_key(*query)
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = (query, [])
+                    group[1].append(filename)
+                else:
+                    self._cache_result((filename, convert_chinese_number), info)
+            infos[filename] = info
+        return infos, groups
+    
+    def _fan_out(
+        self,
+        infos: Dict[str, RecognitionResult],
+        groups: Dict[str, Tuple[Tuple[str, Any, bool], List[str]]],
+        titles: Dict[str, Optional[str]],
+        convert_chinese_number: bool
+    ):
+        """把每个身份的查询结果写回组内所有文件并写入结果缓存"""
+        for key, (query, members) in groups.items():
+            chinese_title = titles.get(key)
+            if chinese_title:
+                print(f"✓ 找到中文标题: {query[0]} → {chinese_title} ({len(members)} 个文件)")
+            else:
+                print(f"✗ 未找到中文标题，保留英文: {query[0]} ({len(members)} 个文件)")
+            for filename in members:
+                info = infos[filename]
+                self._set_title(info, chinese_title)
+                self._cache_result((filename, convert_chinese_number), info)
+        self.identity_lookups += len(groups)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取识别结果缓存统计"""
+        return {
+            'integrated': self.result_cache.get_stats(),
+            'advanced': self.advanced_recognizer.get_cache_stats(),
+            'metadata': self.title_resolver.get_cache_stats(),
+            'identity_lookups': self.identity_lookups,
+        }
+    
+    def clear_cache(self):
+        """清空识别结果缓存（持久化的元数据缓存不受影响）"""
+        self.result_cache.clear()
+        self.advanced_recognizer.clear_cache()
+    
+    def _recognize_cached(self, filename: str, convert_chinese_number: bool) -> RecognitionResult:
+        """从 LRU 缓存获取识别结果，未命中时识别（返回缓存中的对象，不可修改）"""
+        cache_key = (filename, convert_chinese_number)
+        info = self.result_cache.get(cache_key)
+        if info is None:
+            info = self._recognize(filename, convert_chinese_number)
+            self._cache_result(cache_key, info)
+        return info
+    
+    def _cache_result(self, cache_key: Tuple[str, bool], info: RecognitionResult):
+        """写入识别结果缓存（英文标题未能解析为中文时不缓存）"""
+        if not (info['title'] and not self._is_chinese(info['title'])):
+            self.result_cache.put(cache_key, info)
+    
+    def _recognize(self, filename: str, convert_chinese_number: bool) -> RecognitionResult:
+        """识别文件并获取中文标题（不经过缓存）"""
+        info = self._parse(filename, convert_chinese_number)
+        
+        # 2. 如果标题不是中文，查询中文标题
+        if self._needs_title(info):
+            print(f"检测到英文标题: {info['title']}, 正在查询中文标题...")
+            
+            chinese_title = self.title_resolver.resolve(
+                info['title'],
+                info['year'],
+                info['is_tv']
+            )
+            self._apply_title(info, chinese_title)
+        
+        return info
+    
+    def _parse(self, filename: str, convert_chinese_number: bool) -> RecognitionResult:
+        """离线识别：转换中文数字后用高级识别器提取信息（不查询标题）"""
         # 0. 转换中文数字（v2.4.0 新增）
         processed_filename = filename
         if convert_chinese_number:
@@ -175,26 +615,25 @@ class IntegratedRecognizer:
                 print(f"⚠ 中文数字转换失败: {e}")
         
         # 1. 使用高级识别器提取信息
-        info = self.advanced_recognizer.recognize(processed_filename)
+        return self.advanced_recognizer.recognize(processed_filename)
         
-        # 2. 如果标题不是中文，查询中文标题
-        if info['title'] and not self._is_chinese(info['title']):
-            print(f"检测到英文标题: {info['title']}, 正在查询中文标题...")
+    def _needs_title(self, info: RecognitionResult) -> bool:
+        """标题不是中文时需要查询中文标题"""
+        return bool(info['title']) and not self._is_chinese(info['title'])
             
-            chinese_title = self.title_resolver.resolve(
-                info['title'],
-                info['year'],
-                info['is_tv']
-            )
+    def _apply_title(self, info: RecognitionResult, chinese_title: Optional[str]):
+        """写入查询到的中文标题（保留原始英文标题）"""
+        if chinese_title:
+            print(f"✓ 找到中文标题: {chinese_title}")
+        else:
+            print(f"✗ 未找到中文标题，保留英文: {info['title']}")
+        self._set_title(info, chinese_title)
             
-            if chinese_title:
-                print(f"✓ 找到中文标题: {chinese_title}")
-                info['original_title'] = info['title']  # 保存原始英文标题
-                info['title'] = chinese_title  # 替换为中文标题
-            else:
-                print(f"✗ 未找到中文标题，保留英文: {info['title']}")
-        
-        return info
+    def _set_title(self, info: RecognitionResult, chinese_title: Optional[str]):
+        """替换为中文标题（未找到时保持不变）"""
+        if chinese_title:
+            info['original_title'] = info['title']  # 保存原始英文标题
+            info['title'] = chinese_title  # 替换为中文标题
     
     def _is_chinese(self, text: str) -> bool:
         """检查文本是否包含中文"""
@@ -216,7 +655,7 @@ def get_integrated_recognizer(tmdb_api_key: str = None, douban_cookie: str = Non
 
 
 # 便捷函数
-def recognize_with_chinese_title(filename: str, tmdb_api_key: str = None, douban_cookie: str = None) -> Dict[str, Any]:
+def recognize_with_chinese_title(filename: str, tmdb_api_key: str = None, douban_cookie: str = None) -> RecognitionResult:
     """识别文件并获取中文标题的便捷函数"""
     recognizer = get_integrated_recognizer(tmdb_api_key, douban_cookie)
     return recognizer.recognize_with_chinese_title(filename)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+熔断器
+按提供方统计滑动窗口内的失败率（错误预算），超过阈值时熔断：
+- closed（闭合）：正常请求，记录成功/失败
+- open（断开）：直接拒绝请求，冷却时间结束后进入半开
+- half_open（半开）：只放行少量试探请求，成功则闭合，失败则重新断开
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+# 熔断器状态
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """熔断器配置"""
+    failure_ratio: float = 0.5      # 窗口内失败率超过该值时熔断
+    min_requests: int = 5           # 窗口内请求数达到该值才计算失败率
+    window: float = 60.0            # 滑动窗口（秒）
+    open_seconds: float = 30.0      # 熔断后多久进入半开（秒）
+    half_open_calls: int = 1        # 半开状态允许同时进行的试探请求数
+
+
+class CircuitBreaker:
+    """熔断器（线程安全）"""
+    
+    def __init__(self, name: str, config: Optional[CircuitBreakerConfig] = None):
+        """
+        初始化熔断器
+        
+        Args:
+            name: 名称（提供方）
+            config: 熔断器配置
+        """
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self.lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._events = deque()       # (时间, 是否失败)
+        
+        # 统计
+        self.rejected = 0
+        self.trips = 0
+    
+    @property
+    def state(self) -> str:
+        """当前状态（断开冷却结束后返回半开）"""
+        with self.lock:
+            return self._current_state(time.time())
+    
+    def _current_state(self, now: float) -> str:
+        """计算当前状态（需持有锁）"""
+        if self._state == OPEN and now - self._opened_at >= self.config.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+    
+    def available(self) -> bool:
+        """是否可以尝试请求（不占用半开试探名额）"""
+        return self.state != OPEN
+    
+    def allow(self) -> bool:
+        """
+        请求前调用：是否放行本次请求
+        
+        半开状态下放行的请求占用一个试探名额，需以 record_success/record_failure 结束
+        
+        Returns:
+            是否放行
+        """
+        with self.lock:
+            state = self._current_state(time.time())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trials < self.config.half_open_calls:
+                self._trials += 1
+                return True
+            self.rejected += 1
+            return False
+    
+    def record_success(self):
+        """记录一次成功请求"""
+        self._record(False)
+    
+    def record_failure(self):
+        """记录一次失败请求"""
+        self._record(True)
+    
+    def _record(self, failed: bool):
+        """记录请求结果并更新状态"""
+        with self.lock:
+            now = time.time()
+            state = self._current_state(now)
+            
+            if state == HALF_OPEN:
+                # 试探请求决定闭合还是重新断开
+                if failed:
+                    self._trip(now)
+                else:
+                    self._state = CLOSED
+                    self._events.clear()
+                return
+            
+            if state == OPEN:
+                # 熔断前发出的请求迟到的结果，不影响状态
+                return
+            
+            self._events.append((now, failed))
+            self._expire(now)
+            
+            total = len(self._events)
+            if failed and total >= self.config.min_requests:
+                failures = sum(1 for _, event_failed in self._events if event_failed)
+                if failures / total >= self.config.failure_ratio:
+                    self._trip(now)
+    
+    def _trip(self, now: float):
+        """断开熔断器（需持有锁）"""
+        self._state = OPEN
+        self._opened_at = now
+        self._trials = 0
+        self._events.clear()
+        self.trips += 1
+        print(f"⚠ {self.name} 熔断：{self.config.open_seconds:.0f} 秒内直接跳过")
+    
+    def _expire(self, now: float):
+        """移除窗口外的记录（需持有锁）"""
+        cutoff = now - self.config.window
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+    
+    def reset(self):
+        """重置为闭合状态"""
+        with self.lock:
+            self._state = CLOSED
+            self._trials = 0
+            self._events.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断器状态和统计"""
+        with self.lock:
+            now = time.time()
+            state = self._current_state(now)
+            self._expire(now)
+            total = len(self._events)
+            failures = sum(1 for _, failed in self._events if failed)
+            return {
+                'state': state,
+                'window_requests': total,
+                'window_failures': failures,
+                'failure_ratio': failures / total if total else 0.0,
+                'retry_in': max(0.0, self._opened_at + self.config.open_seconds - now) if state == OPEN else 0.0,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
+
+
+# 全局实例（按名称）
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """获取指定名称的熔断器（单例，配置来自 circuit_* 配置项）"""
+    breaker = _circuit_breakers.get(name)
+    if breaker is None:
+        with _circuit_breakers_lock:
+            breaker = _circuit_breakers.get(name)
+            if breaker is None:
+                from core.config import get_config
+                
+                config = get_config()
+                defaults = CircuitBreakerConfig()
+                breaker = _circuit_breakers[name] = CircuitBreaker(name, CircuitBreakerConfig(
+                    failure_ratio=float(config.get('circuit_failure_ratio', defaults.failure_ratio)),
+                    min_requests=int(config.get('circuit_min_requests', defaults.min_requests)),
+                    window=float(config.get('circuit_window', defaults.window)),
+                    open_seconds=float(config.get('circuit_open_seconds', defaults.open_seconds)),
+                ))
+    return breaker
+
+
+def get_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    """获取所有已创建的熔断器"""
+    with _circuit_breakers_lock:
+        return dict(_circuit_breakers)
@@ -19,6 +19,16 @@ class ConfigManager:
         'version': '2.0.0',
         'tmdb_api_key': '',
         'tmdb_proxy': '',
+        'http_pool_connections': 10,
+        'http_pool_maxsize': 10,
+        'http_retries': 2,
+        'hedged_queries': True,
+        'hedge_delay': 0.8,
+        'hedge_p95_threshold': 3.0,
+        'circuit_failure_ratio': 0.5,
+        'circuit_min_requests': 5,
+        'circuit_window': 60,
+        'circuit_open_seconds': 30,
         'douban_cookie': '',
         'max_workers': 4,
         'enable_checkpoint': True,
@@ -26,6 +36,24 @@ class ConfigManager:
         'log_level': 'INFO',
         'cache_enabled': True,
         'cache_ttl': 3600,
+        'metadata_cache_path': 'data/metadata_cache.db',
+        'metadata_cache_ttl': 2592000,
+        'metadata_cache_negative_ttl': 86400,
+        'metadata_cache_max_entries': 100000,
+        'redis_url': '',
+        'shared_cache_enabled': True,
+        'shared_cache_namespace': 'media-renamer',
+        'shared_cache_lru_size': 10000,
+        'title_index_path': 'data/title_index.db',
+        'cache_snapshot_path': 'data/cache_snapshot.jsonl.gz',
+        'cache_snapshot_on_exit': True,
+        'metadata_enrichment': True,
+        'nfo_sidecars': True,
+        'custom_release_groups': [],
+        'strip_release_groups': False,
+        'anime_recognition': True,
+        'quality_profile': 'default',
+        'quality_profiles': {},
     }
     
     def __init__(self, config_file: Optional[str] = None):
@@ -93,6 +93,34 @@ class HealthCheck:
         except Exception as e:
             return False, f"{service_name} check failed: {str(e)}"
     
+    def check_circuit_breakers(self) -> tuple:
+        """
+        检查元数据提供方熔断器（豆瓣、TMDB）
+        
+        Returns:
+            tuple: (是否健康, 消息)，有熔断器断开时不健康
+        """
+        from core.circuit_breaker import OPEN, get_circuit_breakers
+        
+        breakers = get_circuit_breakers()
+        if not breakers:
+            return True, "No circuit breakers"
+        
+        states = {name: breaker.state for name, breaker in breakers.items()}
+        message = ", ".join(f"{name}: {state}" for name, state in sorted(states.items()))
+        return OPEN not in states.values(), message
+    
+    def _circuit_breaker_states(self) -> Dict:
+        """
+        获取所有熔断器的状态和统计
+        
+        Returns:
+            Dict: 名称 -> 熔断器统计
+        """
+        from core.circuit_breaker import get_circuit_breakers
+        
+        return {name: breaker.get_stats() for name, breaker in get_circuit_breakers().items()}
+    
     def run_checks(self) -> Dict:
         """
         运行所有健康检查
@@ -148,7 +176,8 @@ class HealthCheck:
             'timestamp': datetime.utcnow().isoformat() + 'Z',
             'uptime': uptime_str,
             'uptime_seconds': uptime_seconds,
-            'checks': results
+            'checks': results,
+            'circuit_breakers': self._circuit_breaker_states()
         }
     
     def _format_uptime(self, seconds: int) -> str:
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据提供方 HTTP 客户端
+豆瓣、TMDB 等查询共用一个 requests.Session：按主机复用连接池（keep-alive），
+请求压缩响应，并对 TMDB 主机使用配置中的 tmdb_proxy
+
+连接失败、超时和 5xx/429 响应按 core.network_utils.retry_on_error 指数退避重试；
+其他 4xx 直接抛出。不直接使用 SafeRequests：它的静态方法每次新建连接、不支持按主机代理，
+且重试所有 HTTP 错误、等待时间（2 + 3 + 4.5 秒）超过对冲查询和熔断器能接受的范围
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.network_utils import retry_on_error
+
+
+# TMDB 相关主机（tmdb_proxy 只对这些主机生效）
+TMDB_HOSTS = ('api.themoviedb.org', 'image.tmdb.org', 'www.themoviedb.org')
+
+# 默认连接池配置
+DEFAULT_POOL_CONNECTIONS = 10    # 缓存连接池的主机数
+DEFAULT_POOL_MAXSIZE = 10        # 每个主机保留的连接数（不小于并发工作线程数）
+DEFAULT_TIMEOUT = (5, 10)        # (连接超时, 读取超时)，秒
+
+# 默认重试配置
+DEFAULT_RETRIES = 2              # 最大重试次数
+DEFAULT_RETRY_DELAY = 0.5        # 初始重试延迟（秒）
+DEFAULT_RETRY_BACKOFF = 2.0      # 退避系数
+
+# 可重试的响应状态
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+
+class TransientHttpError(requests.HTTPError):
+    """可重试的 HTTP 错误（5xx、429）"""
+
+
+class ProviderHttpClient:
+    """元数据提供方共用的 HTTP 客户端（线程安全）"""
+    
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        tmdb_proxy: Optional[str] = None,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ):
+        """
+        初始化客户端
+        
+        Args:
+            pool_connections: 缓存连接池的主机数
+            pool_maxsize: 每个主机的最大连接数
+            tmdb_proxy: TMDB 请求使用的代理（如 http://127.0.0.1:7890）
+            timeout: 默认超时 (连接, 读取)
+            retries: 临时性错误的最大重试次数（0 表示不重试）
+            retry_delay: 初始重试延迟（秒）
+        """
+        self.timeout = timeout
+        self.tmdb_proxy = tmdb_proxy or None
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=False)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        
+        # requests 支持 "协议://主机" 形式的代理键，只让 TMDB 主机走代理
+        if self.tmdb_proxy:
+            for host in TMDB_HOSTS:
+                self.session.proxies[f'https://{host}'] = self.tmdb_proxy
+                self.session.proxies[f'http://{host}'] = self.tmdb_proxy
+        
+        # 按主机统计
+        self.lock = threading.Lock()
+        self.host_stats: Dict[str, Dict[str, Any]] = {}
+        
+        # 只重试临时性错误（每次尝试都计入主机统计）
+        self._get_with_retry = retry_on_error(
+            max_retries=retries,
+            delay=retry_delay,
+            backoff=DEFAULT_RETRY_BACKOFF,
+            exceptions=(requests.ConnectionError, requests.Timeout, TransientHttpError)
+        )(self._get_once)
+    
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+            timeout=None) -> requests.Response:
+        """
+        发送 GET 请求（临时性错误重试后仍失败时抛出；非 2xx 状态抛出 requests.HTTPError）
+        
+        Args:
+            url: 请求地址
+            params: 查询参数
+            headers: 额外请求头
+            timeout: 超时（默认使用客户端配置）
+        
+        Returns:
+            响应对象
+        """
+        return self._get_with_retry(url, params, headers, timeout)
+    
+    def _get_once(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+                  timeout) -> requests.Response:
+        """发送一次 GET 请求（5xx/429 抛出 TransientHttpError）"""
+        host = urlsplit(url).hostname or ''
+        started = time.perf_counter()
+        error = True
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+            if response.status_code in RETRY_STATUS:
+                raise TransientHttpError(f"{response.status_code} Server Error for url: {response.url}",
+                                         response=response)
+            response.raise_for_status()
+            error = False
+            return response
+        finally:
+            self._record(host, time.perf_counter() - started, error)
+    
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                 timeout=None) -> Any:
+        """发送 GET 请求并解析 JSON 响应"""
+        return self.get(url, params=params, headers=headers, timeout=timeout).json()
+    
+    def _record(self, host: str, seconds: float, error: bool):
+        """记录主机请求统计"""
+        with self.lock:
+            stats = self.host_stats.get(host)
+            if stats is None:
+                stats = self.host_stats[host] = {'requests': 0, 'errors': 0, 'total_seconds': 0.0}
+            stats['requests'] += 1
+            stats['total_seconds'] += seconds
+            if error:
+                stats['errors'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各主机的请求统计"""
+        with self.lock:
+            return {
+                host: {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'avg_ms': stats['total_seconds'] / stats['requests'] * 1000 if stats['requests'] else 0.0,
+                }
+                for host, stats in self.host_stats.items()
+            }
+    
+    def close(self):
+        """关闭所有连接"""
+        self.session.close()
+
+
+# 全局实例
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> ProviderHttpClient:
+    """获取 HTTP 客户端实例（单例，连接池和代理来自配置）"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                from core.config import get_config
+                
+                config = get_config()
+                _http_client = ProviderHttpClient(
+                    pool_connections=int(config.get('http_pool_connections', DEFAULT_POOL_CONNECTIONS)),
+                    pool_maxsize=int(config.get('http_pool_maxsize', DEFAULT_POOL_MAXSIZE)),
+                    tmdb_proxy=config.get('tmdb_proxy') or None,
+                    retries=int(config.get('http_retries', DEFAULT_RETRIES))
+                )
+    return _http_client
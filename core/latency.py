@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟直方图
+按固定分桶累计全部请求的延迟分布，并保留最近若干次的样本用于计算近期百分位数
+（对冲查询的延迟阈值、熔断判断等都以近期百分位数为准）
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+# 分桶上界（毫秒），最后一个桶收纳更慢的请求
+BUCKETS_MS = (25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+# 近期样本数量
+RECENT_SAMPLES = 256
+
+
+class LatencyHistogram:
+    """延迟直方图（线程安全）"""
+    
+    def __init__(self, recent: int = RECENT_SAMPLES):
+        """
+        初始化直方图
+        
+        Args:
+            recent: 保留的近期样本数量
+        """
+        self.lock = threading.Lock()
+        self.counts: List[int] = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=recent)
+        self.total = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+    
+    def record(self, seconds: float):
+        """记录一次请求耗时（秒）"""
+        ms = seconds * 1000
+        index = 0
+        for bound in BUCKETS_MS:
+            if ms <= bound:
+                break
+            index += 1
+        with self.lock:
+            self.counts[index] += 1
+            self.recent.append(seconds)
+            self.total += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+    
+    def percentile(self, ratio: float, min_samples: int = 1) -> Optional[float]:
+        """
+        近期样本的百分位数（秒）
+        
+        Args:
+            ratio: 百分位（0-1，如 0.95）
+            min_samples: 样本不足时返回 None
+        
+        Returns:
+            百分位延迟（秒）
+        """
+        with self.lock:
+            samples = sorted(self.recent)
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, max(0, int(round(ratio * len(samples) + 0.5)) - 1))
+        return samples[index]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """直方图快照（用于统计接口）"""
+        p50 = self.percentile(0.50)
+        p95 = self.percentile(0.95)
+        with self.lock:
+            buckets = {f"<={bound}ms": count for bound, count in zip(BUCKETS_MS, self.counts)}
+            buckets[f">{BUCKETS_MS[-1]}ms"] = self.counts[-1]
+            return {
+                'count': self.total,
+                'avg_ms': self.total_seconds / self.total * 1000 if self.total else 0.0,
+                'max_ms': self.max_seconds * 1000,
+                'p50_ms': p50 * 1000 if p50 is not None else None,
+                'p95_ms': p95 * 1000 if p95 is not None else None,
+                'buckets': buckets,
+            }
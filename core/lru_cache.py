@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LRU 缓存
+容量固定的最近最少使用缓存，带命中/未命中统计（线程安全）
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """LRU 缓存"""
+    
+    def __init__(self, max_size: int = 10000):
+        """
+        初始化 LRU 缓存
+        
+        Args:
+            max_size: 最大条目数（0 表示不缓存）
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存值（命中时移到最近使用端）
+        
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+        
+        Returns:
+            缓存值
+        """
+        with self.lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """
+        写入缓存（超出容量时淘汰最久未使用的条目）
+        
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if self.max_size <= 0:
+            return
+        
+        with self.lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除并返回缓存值"""
+        with self.lock:
+            return self._data.pop(key, default)
+    
+    def clear(self):
+        """清空缓存（保留统计）"""
+        with self.lock:
+            self._data.clear()
+    
+    def reset_stats(self):
+        """重置命中统计"""
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+    
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """当前条目快照（从最久未使用到最近使用）"""
+        with self.lock:
+            return list(self._data.items())
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0,
+        }
+
+
+class TimedLRUCache(LRUCache):
+    """记录写入时间的 LRU 缓存（导出快照时带上写入时间，导入时据此跳过过期条目）"""
+    
+    def __init__(self, max_size: int = 10000):
+        super().__init__(max_size)
+        self._created: Dict[Hashable, float] = {}
+    
+    def put(self, key: Hashable, value: Any, created_at: Optional[float] = None):
+        """
+        写入缓存（超出容量时淘汰最久未使用的条目）
+        
+        Args:
+            key: 缓存键
+            value: 缓存值
+            created_at: 写入时间（默认为当前时间；从快照导入时沿用原来的时间）
+        """
+        if self.max_size <= 0:
+            return
+        
+        with self.lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._created[key] = time.time() if created_at is None else created_at
+            while len(self._data) > self.max_size:
+                evicted, _ = self._data.popitem(last=False)
+                del self._created[evicted]
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除并返回缓存值"""
+        with self.lock:
+            self._created.pop(key, None)
+            return self._data.pop(key, default)
+    
+    def clear(self):
+        """清空缓存（保留统计）"""
+        with self.lock:
+            self._data.clear()
+            self._created.clear()
+    
+    def timed_items(self) -> List[Tuple[Hashable, Any, float]]:
+        """当前条目快照 [(键, 值, 写入时间)]（从最久未使用到最近使用）"""
+        with self.lock:
+            return [(key, value, self._created[key]) for key, value in self._data.items()]
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流媒体平台 / 版本标签识别
+平台列表来自 MoviePilot 的 StreamingPlatforms，版本标签（加长版、导演剪辑版等）为内置表；
+所有别名按词元编译为前缀树，对文件名的词元做一次线性查找
+
+识别到的标签会从标题来源中移除，同一作品不同平台/版本的文件得到相同的标题，
+标题缓存键保持稳定。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+# 流媒体平台简称与全称（与 MoviePilot app/core/meta/streamingplatform.py 保持一致）
+STREAMING_PLATFORMS: List[Tuple[str, str]] = [
+    ("AMZN", "Amazon"),
+    ("NF", "Netflix"),
+    ("ATVP", "Apple TV+"),
+    ("iT", "iTunes"),
+    ("DSNP", "Disney+"),
+    ("HS", "Hotstar"),
+    ("APPS", "Disney+ MENA"),
+    ("PMTP", "Paramount+"),
+    ("HMAX", "Max"),
+    ("", "Max"),
+    ("HULU", "Hulu Networks"),
+    ("MA", "Movies Anywhere"),
+    ("BCORE", "Bravia Core"),
+    ("MS", "Microsoft Store"),
+    ("SHO", "Showtime"),
+    ("STAN", "Stan"),
+    ("PCOK", "Peacock"),
+    ("SKST", "SkyShowtime"),
+    ("NOW", "Now"),
+    ("FXTL", "Foxtel Now"),
+    ("BNGE", "Binge"),
+    ("CRKL", "Crackle"),
+    ("RKTN", "Rakuten TV"),
+    ("ALL4", "Channel 4"),
+    ("AS", "Adult Swim"),
+    ("BRTB", "Brtb TV"),
+    ("CNLP", "Canal+"),
+    ("CRIT", "Criterion Channel"),
+    ("DSCP", "Discovery+"),
+    ("FOOD", "Food Network"),
+    ("MUBI", "Mubi"),
+    ("PLAY", "Google Play"),
+    ("YT", "YouTube"),
+    ("", "friDay"),
+    ("", "KKTV"),
+    ("", "ofiii"),
+    ("", "LiTV"),
+    ("", "MyVideo"),
+    ("Hami", "Hami Video"),
+    ("HamiVideo", "Hami Video"),
+    ("MW", "meWATCH"),
+    ("CATCHPLAY", "CATCHPLAY+"),
+    ("CPP", "CATCHPLAY+"),
+    ("LINETV", "LINE TV"),
+    ("VIU", "Viu"),
+    ("IQ", ""),
+    ("", "WeTV"),
+    ("ABMA", "Abema"),
+    ("ADN", ""),
+    ("AT-X", ""),
+    ("Baha", ""),
+    ("BG", "B-Global"),
+    ("CR", "Crunchyroll"),
+    ("", "DMM"),
+    ("FOD", ""),
+    ("FUNi", "Funimation"),
+    ("HIDI", "HIDIVE"),
+    ("UNXT", "U-NEXT"),
+    ("FAA", "Filmarchiv Austria"),
+    ("CC", "Comedy Central"),
+    ("iP", "BBC iPlayer"),
+    ("9NOW", "9Now"),
+    ("ABC", ""),
+    ("", "AMC"),
+    ("", "ZEE5"),
+    ("", "WAVO"),
+    ("SHAHID", "Shahid"),
+    ("Flixole", "FlixOlé"),
+    ("TOU", "Ici TOU.TV"),
+    ("ROKU", "Roku"),
+    ("KNPY", "Kanopy"),
+    ("SNXT", "Sun NXT"),
+    ("CUR", "Curiosity Stream"),
+    ("MY5", "Channel 5"),
+    ("AHA", "aha"),
+    ("WOWP", "WOW Presents Plus"),
+    ("JC", "JioCinema"),
+    ("", "Dekkoo"),
+    ("FILMZIE", "Filmzie"),
+    ("HoiChoi", "Hoichoi"),
+    ("VIKI", "Rakuten Viki"),
+    ("SF", "SF Anytime"),
+    ("PLEX", "Plex"),
+    ("SHDR", "Shudder"),
+    ("CRAV", "Crave"),
+    ("CPE", "Cineplex Entertainment"),
+    ("JF HC", ""),
+    ("JF", ""),
+    ("JFFP", ""),
+    ("VIAP", "Viaplay"),
+    ("TUBI", "TubiTV"),
+    ("", "PBS"),
+    ("PBSK", "PBS KIDS"),
+    ("LGP", "Lionsgate Play"),
+    ("", "CTV"),
+    ("", "Cineverse"),
+    ("LN", "Love Nature"),
+    ("MP", "Movistar Plus+"),
+    ("RUNTIME", "Runtime"),
+    ("STZ", "STARZ"),
+    ("FUBO", "fuboTV"),
+    ("TENK", "Tënk"),
+    ("KNOW", "Knowledge Network"),
+    ("TVO", "tvo"),
+    ("", "OVID"),
+    ("CBC", "CBC Gem"),
+    ("FANDOR", "fandor"),
+    ("CW", "The CW"),
+    ("KNPY", "Kanopy"),
+    ("FREE", "Freeform"),
+    ("AE", "A&E"),
+    ("LIFE", "Lifetime"),
+    ("WWEN", "WWE Network"),
+    ("CMAX", "Cinemax"),
+    ("HLMK", "Hallmark"),
+    ("BYU", "BYUtv"),
+    ("", "ViX"),
+    ("VICE", "Viceland"),
+    ("", "TVING"),
+    ("USAN", "USA Network"),
+    ("FOX", ""),
+    ("", "TCM"),
+    ("BRAV", "BravoTV"),
+    ("", "TNT"),
+    ("", "ZDF"),
+    ("", "IndieFlix"),
+    ("", "TLC"),
+    ("", "HGTV"),
+    ("ANPL", "Animal Planet"),
+    ("TRVL", "Travel Channel"),
+    ("", "VH1"),
+    ("SAINA", "Saina Play"),
+    ("SP", "Saina Play"),
+    ("OXGN", "Oxygen"),
+    ("PSN", "PlayStation Network"),
+    ("PMNT", "Paramount Network"),
+    ("FAWESOME", "Fawesome"),
+    ("KLASSIKI", "Klassiki"),
+    ("STRP", "Star+"),
+    ("NATG", "National Geographic"),
+    ("REVEEL", "Reveel"),
+    ("FYI", "FYI Network"),
+    ("WatchiT", "WATCH IT"),
+    ("ITVX", "ITV"),
+    ("GAIA", "Gaia"),
+    ("", "FlixLatino"),
+    ("CNNP", "CNN+"),
+    ("TROMA", "Troma"),
+    ("IVI", "Ivi"),
+    ("9NOW", "9Now"),
+    ("A3P", "Atresplayer"),
+    ("7PLUS", "7plus"),
+    ("", "SBS"),
+    ("TEN", "10Play"),
+    ("AUBC", ""),
+    ("DSNY", "Disney Networks"),
+    ("OSN", "OSN+"),
+    ("SVT", "Sveriges Television"),
+    ("LACINETEK", "LaCinetek"),
+    ("", "Maxdome"),
+    ("RTL", "RTL+"),
+    ("ARTE", "Arte"),
+    ("JOYN", "Joyn"),
+    ("TV2", "TV 2"),
+    ("3SAT", "3sat"),
+    ("FILMINGO", "filmingo"),
+    ("", "WOW"),
+    ("OKKO", "Okko"),
+    ("", "Go3"),
+    ("ARGP", "Argo"),
+    ("VOYO", "Voyo"),
+    ("VMAX", "vivamax"),
+    ("FILMIN", "Filmin"),
+    ("", "Mitele"),
+    ("MY5", "Channel 5"),
+    ("", "ARD"),
+    ("BK", "Bentkey"),
+    ("BOOM", "Boomerang"),
+    ("", "CBS"),
+    ("CLBI", "Club illico"),
+    ("CMOR", "C More"),
+    ("CMT", ""),
+    ("", "CNBC"),
+    ("COOK", "Cooking Channel"),
+    ("CWS", "CW Seed"),
+    ("DCU", "DC Universe"),
+    ("DDY", "Digiturk Dilediğin Yerde"),
+    ("DEST", "Destination America"),
+    ("DISC", "Discovery Channel"),
+    ("DW", "DailyWire+"),
+    ("DLWP", "DailyWire+"),
+    ("DPLY", "dplay"),
+    ("DRPO", "Dropout"),
+    ("EPIX", "EPIX MGM+"),
+    ("ESQ", "Esquire"),
+    ("ETV", "E!"),
+    ("FBWatch", "Facebook Watch"),
+    ("FPT", "FPT Play"),
+    ("FTV", "France.tv"),
+    ("GLOB", "GloboSat Play"),
+    ("GLBO", "Globoplay"),
+    ("GO90", "go90"),
+    ("HIST", "History Channel"),
+    ("HPLAY", "Hungama Play"),
+    ("KS", "Kaleidescape"),
+    ("", "MBC"),
+    ("MMAX", "ManoramaMAX"),
+    ("MNBC", "MSNBC"),
+    ("MTOD", "Motor Trend OnDemand"),
+    ("NBC", ""),
+    ("NBLA", "Nebula"),
+    ("NICK", "Nickelodeon"),
+    ("ODK", "OnDemandKorea"),
+    ("POGO", "PokerGO"),
+    ("PUHU", "puhutv"),
+    ("QIBI", "Quibi"),
+    ("RTE", "RTÉ"),
+    ("SESO", "Seeso"),
+    ("SPIK", "Spike"),
+    ("SS", "Simply South"),
+    ("SYFY", "SyFy"),
+    ("TIMV", "TIMvision"),
+    ("TK", "Tentkotta"),
+    ("", "TV4"),
+    ("TVL", "TV Land"),
+    ("", "TVNZ"),
+    ("", "UKTV"),
+    ("VLCT", "Discovery Velocity"),
+    ("VMEO", "Vimeo"),
+    ("VRV", "VRV Defunct"),
+    ("WTCH", "Watcha"),
+    ("", "NowPlayer"),
+    ("HuluJP", "Hulu Networks"),
+    ("Gaga", "GagaOOLala"),
+    ("MyTVS", "MyTVSuper"),
+    ("", "BBC"),
+    ("CC", "Comedy Central"),
+    ("NowE", "Now E"),
+    ("WAVVE", "Wavve"),
+    ("SE", ""),
+    ("", "BritBox"),
+    ("AOD", "Anime on Demand"),
+    ("AF", ""),
+    ("BCH", "Bandai Channel"),
+    ("VMJ", "VideoMarket"),
+    ("LFTL", "Laftel"),
+    ("WAKA", "Wakanim"),
+    ("WAKANIM", "Wakanim"),
+    ("AO", "AnimeOnegai"),
+    ("", "Lemino"),
+    ("VIDIO", "Vidio"),
+    ("TVER", "TVer"),
+    ("", "MBS"),
+    ("LFTLNET", "Laftel"),
+    ("JONU", "Jonu Play"),
+    ("PlutoTV", "Pluto TV"),
+    ("AbemaTV", "Abema"),
+    ("", "dTV"),
+    ("NYMEY", "Nymey"),
+    ("SMNS", "SAMANSA"),
+    ("CTHP", "CATCHPLAY+"),
+    ("HBOGO", "HBO GO"),
+    ("HBO", "HBO"),
+    ("FPTP", "FPT Play"),
+    ("", "LOCIPO"),
+    ("DANT", "DANET"),
+    ("OV", "OceanVeil"),
+]
+
+# 版本标签：(别名, 标准名称)，别名按空格分词
+EDITIONS: List[Tuple[str, str]] = [
+    ("Director's Cut", "Director's Cut"),
+    ("Directors Cut", "Director's Cut"),
+    ("Director Cut", "Director's Cut"),
+    ("DC Edition", "Director's Cut"),
+    ("Extended", "Extended"),
+    ("Extended Cut", "Extended"),
+    ("Extended Edition", "Extended"),
+    ("Extended Version", "Extended"),
+    ("Theatrical", "Theatrical"),
+    ("Theatrical Cut", "Theatrical"),
+    ("Unrated", "Unrated"),
+    ("Uncut", "Uncut"),
+    ("Uncensored", "Uncut"),
+    ("Remastered", "Remastered"),
+    ("4K Remastered", "Remastered"),
+    ("IMAX", "IMAX"),
+    ("IMAX Edition", "IMAX"),
+    ("IMAX Enhanced", "IMAX"),
+    ("Criterion", "Criterion"),
+    ("Criterion Collection", "Criterion"),
+    ("Special Edition", "Special Edition"),
+    ("Collector's Edition", "Collector's Edition"),
+    ("Collectors Edition", "Collector's Edition"),
+    ("Anniversary Edition", "Anniversary Edition"),
+    ("Final Cut", "Final Cut"),
+    ("Ultimate Cut", "Ultimate Cut"),
+    ("Ultimate Edition", "Ultimate Cut"),
+    ("Open Matte", "Open Matte"),
+    ("导演剪辑版", "Director's Cut"),
+    ("导演版", "Director's Cut"),
+    ("加长版", "Extended"),
+    ("未删减版", "Uncut"),
+    ("未删节版", "Uncut"),
+    ("重制版", "Remastered"),
+    ("修复版", "Remastered"),
+    ("院线版", "Theatrical"),
+]
+
+# 平台标签必须与这些词元相邻才生效（与 MoviePilot 一致，避免 NOW、FREE 等标题词误判）
+WEB_TOKENS = frozenset(('web', 'dl', 'webdl', 'web-dl', 'webrip', 'web-rip'))
+
+# 词元首尾可能带的括号
+_TOKEN_BRACKETS = '[]()【】（）'
+
+
+class _TrieNode:
+    """前缀树节点：子节点按小写词元索引，value 为别名结束时的标准名称"""
+    
+    __slots__ = ('children', 'value')
+    
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.value: Optional[str] = None
+
+
+def _build_trie(entries: List[Tuple[str, str]]) -> _TrieNode:
+    """按词元构建前缀树（简称与全称都作为别名，标准名称优先取全称）"""
+    root = _TrieNode()
+    for short_name, full_name in entries:
+        canonical = full_name or short_name
+        if not canonical:
+            continue
+        for alias in (short_name, full_name):
+            if not alias:
+                continue
+            node = root
+            for token in alias.lower().split():
+                node = node.children.setdefault(token, _TrieNode())
+            if node.value is None:
+                node.value = canonical
+    return root
+
+
+class MediaTagDetector:
+    """流媒体平台 / 版本标签识别器"""
+    
+    def __init__(self):
+        self.platforms = _build_trie(STREAMING_PLATFORMS)
+        self.editions = _build_trie(EDITIONS)
+        # 能作为任一别名第一个词元的词元（其余词元不必查前缀树）
+        self._starts = frozenset(self.platforms.children) | frozenset(self.editions.children)
+    
+    @staticmethod
+    def token(raw: str) -> Optional[Tuple[str, int, int]]:
+        """
+        单个小写词元去掉首尾括号
+        
+        Returns:
+            (词元, 词元内起始偏移, 词元内结束偏移)，去掉括号后为空时返回 None
+        """
+        token = raw.strip(_TOKEN_BRACKETS)
+        if not token:
+            return None
+        offset = raw.find(token)
+        return token, offset, offset + len(token)
+    
+    def tokenize(self, low: str) -> List[Tuple[str, int, int]]:
+        """按空格切分小写文本：[(词元, 起始位置, 结束位置)]"""
+        tokens = []
+        position = 0
+        for raw in low.split(' '):
+            if raw:
+                token = self.token(raw)
+                if token is not None:
+                    tokens.append((token[0], position + token[1], position + token[2]))
+            position += len(raw) + 1
+        return tokens
+    
+    def detect(
+        self,
+        text: str,
+        low: Optional[str] = None,
+        tokens: Optional[List[Tuple[str, int, int]]] = None,
+        edition_start: int = 0
+    ) -> Tuple[Optional[str], Optional[str], List[Tuple[int, int]]]:
+        """
+        识别平台和版本标签
+        
+        Args:
+            text: 已清理的文件名（词元以空格分隔）
+            low: 与 text 逐字符对齐的小写文本（可选）
+            tokens: 已切分的词元（可选，识别器按词元缓存 token() 的结果后直接传入，不再切分）
+            edition_start: 版本标签的最小起始位置（识别器传入年份/季集/第一个技术标签的位置，
+                           The Final Cut、The Directors Cut 等标题中的词不算版本标签）
+        
+        Returns:
+            (平台标准名称, 版本标准名称, 标签位置列表)，位置按出现顺序
+        """
+        if tokens is None:
+            tokens = self.tokenize(low if low is not None else text.lower())
+        
+        platform = None
+        edition = None
+        spans = []
+        count = len(tokens)
+        index = 0
+        starts = self._starts
+        while index < count:
+            if tokens[index][0] not in starts:
+                index += 1
+                continue
+            # 版本标签不能出现在第一个词元（Uncut Gems、Extended Family 等标题），也不能在 edition_start 之前
+            if index and tokens[index][1] >= edition_start:
+                matched = self._longest(self.editions, tokens, index)
+            else:
+                matched = None
+            if matched:
+                end, value = matched
+                edition = edition or value
+            else:
+                matched = self._longest(self.platforms, tokens, index)
+                if matched:
+                    end, value = matched
+                    before = tokens[index - 1][0] if index else None
+                    after = tokens[end][0] if end < count else None
+                    if before in WEB_TOKENS or after in WEB_TOKENS:
+                        platform = platform or value
+                    else:
+                        matched = None
+            if matched:
+                spans.append((tokens[index][1], tokens[end - 1][2]))
+                index = end
+            else:
+                index += 1
+        return platform, edition, spans
+    
+    @staticmethod
+    def _longest(root: _TrieNode, tokens: list, start: int) -> Optional[Tuple[int, str]]:
+        """从 start 开始的最长别名：(结束词元下标, 标准名称)"""
+        node = root
+        best = None
+        for index in range(start, len(tokens)):
+            node = node.children.get(tokens[index][0])
+            if node is None:
+                break
+            if node.value is not None:
+                best = (index + 1, node.value)
+        return best
+    
+    @staticmethod
+    def strip(text: str, spans: List[Tuple[int, int]]) -> str:
+        """把标签位置替换为等长空格（其他位置的偏移保持不变，可继续按原位置移除制作组）"""
+        if not spans:
+            return text
+        parts = []
+        start = 0
+        for span_start, span_end in spans:
+            parts.append(text[start:span_start])
+            parts.append(' ' * (span_end - span_start))
+            start = span_end
+        parts.append(text[start:])
+        return ''.join(parts)
+
+
+# 全局实例
+_media_tag_detector = None
+
+
+def get_media_tag_detector() -> MediaTagDetector:
+    """获取标签识别器实例（单例）"""
+    global _media_tag_detector
+    if _media_tag_detector is None:
+        _media_tag_detector = MediaTagDetector()
+    return _media_tag_detector
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据持久化缓存
+把标题查询结果（TMDB/豆瓣）保存在 SQLite（WAL 模式）中，进程重启后仍然有效
+
+- 键为规范化的 标题/年份/类型（core.title_key.canonical_key）
+- 查到结果时同时按作品 ID（TMDB/豆瓣）保存元数据，并把所有解析到该作品的查询标题记为别名：
+  查询 → 别名 → 作品 ID → 元数据，同一作品的新写法只需一次本地查询
+- 查到结果（正向）和确认查不到（负向）分别使用不同的过期时间
+- 超出条目上限时按过期时间从早到晚淘汰；作品表和别名表同样有上限（别名按登记先后淘汰）
+- 统计命中、未命中、负向命中和查询耗时
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.title_key import canonical_key
+
+
+# 默认配置
+DEFAULT_DB_PATH = "data/metadata_cache.db"
+DEFAULT_POSITIVE_TTL = 30 * 24 * 3600     # 查到结果：30 天
+DEFAULT_NEGATIVE_TTL = 24 * 3600          # 查不到结果：1 天
+DEFAULT_MAX_ENTRIES = 100000
+ALIASES_PER_MEDIA = 4                     # 别名表上限 = 条目上限 × 该倍数
+
+# 未命中标记（与缓存的负向结果 None 区分）
+MISS = object()
+
+# 快照导出/导入的表：类型 -> (表名, 列)；entries 和 media 的最后一列为过期时间
+SNAPSHOT_TABLES = {
+    'entries': ('metadata_cache', ('key', 'value', 'created_at', 'expires_at')),
+    'media': ('media_metadata', ('provider', 'media_id', 'is_tv', 'title', 'details', 'updated_at', 'expires_at')),
+    'aliases': ('media_aliases', ('key', 'provider', 'media_id', 'is_tv')),
+}
+
+
+class MetadataCache:
+    """元数据持久化缓存（线程安全）"""
+    
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        positive_ttl: int = DEFAULT_POSITIVE_TTL,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        初始化缓存
+        
+        Args:
+            db_path: 数据库文件路径（":memory:" 表示仅在内存中）
+            positive_ttl: 正向结果过期时间（秒）
+            negative_ttl: 负向结果过期时间（秒，0 表示不缓存负向结果）
+            max_entries: 最大条目数（0 表示不限制；作品表上限相同，别名表为 ALIASES_PER_MEDIA 倍）
+        """
+        self.db_path = db_path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+        self.alias_hits = 0
+        self.lookup_seconds = 0.0
+        self.max_lookup_seconds = 0.0
+        
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+        self._count_rows()
+    
+    def _init_db(self):
+        """初始化数据库表"""
+        if self.db_path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS metadata_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metadata_cache_expires
+            ON metadata_cache(expires_at)
+        ''')
+        # 按作品 ID 保存的元数据（provider: tmdb / douban）
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_metadata (
+                provider TEXT NOT NULL,
+                media_id TEXT NOT NULL,
+                is_tv INTEGER NOT NULL,
+                title TEXT,
+                details TEXT,
+                updated_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (provider, media_id, is_tv)
+            )
+        ''')
+        # 别名：规范化的查询键 -> 作品 ID
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_aliases (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                media_id TEXT NOT NULL,
+                is_tv INTEGER NOT NULL
+            )
+        ''')
+        self.conn.commit()
+    
+    def get(self, title: str, year: Any = None, is_tv: bool = False) -> Any:
+        """
+        查询缓存
+        
+        Returns:
+            缓存值；负向结果返回 None；未命中或已过期返回 MISS
+        """
+        key = canonical_key(title, year, is_tv)
+        started = time.perf_counter()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT value, expires_at FROM metadata_cache WHERE key = ?', (key,)
+            ).fetchone()
+            
+            if row is None:
+                # 查询键未缓存时经别名找到作品
+                media = self._find_media(key)
+                if media is None:
+                    self.misses += 1
+                    value = MISS
+                else:
+                    self.hits += 1
+                    self.alias_hits += 1
+                    value = media['title']
+            elif row[1] <= time.time():
+                self.conn.execute('DELETE FROM metadata_cache WHERE key = ?', (key,))
+                self.conn.commit()
+                self._entries -= 1
+                self.expired += 1
+                self.misses += 1
+                value = MISS
+            else:
+                value = row[0]
+                if value is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+            
+            elapsed = time.perf_counter() - started
+            self.lookup_seconds += elapsed
+            self.max_lookup_seconds = max(self.max_lookup_seconds, elapsed)
+        return value
+    
+    def put(self, title: str, year: Any, is_tv: bool, value: Optional[str]):
+        """
+        写入缓存
+        
+        Args:
+            title: 查询标题
+            year: 年份
+            is_tv: 是否为电视剧
+            value: 查询结果（None 表示确认查不到）
+        """
+        ttl = self.positive_ttl if value is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        
+        key = canonical_key(title, year, is_tv)
+        now = time.time()
+        with self.lock:
+            existed = self.conn.execute(
+                'SELECT 1 FROM metadata_cache WHERE key = ?', (key,)
+            ).fetchone() is not None
+            self.conn.execute(
+                'INSERT OR REPLACE INTO metadata_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                (key, value, now, now + ttl)
+            )
+            if not existed:
+                self._entries += 1
+            self.writes += 1
+            
+            if self.max_entries and self._entries > self.max_entries:
+                self._evict(now)
+            self.conn.commit()
+    
+    def put_media(
+        self,
+        provider: str,
+        media_id: Any,
+        is_tv: bool,
+        title: str,
+        aliases: Iterable[Tuple[str, Any]] = (),
+        details: Optional[Dict[str, Any]] = None
+    ):
+        """
+        按作品 ID 写入元数据并登记别名
+        
+        Args:
+            provider: 提供方（tmdb / douban）
+            media_id: 作品 ID
+            is_tv: 是否为电视剧
+            title: 中文标题
+            aliases: 解析到该作品的 (标题, 年份) 序列（查询标题、原始标题等）
+            details: 详细元数据（可选，None 时保留已有的详细信息）
+        """
+        if self.positive_ttl <= 0:
+            return
+        
+        media_id = str(media_id)
+        now = time.time()
+        with self.lock:
+            existed = self.conn.execute(
+                'SELECT 1 FROM media_metadata WHERE provider = ? AND media_id = ? AND is_tv = ?',
+                (provider, media_id, int(is_tv))
+            ).fetchone() is not None
+            self.conn.execute('''
+                INSERT INTO media_metadata (provider, media_id, is_tv, title, details, updated_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (provider, media_id, is_tv) DO UPDATE SET
+                    title = excluded.title,
+                    details = COALESCE(excluded.details, media_metadata.details),
+                    updated_at = excluded.updated_at,
+                    expires_at = excluded.expires_at
+            ''', (
+                provider, media_id, int(is_tv), title,
+                json.dumps(details, ensure_ascii=False, separators=(',', ':')) if details is not None else None,
+                now, now + self.positive_ttl
+            ))
+            # 已登记的别名不覆盖（先解析到的作品为准）
+            self._aliases += self.conn.executemany(
+                'INSERT OR IGNORE INTO media_aliases (key, provider, media_id, is_tv) VALUES (?, ?, ?, ?)',
+                [(canonical_key(alias, year, is_tv), provider, media_id, int(is_tv))
+                 for alias, year in aliases if alias]
+            ).rowcount
+            if not existed:
+                self._media += 1
+            
+            if self._media_over_limit():
+                self._evict_media(now)
+            self.conn.commit()
+    
+    def get_media(self, provider: str, media_id: Any, is_tv: bool) -> Optional[Dict[str, Any]]:
+        """
+        按作品 ID 查询元数据
+        
+        Returns:
+            {'provider', 'media_id', 'is_tv', 'title', 'details'}，未命中或已过期返回 None
+        """
+        with self.lock:
+            return self._get_media(provider, str(media_id), is_tv)
+    
+    def find_media(self, title: str, year: Any = None, is_tv: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        经别名查询作品元数据（查询 → 别名 → 作品 ID → 元数据）
+        
+        Returns:
+            作品元数据，别名未登记或作品已过期返回 None
+        """
+        with self.lock:
+            return self._find_media(canonical_key(title, year, is_tv))
+    
+    def _find_media(self, key: str) -> Optional[Dict[str, Any]]:
+        """经别名查询作品元数据（需持有锁）"""
+        row = self.conn.execute(
+            'SELECT provider, media_id, is_tv FROM media_aliases WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._get_media(row[0], row[1], bool(row[2]))
+    
+    def _get_media(self, provider: str, media_id: str, is_tv: bool) -> Optional[Dict[str, Any]]:
+        """按作品 ID 查询元数据（需持有锁）"""
+        row = self.conn.execute(
+            'SELECT title, details, expires_at FROM media_metadata WHERE provider = ? AND media_id = ? AND is_tv = ?',
+            (provider, media_id, int(is_tv))
+        ).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        return {
+            'provider': provider,
+            'media_id': media_id,
+            'is_tv': is_tv,
+            'title': row[0],
+            'details': json.loads(row[1]) if row[1] else None,
+        }
+    
+    def _evict(self, now: float):
+        """淘汰条目：先删除已过期的，仍超出上限时按过期时间从早到晚删除（多删 10% 避免频繁淘汰）"""
+        removed = self.conn.execute('DELETE FROM metadata_cache WHERE expires_at <= ?', (now,)).rowcount
+        excess = self._entries - removed - int(self.max_entries * 0.9)
+        if excess > 0:
+            removed += self.conn.execute(
+                'DELETE FROM metadata_cache WHERE key IN '
+                '(SELECT key FROM metadata_cache ORDER BY expires_at LIMIT ?)',
+                (excess,)
+            ).rowcount
+        self._entries -= removed
+        self.evictions += removed
+    
+    def _media_over_limit(self) -> bool:
+        """作品表或别名表是否超出上限（需持有锁）"""
+        return bool(self.max_entries) and (
+            self._media > self.max_entries or self._aliases > self.max_entries * ALIASES_PER_MEDIA
+        )
+    
+    def _evict_media(self, now: float):
+        """
+        淘汰作品和别名（需持有锁）
+        作品与条目相同：先删已过期的，再按过期时间从早到晚删到上限的 90%；
+        随后删除指向已删除作品的别名，别名仍超出上限时按登记先后删除最早的
+        """
+        removed = self.conn.execute('DELETE FROM media_metadata WHERE expires_at <= ?', (now,)).rowcount
+        excess = self._media - removed - int(self.max_entries * 0.9)
+        if excess > 0:
+            removed += self.conn.execute(
+                'DELETE FROM media_metadata WHERE rowid IN '
+                '(SELECT rowid FROM media_metadata ORDER BY expires_at LIMIT ?)',
+                (excess,)
+            ).rowcount
+        self._media -= removed
+        
+        aliases = self._purge_aliases()
+        excess = self._aliases - aliases - int(self.max_entries * ALIASES_PER_MEDIA * 0.9)
+        if excess > 0:
+            aliases += self.conn.execute(
+                'DELETE FROM media_aliases WHERE rowid IN '
+                '(SELECT rowid FROM media_aliases ORDER BY rowid LIMIT ?)',
+                (excess,)
+            ).rowcount
+        self._aliases -= aliases
+        self.evictions += removed + aliases
+    
+    def _count_rows(self):
+        """重新统计三张表的行数（需持有锁或在初始化时调用）"""
+        self._entries = self.conn.execute('SELECT COUNT(*) FROM metadata_cache').fetchone()[0]
+        self._media = self.conn.execute('SELECT COUNT(*) FROM media_metadata').fetchone()[0]
+        self._aliases = self.conn.execute('SELECT COUNT(*) FROM media_aliases').fetchone()[0]
+    
+    def purge_expired(self) -> int:
+        """删除所有已过期条目，返回删除数量"""
+        with self.lock:
+            now = time.time()
+            removed = self.conn.execute(
+                'DELETE FROM metadata_cache WHERE expires_at <= ?', (now,)
+            ).rowcount
+            self._media -= self.conn.execute(
+                'DELETE FROM media_metadata WHERE expires_at <= ?', (now,)
+            ).rowcount
+            self._aliases -= self._purge_aliases()
+            self.conn.commit()
+            self._entries -= removed
+        return removed
+    
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.conn.execute('DELETE FROM metadata_cache')
+            self.conn.execute('DELETE FROM media_metadata')
+            self.conn.execute('DELETE FROM media_aliases')
+            self.conn.commit()
+            self._entries = self._media = self._aliases = 0
+    
+    def export_rows(self, chunk_size: int = 5000) -> Iterator[Tuple[str, tuple]]:
+        """
+        逐批导出所有未过期的行（每批单独加锁，导出期间不阻塞查询）
+        
+        Args:
+            chunk_size: 每批读取的行数
+        
+        Yields:
+            (类型, 行)，类型为 SNAPSHOT_TABLES 的键
+        """
+        now = time.time()
+        for kind, (table, columns) in SNAPSHOT_TABLES.items():
+            expires = kind != 'aliases'
+            last = 0
+            while True:
+                with self.lock:
+                    rows = self.conn.execute(
+                        f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                        (last, chunk_size)
+                    ).fetchall()
+                if not rows:
+                    break
+                last = rows[-1][0]
+                for row in rows:
+                    if expires and row[-1] <= now:
+                        continue
+                    yield kind, row[1:]
+    
+    def import_rows(self, kind: str, rows: List[tuple]) -> int:
+        """
+        导入一批快照行（保留原过期时间，已过期的行跳过；已有别名不覆盖）
+        
+        Args:
+            kind: 类型（SNAPSHOT_TABLES 的键）
+            rows: 行列表
+        
+        Returns:
+            导入的行数
+        """
+        table, columns = SNAPSHOT_TABLES[kind]
+        if kind != 'aliases':
+            now = time.time()
+            rows = [row for row in rows if row[-1] > now]
+        if not rows:
+            return 0
+        
+        verb = 'INSERT OR IGNORE' if kind == 'aliases' else 'INSERT OR REPLACE'
+        placeholders = ', '.join('?' * len(columns))
+        with self.lock:
+            self.conn.executemany(f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            self._count_rows()
+            if kind == 'entries':
+                if self.max_entries and self._entries > self.max_entries:
+                    self._evict(time.time())
+            elif self._media_over_limit():
+                self._evict_media(time.time())
+            self.conn.commit()
+        return len(rows)
+    
+    def _purge_aliases(self) -> int:
+        """删除指向已不存在作品的别名（需持有锁），返回删除数量"""
+        return self.conn.execute('''
+            DELETE FROM media_aliases WHERE NOT EXISTS (
+                SELECT 1 FROM media_metadata m
+                WHERE m.provider = media_aliases.provider AND m.media_id = media_aliases.media_id
+                    AND m.is_tv = media_aliases.is_tv
+            )
+        ''').rowcount
+    
+    def __len__(self) -> int:
+        return self._entries
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'db_path': self.db_path,
+            'entries': self._entries,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'media': self._media,
+            'aliases': self._aliases,
+            'alias_hits': self.alias_hits,
+            'hit_rate': (self.hits + self.negative_hits) / lookups if lookups > 0 else 0.0,
+            'avg_lookup_ms': self.lookup_seconds / lookups * 1000 if lookups > 0 else 0.0,
+            'max_lookup_ms': self.max_lookup_seconds * 1000,
+        }
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+
+# 全局实例
+_metadata_cache = None
+
+
+def get_metadata_cache() -> MetadataCache:
+    """获取元数据缓存实例（单例，参数来自配置；配置 Redis 时为 SharedMetadataCache）"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        from core.config import get_config
+        
+        config = get_config()
+        # 关闭缓存时只在内存中缓存（本次运行内有效）
+        db_path = config.get('metadata_cache_path', DEFAULT_DB_PATH) or DEFAULT_DB_PATH
+        if not config.get('cache_enabled', True):
+            db_path = ':memory:'
+        _metadata_cache = MetadataCache(
+            db_path=db_path,
+            positive_ttl=int(config.get('metadata_cache_ttl', DEFAULT_POSITIVE_TTL)),
+            negative_ttl=int(config.get('metadata_cache_negative_ttl', DEFAULT_NEGATIVE_TTL)),
+            max_entries=int(config.get('metadata_cache_max_entries', DEFAULT_MAX_ENTRIES))
+        )
+        
+        # 配置了 Redis（redis_url 或 REDIS_URL）时加上进程内 LRU 和跨节点共享层
+        from core.shared_cache import wrap_shared_cache
+        _metadata_cache = wrap_shared_cache(_metadata_cache, config)
+    return _metadata_cache
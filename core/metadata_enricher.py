@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据补全
+中文标题解析之后，按作品（而不是按文件）从 TMDB 获取详情：
+- 每部作品一次 /movie/{id} 或 /tv/{id} 请求，用 append_to_response 同时取回批内涉及的各季集列表
+- 详情写入元数据缓存（按作品 ID），之后的批次直接使用，只为缺少的季补发请求
+- 模板所需的集标题、播出日期等从这份详情中按 (季, 集) 读取，不逐集请求
+
+请求次数与作品数量相关，与文件（集）数量无关。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.metadata_cache import MetadataCache
+from core.recognition_result import RecognitionResult
+from core.title_key import canonical_key
+
+
+TMDB_API = "https://api.themoviedb.org/3"
+
+# TMDB append_to_response 单次最多附加的子请求数
+MAX_APPEND = 20
+
+# 作品键：(提供方, 作品 ID, 是否为电视剧)
+MediaKey = Tuple[str, str, bool]
+
+
+def _compact_details(data: Dict[str, Any], is_tv: bool) -> Dict[str, Any]:
+    """从 TMDB 详情响应中提取模板使用的字段"""
+    date = data.get('first_air_date') if is_tv else data.get('release_date')
+    return {
+        'tmdb_id': data.get('id'),
+        'title': data.get('name') if is_tv else data.get('title'),
+        'original_title': data.get('original_name') if is_tv else data.get('original_title'),
+        'year': (date or '')[:4],
+        'air_date': date or '',
+        'seasons': {},
+    }
+
+
+def _compact_season(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """季详情 -> {集号: {'name', 'air_date'}}（集号为字符串，便于 JSON 存储）"""
+    return {
+        str(episode['episode_number']): {
+            'name': episode.get('name') or '',
+            'air_date': episode.get('air_date') or '',
+        }
+        for episode in data.get('episodes') or []
+        if episode.get('episode_number') is not None
+    }
+
+
+class MetadataEnricher:
+    """元数据补全器（按作品批量获取 TMDB 详情）"""
+    
+    def __init__(self, cache: MetadataCache, tmdb_api_key: str, language: str = 'zh-CN'):
+        """
+        初始化补全器
+        
+        Args:
+            cache: 元数据缓存（作品详情按 ID 保存在其中）
+            tmdb_api_key: TMDB API Key
+            language: 详情语言
+        """
+        self.cache = cache
+        self.tmdb_api_key = tmdb_api_key
+        self.language = language
+        
+        # 本次运行已加载的详情：作品键 -> 详情；查询键 -> 作品键
+        self.details: Dict[MediaKey, Dict[str, Any]] = {}
+        self.identities: Dict[str, MediaKey] = {}
+        
+        # 统计
+        self.requests = 0
+        self.failures = 0
+        self.cache_hits = 0
+    
+    def enrich(self, infos: Iterable[Optional[RecognitionResult]]) -> int:
+        """
+        补全一批识别结果涉及的作品详情（每部作品最多一次请求）
+        
+        Args:
+            infos: 识别结果序列（已解析中文标题）
+        
+        Returns:
+            发出的请求数
+        """
+        # 1. 按作品汇总需要的季
+        wanted: Dict[MediaKey, Tuple[Dict[str, Any], set]] = {}
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        for info in infos:
+            if info is None or not info.get('original_title'):
+                continue
+            # 同一身份的文件只查询一次别名
+            identity = canonical_key(info['original_title'], info['year'], info['is_tv'])
+            if identity not in found:
+                found[identity] = self._find_media(info)
+            media = found[identity]
+            if media is None:
+                continue
+            key = (media['provider'], media['media_id'], media['is_tv'])
+            self.identities[identity] = key
+            entry = wanted.get(key)
+            if entry is None:
+                entry = wanted[key] = (media, set())
+            if media['is_tv'] and info['season'] is not None:
+                entry[1].add(int(info['season']))
+        
+        # 2. 缓存中已有详情（且包含所需各季）的作品不再请求
+        requests = self.requests
+        for key, (media, seasons) in wanted.items():
+            details = self.details.get(key) or media['details']
+            missing = sorted(season for season in seasons if str(season) not in (details or {}).get('seasons', {}))
+            if details is not None and not missing:
+                self.details[key] = details
+                self.cache_hits += 1
+                continue
+            details = self._fetch(media, details, missing)
+            if details is not None:
+                self.details[key] = details
+        return self.requests - requests
+    
+    def _find_media(self, info: Optional[RecognitionResult]) -> Optional[Dict[str, Any]]:
+        """经别名找到识别结果对应的 TMDB 作品（只有 TMDB 作品可以补全）"""
+        if info is None or not info.get('original_title'):
+            return None
+        media = self.cache.find_media(info['original_title'], info['year'], info['is_tv'])
+        if media is None or media['provider'] != 'tmdb':
+            return None
+        return media
+    
+    def _fetch(self, media: Dict[str, Any], details: Optional[Dict[str, Any]],
+               seasons: List[int]) -> Optional[Dict[str, Any]]:
+        """请求作品详情和所需各季的集列表，合并后写回缓存"""
+        from core.circuit_breaker import get_circuit_breaker
+        from core.http_client import get_http_client
+        
+        is_tv = media['is_tv']
+        endpoint = f"{TMDB_API}/{'tv' if is_tv else 'movie'}/{media['media_id']}"
+        breaker = get_circuit_breaker('tmdb')
+        
+        # 季数超过单次附加上限时分批（绝大多数作品一次请求）
+        chunks = [seasons[i:i + MAX_APPEND] for i in range(0, len(seasons), MAX_APPEND)] or [[]]
+        for chunk in chunks:
+            if not breaker.allow():
+                return details
+            params = {'api_key': self.tmdb_api_key, 'language': self.language}
+            if chunk:
+                params['append_to_response'] = ','.join(f"season/{season}" for season in chunk)
+            
+            self.requests += 1
+            try:
+                data = get_http_client().get_json(endpoint, params=params)
+            except Exception as e:
+                breaker.record_failure()
+                self.failures += 1
+                print(f"⚠ TMDB 详情获取失败: {media['title']} - {e}")
+                return details
+            breaker.record_success()
+            
+            if details is None:
+                details = _compact_details(data, is_tv)
+            for season in chunk:
+                season_data = data.get(f"season/{season}")
+                if season_data:
+                    details['seasons'][str(season)] = _compact_season(season_data)
+        
+        try:
+            self.cache.put_media(media['provider'], media['media_id'], is_tv, media['title'], details=details)
+        except Exception as e:
+            print(f"⚠ 元数据写入失败: {e}")
+        return details
+    
+    def template_fields(self, info: RecognitionResult) -> Dict[str, Any]:
+        """
+        识别结果对应的补全字段（从 enrich 加载的作品详情中按季/集读取，不访问数据库和网络）
+        
+        Returns:
+            {'tmdb_id', 'original_title', 'episode_title', 'air_date'}，没有详情时为空字典
+        """
+        if not info.get('original_title'):
+            return {}
+        key = self.identities.get(canonical_key(info['original_title'], info['year'], info['is_tv']))
+        details = self.details.get(key) if key is not None else None
+        if not details:
+            return {}
+        
+        fields = {
+            'tmdb_id': details.get('tmdb_id') or key[1],
+            'original_title': details.get('original_title') or '',
+            'episode_title': '',
+            'air_date': '',
+        }
+        if key[2]:
+            episode = details.get('seasons', {}).get(str(info['season']), {}).get(str(info['episode']))
+            if episode:
+                fields['episode_title'] = episode['name']
+                fields['air_date'] = episode['air_date']
+        else:
+            fields['air_date'] = details.get('air_date') or ''
+        return fields
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取补全统计"""
+        return {
+            'media': len(self.details),
+            'requests': self.requests,
+            'failures': self.failures,
+            'cache_hits': self.cache_hits,
+        }
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+.nfo 旁路文件
+已刮削过的目录（Kodi/Emby/Jellyfin）中，视频旁边通常有 .nfo 文件，记录了 TMDB/IMDB/豆瓣 ID 和中文标题。
+批量处理时先按 .nfo 确定标题，只有没有可用 .nfo 的文件才查询豆瓣/TMDB：
+
+- 扫描时每个目录只列出一次（os.scandir），从列表中查找 .nfo，不逐个文件访问磁盘
+- 查找顺序：<视频文件名>.nfo、movie.nfo；剧集在当前目录和上两级（季目录/剧集目录）查找 tvshow.nfo
+- 用增量 XML 解析器流式读取，只保留根元素下的少数字段，演员表等大段内容读完即释放
+- 每批文件中每个目录只列出一次、每个 .nfo 只解析一次（目录列表和解析结果只在一批内有效）
+- 识别结果直接返回给调用方，不写入按文件名索引的识别结果缓存（不同目录的同名文件各自的 .nfo 不同）
+- 按作品 ID 把 .nfo 的标题写入元数据缓存；文件名中解析出的标题与 .nfo 中的标题一致时同样登记为别名，
+  之后同一作品的文件不再访问网络
+
+.nfo 读取参考 nas-tools 的 NfoReader（app/utils/nfo_reader.py），改为流式解析。
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.recognition_result import RecognitionResult
+from core.title_key import canonical_key, canonical_title
+
+
+# 根元素 -> 类型
+MOVIE = 'movie'
+TVSHOW = 'tvshow'
+EPISODE = 'episodedetails'
+_ROOT_KINDS = frozenset((MOVIE, TVSHOW, EPISODE))
+
+# 每次读取的字节数
+_CHUNK_SIZE = 16384
+
+# 只有 ID 链接（没有 XML）的 .nfo：Kodi 支持直接写 TMDB/IMDB/豆瓣网址
+_URL_IDS = (
+    ('tmdb', re.compile(r'themoviedb\.org/(?:movie|tv)/(\d+)')),
+    ('imdb', re.compile(r'imdb\.com/title/(tt\d+)')),
+    ('douban', re.compile(r'douban\.com/subject/(\d+)')),
+)
+
+_CJK = re.compile(r'[一-鿿]')
+_YEAR = re.compile(r'(?:19|20)\d{2}')
+
+# 写入元数据缓存时的提供方优先级
+_PROVIDERS = ('tmdb', 'douban')
+
+
+@dataclass
+class NfoInfo:
+    """.nfo 中与识别有关的字段"""
+    kind: str                                       # movie / tvshow / episodedetails
+    title: str = ''
+    original_title: str = ''
+    show_title: str = ''                            # 单集 .nfo 中的剧集标题
+    year: str = ''
+    season: Optional[int] = None
+    episode: Optional[int] = None
+    ids: Dict[str, str] = field(default_factory=dict)   # 提供方 -> ID（tmdb / imdb / douban / tvdb）
+
+
+def _to_int(text: str) -> Optional[int]:
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _apply_field(info: NfoInfo, element: ET.Element):
+    """把根元素下的一个子元素写入 NfoInfo"""
+    tag = element.tag.lower()
+    text = (element.text or '').strip()
+    if not text:
+        return
+    if tag == 'title':
+        info.title = text
+    elif tag == 'originaltitle':
+        info.original_title = text
+    elif tag == 'showtitle':
+        info.show_title = text
+    elif tag == 'year' or (tag in ('premiered', 'aired', 'releasedate') and not info.year):
+        match = _YEAR.match(text)
+        if match:
+            info.year = match.group()
+    elif tag == 'season':
+        info.season = _to_int(text)
+    elif tag == 'episode':
+        info.episode = _to_int(text)
+    elif tag == 'uniqueid':
+        provider = (element.get('type') or '').lower()
+        if provider:
+            info.ids[provider] = text
+    elif tag in ('tmdbid', 'imdbid', 'doubanid', 'tvdbid'):
+        info.ids.setdefault(tag[:-2], text)
+    elif tag == 'id' and text.startswith('tt'):
+        info.ids.setdefault('imdb', text)
+
+
+def _read_xml(path: str) -> Optional[NfoInfo]:
+    """增量解析 XML .nfo，根元素结束即返回（忽略之后附加的网址等内容）"""
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    info = None
+    root = None
+    depth = 0
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            kind = element.tag.lower()
+                            if kind not in _ROOT_KINDS:
+                                return None
+                            info = NfoInfo(kind)
+                            root = element
+                        continue
+                    depth -= 1
+                    if depth == 1:
+                        _apply_field(info, element)
+                        root.clear()
+                    elif depth == 0:
+                        return info
+    except ET.ParseError:
+        pass
+    return info if info is not None and (info.title or info.ids) else None
+
+
+def _read_url(path: str) -> Optional[NfoInfo]:
+    """只有网址的 .nfo：提取 ID（类型由网址判断，无法判断时按电影处理）"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read(_CHUNK_SIZE)
+    except OSError:
+        return None
+    info = NfoInfo(TVSHOW if 'themoviedb.org/tv/' in text else MOVIE)
+    for provider, pattern in _URL_IDS:
+        match = pattern.search(text)
+        if match:
+            info.ids[provider] = match.group(1)
+    return info if info.ids else None
+
+
+def read_nfo(path: str) -> Optional[NfoInfo]:
+    """
+    读取 .nfo 文件
+    
+    Args:
+        path: .nfo 路径
+    
+    Returns:
+        NfoInfo；无法读取或不是电影/剧集/单集 .nfo 时返回 None
+    """
+    try:
+        info = _read_xml(path)
+    except OSError:
+        return None
+    return info if info is not None else _read_url(path)
+
+
+class SidecarIndex:
+    """按目录缓存 .nfo 列表和解析结果（每个目录只列出一次，每个 .nfo 只解析一次）"""
+    
+    def __init__(self):
+        self._listings: Dict[str, Dict[str, str]] = {}      # 目录 -> {小写文件名: 文件名}
+        self._parsed: Dict[str, Optional[NfoInfo]] = {}     # .nfo 路径 -> 解析结果
+        self.directories = 0
+        self.files_read = 0
+    
+    def _listing(self, directory: str) -> Dict[str, str]:
+        """目录中的文件名（小写 -> 实际文件名）"""
+        listing = self._listings.get(directory)
+        if listing is None:
+            listing = {}
+            try:
+                with os.scandir(directory or '.') as entries:
+                    for entry in entries:
+                        listing[entry.name.lower()] = entry.name
+            except OSError:
+                pass
+            self._listings[directory] = listing
+            self.directories += 1
+        return listing
+    
+    def _read(self, directory: str, name: str) -> Optional[NfoInfo]:
+        """读取目录中的 .nfo（不存在时返回 None）"""
+        actual = self._listing(directory).get(name.lower())
+        if actual is None:
+            return None
+        path = os.path.join(directory, actual)
+        if path not in self._parsed:
+            self._parsed[path] = read_nfo(path)
+            self.files_read += 1
+        return self._parsed[path]
+    
+    def find(self, file_path: str) -> Tuple[Optional[NfoInfo], Optional[NfoInfo]]:
+        """
+        查找视频文件对应的 .nfo
+        
+        Args:
+            file_path: 视频文件路径（不在磁盘上的文件名不查找）
+        
+        Returns:
+            (作品 .nfo（电影或剧集）, 单集 .nfo)，未找到时为 None
+        """
+        path = Path(file_path)
+        directory = str(path.parent)
+        if path.name.lower() not in self._listing(directory):
+            return None, None
+        
+        own = self._read(directory, f"{path.stem}.nfo")
+        if own is not None and own.kind == MOVIE:
+            return own, None
+        if own is None:
+            movie = self._read(directory, 'movie.nfo')
+            if movie is not None and movie.kind == MOVIE:
+                return movie, None
+        
+        # 剧集：当前目录、季目录的上一级、再上一级
+        episode = own if own is not None and own.kind == EPISODE else None
+        parent = path.parent
+        for _ in range(3):
+            show = self._read(str(parent), 'tvshow.nfo')
+            if show is not None and show.kind == TVSHOW:
+                return show, episode
+            if parent.parent == parent:
+                break
+            parent = parent.parent
+        
+        # 没有 tvshow.nfo 时使用单集 .nfo 中的剧集标题（单集的 ID 不是剧集 ID，不使用）
+        if episode is not None and episode.show_title:
+            return NfoInfo(TVSHOW, title=episode.show_title), episode
+        return None, None
+
+
+class SidecarResolver:
+    """按 .nfo 确定识别结果，并写入元数据缓存"""
+    
+    def __init__(self, recognizer):
+        """
+        初始化
+        
+        Args:
+            recognizer: IntegratedRecognizer（解析技术字段，写入其元数据缓存）
+        """
+        self.recognizer = recognizer
+        
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.seeded = 0
+        self.files_read = 0
+        self.directories = 0
+    
+    def resolve(self, file_paths: Iterable[str], convert_chinese_number: bool = True) -> Dict[int, RecognitionResult]:
+        """
+        按 .nfo 识别一批文件
+        
+        Args:
+            file_paths: 视频文件路径
+            convert_chinese_number: 是否转换中文数字
+        
+        Returns:
+            序号 -> 识别结果（只包含有可用 .nfo 的文件）
+        """
+        # 目录列表和解析结果只在本批内有效（两批之间 .nfo 可能被修改）
+        sidecars = SidecarIndex()
+        seeded = set()
+        results = {}
+        for index, file_path in enumerate(file_paths):
+            media, episode = sidecars.find(file_path)
+            info = self._build(Path(file_path).name, media, episode, convert_chinese_number, seeded) if media else None
+            if info is None:
+                self.misses += 1
+                continue
+            results[index] = info
+            self.hits += 1
+        self.files_read += sidecars.files_read
+        self.directories += sidecars.directories
+        return results
+    
+    def _chinese_title(self, media: NfoInfo) -> Optional[str]:
+        """.nfo 中的中文标题；只有 ID 时从元数据缓存按 ID 读取"""
+        for text in (media.title, media.original_title):
+            if text and _CJK.search(text):
+                return text
+        cache = self.recognizer.title_resolver.cache
+        for provider in _PROVIDERS:
+            media_id = media.ids.get(provider)
+            if media_id:
+                cached = cache.get_media(provider, media_id, media.kind == TVSHOW)
+                if cached and cached['title']:
+                    return cached['title']
+        return None
+    
+    def _build(self, filename: str, media: NfoInfo, episode: Optional[NfoInfo],
+               convert_chinese_number: bool, seeded: set) -> Optional[RecognitionResult]:
+        """解析文件名中的技术字段，标题/年份/季集以 .nfo 为准"""
+        chinese_title = self._chinese_title(media)
+        if not chinese_title:
+            return None
+        
+        recognizer = self.recognizer
+        info = recognizer._parse(filename, convert_chinese_number)
+        query_title, query_year = info['title'], info['year']
+        is_tv = media.kind == TVSHOW
+        
+        info['is_tv'] = is_tv
+        if media.year:
+            info['year'] = media.year
+        if episode is not None:
+            if episode.season is not None:
+                info['season'] = episode.season
+            if episode.episode is not None:
+                info['episode'] = episode.episode
+        for original in (media.original_title, media.title, query_title):
+            if original and not _CJK.search(original):
+                info['original_title'] = original
+                break
+        info['title'] = chinese_title
+        
+        self._seed_cache(media, chinese_title, query_title, query_year, is_tv, seeded)
+        return info
+    
+    def _seed_cache(self, media: NfoInfo, chinese_title: str, query_title: str, query_year: Any, is_tv: bool,
+                    seeded: set):
+        """
+        把 .nfo 的结果写入元数据缓存：有 ID 时按作品保存并登记别名，否则按标题保存
+        
+        别名为 .nfo 中的非中文标题；文件名中解析出的标题只有与其规范化后相同时才登记
+        （"S01E01.mkv" 之类的文件名解析出的标题与作品无关，登记后会把其他目录的同名文件识别为该作品）
+        """
+        seed_key = (chinese_title, tuple(sorted(media.ids.items())), canonical_key(query_title, query_year, is_tv))
+        if seed_key in seeded:
+            return
+        seeded.add(seed_key)
+        
+        originals = [text for text in (media.original_title, media.title) if text and not _CJK.search(text)]
+        aliases = []
+        if query_title and canonical_title(query_title) in {canonical_title(text) for text in originals}:
+            aliases.append((query_title, query_year))
+        for original in originals:
+            aliases.append((original, media.year or None))
+            aliases.append((original, None))
+        if not aliases:
+            return
+        
+        cache = self.recognizer.title_resolver.cache
+        provider = next((name for name in _PROVIDERS if media.ids.get(name)), None)
+        try:
+            if provider is None:
+                for alias, year in aliases:
+                    cache.put(alias, year, is_tv, chinese_title)
+            else:
+                cache.put_media(provider, media.ids[provider], is_tv, chinese_title, aliases)
+            self.seeded += 1
+        except Exception as e:
+            print(f"⚠ 元数据写入失败: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取 .nfo 统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'nfo_read': self.files_read,
+            'directories': self.directories,
+            'cache_seeded': self.seeded,
+        }
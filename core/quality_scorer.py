@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+质量评分器
+把分辨率、来源、视频编码、HDR、音频编码映射为小整数编码，
+按评分方案（profile）批量计算质量分数，并支持按媒体身份选出前 k 个版本（用于去重）
+
+安装 numpy 时批量评分和 top-k 选择完全向量化；未安装时使用等价的纯 Python 实现。
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from core.title_key import canonical_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 评分维度（编码矩阵的列顺序）
+DIMENSIONS = ('resolution', 'source', 'video_codec', 'hdr', 'audio_codec')
+
+# 各维度基础分（default 方案，与历史版本的 get_quality_score 一致，取值区分大小写）
+BASE_SCORES: Dict[str, Dict[str, int]] = {
+    'resolution': {
+        '8K': 8000, '8k': 8000,
+        '4K': 4000, '4k': 4000, 'UHD': 4000,
+        '2160p': 2160, '2160P': 2160,
+        '1080p': 1080, '1080P': 1080, 'FHD': 1080,
+        '720p': 720, '720P': 720, 'HD': 720,
+        '480p': 480, '480P': 480,
+        '360p': 360, '360P': 360,
+    },
+    'source': {
+        'REMUX': 100,
+        'BluRay': 80, 'Blu-Ray': 80, 'BDMV': 80, 'BD': 80,
+        'WEB-DL': 60, 'WEBDL': 60,
+        'WEBRip': 40,
+        'HDRip': 30,
+        'BRRip': 25,
+        'HDTV': 20,
+        'DVDRip': 10,
+    },
+    'video_codec': {
+        'H.265': 10, 'H265': 10, 'HEVC': 10, 'x265': 10,
+        'AV1': 15,
+        'H.264': 5, 'H264': 5, 'x264': 5, 'AVC': 5,
+    },
+    'hdr': {
+        'HDR10+': 20,
+        'HDR10': 15,
+        'Dolby Vision': 25, 'DV': 25,
+        'HLG': 10,
+    },
+    'audio_codec': {
+        'TrueHD': 10,
+        'DTS-HD': 8,
+        'Atmos': 12,
+        'DTS': 5,
+        'AC3': 3, 'AC-3': 3,
+        'AAC': 2,
+    },
+}
+
+# 内置评分方案：维度权重（未列出的维度权重为 1）
+BUILTIN_PROFILES = {
+    'default': {},
+    # 收藏：来源、音轨和 HDR 优先
+    'archive': {'source': 3.0, 'hdr': 2.0, 'audio_codec': 3.0},
+    # 节省空间：分辨率减半，高效编码优先
+    'efficient': {'resolution': 0.5, 'video_codec': 20.0},
+}
+
+
+@dataclass
+class QualityProfile:
+    """评分方案"""
+    name: str
+    weights: Dict[str, float] = field(default_factory=dict)        # 维度 -> 权重（默认 1）
+    scores: Dict[str, Dict[str, int]] = field(default_factory=dict)  # 维度 -> {取值: 基础分} 覆盖
+
+
+def media_identity(info: Any) -> Tuple:
+    """媒体身份：同一部电影或同一集剧集的不同版本身份相同（标题按规范化键比较，写法不同不影响分组）"""
+    if info['is_tv']:
+        return (canonical_key(info['title'], None, True), info['season'], info['episode'])
+    return (canonical_key(info['title'], info['year'], False),)
+
+
+class QualityScorer:
+    """质量评分器"""
+    
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, Any]]] = None, default_profile: str = 'default'):
+        """
+        初始化评分器
+        
+        Args:
+            profiles: 自定义方案 {名称: {'weights': {...}, 'scores': {维度: {取值: 分}}}}
+            default_profile: 未指定方案时使用的方案
+        """
+        self.default_profile = default_profile
+        self.profiles: Dict[str, QualityProfile] = {}
+        for name, weights in BUILTIN_PROFILES.items():
+            self.profiles[name] = QualityProfile(name, dict(weights))
+        for name, spec in (profiles or {}).items():
+            self.add_profile(name, spec.get('weights'), spec.get('scores'))
+        
+        if self.default_profile not in self.profiles:
+            print(f"⚠ 评分方案不存在: {self.default_profile}，使用 default")
+            self.default_profile = 'default'
+        
+        self._compile()
+    
+    def add_profile(
+        self,
+        name: str,
+        weights: Optional[Dict[str, float]] = None,
+        scores: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """
+        添加或替换评分方案
+        
+        Args:
+            name: 方案名称
+            weights: 维度权重
+            scores: 取值基础分覆盖（可引入新的取值）
+        """
+        for dimension in list(weights or {}) + list(scores or {}):
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"未知的评分维度: {dimension}")
+        self.profiles[name] = QualityProfile(name, dict(weights or {}), {
+            dimension: dict(values) for dimension, values in (scores or {}).items()
+        })
+        if hasattr(self, '_codes'):
+            self._compile()
+    
+    def _compile(self):
+        """生成取值编码表和各方案的分数表"""
+        # 编码 0 表示空值或未知取值（0 分）
+        self._codes: List[Dict[str, int]] = []
+        for dimension in DIMENSIONS:
+            values = list(BASE_SCORES[dimension])
+            for profile in self.profiles.values():
+                for value in profile.scores.get(dimension, ()):
+                    if value not in values:
+                        values.append(value)
+            self._codes.append({value: code for code, value in enumerate(values, 1)})
+        
+        # 方案 -> 每个维度一张分数表（下标为编码，分数已乘权重并取整）
+        self._tables: Dict[str, List[List[int]]] = {}
+        for name, profile in self.profiles.items():
+            tables = []
+            for dimension, codes in zip(DIMENSIONS, self._codes):
+                weight = profile.weights.get(dimension, 1.0)
+                base = dict(BASE_SCORES[dimension])
+                base.update(profile.scores.get(dimension, {}))
+                table = [0] * (len(codes) + 1)
+                for value, code in codes.items():
+                    table[code] = int(round(base.get(value, 0) * weight))
+                tables.append(table)
+            self._tables[name] = tables
+        
+        self._arrays = {}
+        if np is not None:
+            self._arrays = {
+                name: [np.asarray(table, dtype=np.int64) for table in tables]
+                for name, tables in self._tables.items()
+            }
+    
+    def _profile_name(self, profile: Optional[str]) -> str:
+        name = profile or self.default_profile
+        if name not in self._tables:
+            raise KeyError(f"评分方案不存在: {name}")
+        return name
+    
+    def encode_one(self, info: Any) -> Tuple[int, ...]:
+        """单个识别结果 -> 各维度编码"""
+        return tuple(
+            codes.get(info[dimension], 0) if info[dimension] else 0
+            for dimension, codes in zip(DIMENSIONS, self._codes)
+        )
+    
+    def encode(self, infos: Iterable[Any]):
+        """
+        批量编码
+        
+        Args:
+            infos: 识别结果序列
+        
+        Returns:
+            编码矩阵（numpy 可用时为 (n, 5) 的 uint8 数组，否则为元组列表）
+        """
+        rows = [self.encode_one(info) for info in infos]
+        if np is None:
+            return rows
+        if not rows:
+            return np.zeros((0, len(DIMENSIONS)), dtype=np.uint8)
+        dtype = np.uint8 if max(len(codes) for codes in self._codes) < 255 else np.uint16
+        return np.asarray(rows, dtype=dtype)
+    
+    def score(self, info: Any, profile: Optional[str] = None) -> int:
+        """
+        计算单个文件的质量分数
+        
+        Args:
+            info: 识别结果
+            profile: 评分方案（None 表示默认方案）
+        
+        Returns:
+            质量分数
+        """
+        tables = self._tables[self._profile_name(profile)]
+        score = 0
+        for dimension, codes, table in zip(DIMENSIONS, self._codes, tables):
+            value = info[dimension]
+            if value:
+                score += table[codes.get(value, 0)]
+        return score
+    
+    def score_batch(self, infos_or_codes, profile: Optional[str] = None):
+        """
+        批量计算质量分数
+        
+        Args:
+            infos_or_codes: 识别结果序列，或 encode() 的返回值（多次评分时可复用）
+            profile: 评分方案
+        
+        Returns:
+            分数序列（numpy 可用时为 int64 数组，否则为列表）
+        """
+        name = self._profile_name(profile)
+        codes = infos_or_codes
+        if not self._is_encoded(codes):
+            codes = self.encode(codes)
+        
+        if np is None:
+            tables = self._tables[name]
+            return [sum(table[code] for table, code in zip(tables, row)) for row in codes]
+        
+        arrays = self._arrays[name]
+        scores = np.zeros(len(codes), dtype=np.int64)
+        for column, table in enumerate(arrays):
+            scores += table[codes[:, column]]
+        return scores
+    
+    def top_k(
+        self,
+        infos: Sequence[Any],
+        k: int = 1,
+        profile: Optional[str] = None,
+        identity: Callable[[Any], Hashable] = media_identity,
+        scores=None
+    ) -> Dict[Hashable, List[int]]:
+        """
+        按媒体身份分组，每组选出分数最高的 k 个版本
+        
+        Args:
+            infos: 识别结果序列
+            k: 每组保留数量
+            profile: 评分方案
+            identity: 身份函数（默认按标题 + 年份或季集）
+            scores: 已计算的分数（可选，省去重复评分）
+        
+        Returns:
+            {身份: [下标, ...]}，组内按分数从高到低，同分时保持输入顺序
+        """
+        if scores is None:
+            scores = self.score_batch(infos, profile)
+        
+        group_ids: Dict[Hashable, int] = {}
+        keys: List[Hashable] = []
+        ids = []
+        for info in infos:
+            key = identity(info)
+            group = group_ids.get(key)
+            if group is None:
+                group = group_ids[key] = len(keys)
+                keys.append(key)
+            ids.append(group)
+        
+        selected: Dict[Hashable, List[int]] = {key: [] for key in keys}
+        if not ids or k <= 0:
+            return selected
+        
+        if np is None:
+            members: Dict[int, List[int]] = {}
+            for index, group in enumerate(ids):
+                members.setdefault(group, []).append(index)
+            for group, indexes in members.items():
+                best = heapq.nsmallest(k, indexes, key=lambda index: (-scores[index], index))
+                selected[keys[group]] = best
+            return selected
+        
+        # 按 (组, -分数, 下标) 排序后取每组前 k 个
+        ids = np.asarray(ids, dtype=np.int64)
+        count = len(ids)
+        order = np.lexsort((np.arange(count), -np.asarray(scores, dtype=np.int64), ids))
+        sorted_ids = ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        ranks = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+        keep = order[ranks < k]
+        for group, index in zip(ids[keep].tolist(), keep.tolist()):
+            selected[keys[group]].append(index)
+        return selected
+    
+    def _is_encoded(self, value) -> bool:
+        """判断是否为 encode() 的返回值"""
+        if np is not None:
+            return isinstance(value, np.ndarray)
+        return isinstance(value, list) and (not value or isinstance(value[0], tuple))
+    
+    def list_profiles(self) -> Dict[str, Dict[str, float]]:
+        """列出评分方案及其权重"""
+        return {
+            name: {dimension: profile.weights.get(dimension, 1.0) for dimension in DIMENSIONS}
+            for name, profile in self.profiles.items()
+        }
+
+
+# 全局实例
+_quality_scorer = None
+
+
+def get_quality_scorer() -> QualityScorer:
+    """获取质量评分器实例（单例，方案来自配置 quality_profiles / quality_profile）"""
+    global _quality_scorer
+    if _quality_scorer is None:
+        from core.config import get_config
+        
+        config = get_config()
+        _quality_scorer = QualityScorer(
+            profiles=config.get('quality_profiles', {}) or {},
+            default_profile=config.get('quality_profile', 'default') or 'default'
+        )
+    return _quality_scorer
@@ -94,6 +94,14 @@ class TokenBucket:
         with self.lock:
             self._refill()
             return self.tokens
+    
+    def get_wait_time(self, tokens: int = 1) -> float:
+        """获取令牌足够前需要等待的时间"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                return 0.0
+            return (tokens - self.tokens) / self.rate if self.rate > 0 else float('inf')
 
 
 class SlidingWindow:
@@ -225,6 +233,10 @@ class RateLimiter:
         else:
             return self.limiter.wait_for_slot(timeout)
     
+    def get_wait_time(self) -> float:
+        """获取下一个配额可用前需要等待的时间（秒，0 表示当前可用）"""
+        return self.limiter.get_wait_time()
+    
     def get_stats(self) -> Dict[str, any]:
         """获取统计信息"""
         stats = {
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别结果记录
+用 __slots__ 存储单个文件的识别结果，在识别 → 模板渲染 → 批量结果之间传递，
+只在 JSON 接口边界（Web API、历史记录）转换为字典
+
+编码、来源、分辨率等取值种类很少，写入时统一驻留（sys.intern），
+百万级文件的批量结果中相同取值只保留一份字符串。
+"""
+
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# 识别结果字段（顺序即 to_dict 的键顺序）
+RESULT_FIELDS = (
+    'original_name', 'title', 'year', 'season', 'episode',
+    'resolution', 'video_codec', 'audio_codec', 'source', 'hdr',
+    'language', 'subtitle', 'release_group', 'platform', 'edition', 'is_tv',
+)
+
+# 可选字段：未设置（None）时不出现在字典中，与旧版字典结果一致
+OPTIONAL_FIELDS = ('original_title',)
+
+# 写入时驻留的字段（取值集合很小）
+_INTERNED_FIELDS = frozenset((
+    'year', 'resolution', 'video_codec', 'audio_codec', 'source', 'hdr', 'release_group',
+    'platform', 'edition',
+))
+
+# 多值字段（内部存为元组，字典中为列表）
+_LIST_FIELDS = frozenset(('language', 'subtitle'))
+
+_ALL_FIELDS = RESULT_FIELDS + OPTIONAL_FIELDS
+_FIELD_SET = frozenset(_ALL_FIELDS)
+_intern = sys.intern
+
+
+def intern_values(values) -> Tuple[str, ...]:
+    """多值字段驻留为元组"""
+    if not values:
+        return ()
+    return tuple(_intern(value) if type(value) is str else value for value in values)
+
+
+class RecognitionResult:
+    """
+    识别结果（兼容字典读写：info['title']、info.get('year')、'original_title' in info）
+    
+    不支持新增字段；需要字典时调用 to_dict()。
+    """
+    
+    __slots__ = _ALL_FIELDS
+    
+    def __init__(self, original_name: str = '', **fields):
+        """
+        创建识别结果
+        
+        Args:
+            original_name: 原始文件名
+            **fields: 其余字段初始值（未给出的字段为空）
+        """
+        self.original_name = original_name
+        self.title = None
+        self.year = None
+        self.season = None
+        self.episode = None
+        self.resolution = None
+        self.video_codec = None
+        self.audio_codec = None
+        self.source = None
+        self.hdr = None
+        self.language = ()
+        self.subtitle = ()
+        self.release_group = None
+        self.platform = None
+        self.edition = None
+        self.is_tv = False
+        self.original_title = None
+        for key, value in fields.items():
+            self[key] = value
+    
+    # ---------- 字典兼容接口 ----------
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key in OPTIONAL_FIELDS:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        if key in _LIST_FIELDS:
+            value = intern_values(value)
+        elif key in _INTERNED_FIELDS and type(value) is str:
+            value = _intern(value)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: object) -> bool:
+        if key in OPTIONAL_FIELDS:
+            return getattr(self, key) is not None
+        return key in _FIELD_SET
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RecognitionResult):
+            return all(getattr(self, key) == getattr(other, key) for key in _ALL_FIELDS)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"RecognitionResult({self.to_dict()!r})"
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取字段（未知字段或未设置的可选字段返回 default）"""
+        if key not in _FIELD_SET:
+            return default
+        value = getattr(self, key)
+        if value is None and key in OPTIONAL_FIELDS:
+            return default
+        return value
+    
+    def keys(self) -> Tuple[str, ...]:
+        """当前存在的字段名"""
+        if self.original_title is None:
+            return RESULT_FIELDS
+        return _ALL_FIELDS
+    
+    def items(self):
+        """(字段名, 值) 序列"""
+        return [(key, getattr(self, key)) for key in self.keys()]
+    
+    def values(self):
+        """字段值序列"""
+        return [getattr(self, key) for key in self.keys()]
+    
+    # ---------- 复制与转换 ----------
+    
+    def copy(self) -> 'RecognitionResult':
+        """浅复制（多值字段为不可变元组，无需深复制）"""
+        clone = RecognitionResult.__new__(RecognitionResult)
+        for key in _ALL_FIELDS:
+            setattr(clone, key, getattr(self, key))
+        return clone
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（JSON 接口边界使用，多值字段转为列表）"""
+        data = {key: getattr(self, key) for key in RESULT_FIELDS}
+        data['language'] = list(self.language)
+        data['subtitle'] = list(self.subtitle)
+        if self.original_title is not None:
+            data['original_title'] = self.original_title
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RecognitionResult':
+        """从字典创建（忽略未知字段）"""
+        result = cls(data.get('original_name', ''))
+        for key in _ALL_FIELDS:
+            if key in data and key != 'original_name':
+                result[key] = data[key]
+        return result
+    
+    def template_context(self, ext: Optional[str] = None) -> Dict[str, Any]:
+        """生成模板渲染上下文"""
+        return {
+            'title': self.title,
+            'year': self.year,
+            'season': self.season,
+            'episode': self.episode,
+            'resolution': self.resolution,
+            'video_codec': self.video_codec,
+            'audio_codec': self.audio_codec,
+            'source': self.source,
+            'platform': self.platform,
+            'edition': self.edition,
+            'ext': ext,
+        }
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    把包含识别结果的数据转换为可 JSON 序列化的结构
+    
+    只复制包含 RecognitionResult 的字典/列表，其余对象原样返回。
+    """
+    if isinstance(value, RecognitionResult):
+        return value.to_dict()
+    if isinstance(value, dict):
+        converted = None
+        for key, item in value.items():
+            new_item = to_jsonable(item)
+            if new_item is not item:
+                if converted is None:
+                    converted = dict(value)
+                converted[key] = new_item
+        return value if converted is None else converted
+    if isinstance(value, (list, tuple)):
+        items = [to_jsonable(item) for item in value]
+        if any(new is not old for new, old in zip(items, value)):
+            return items
+        return value
+    return value
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别模式预检查
+文件名先生成一次与原文逐字符对齐的小写文本；每个模式编译时从语法树推导出
+"匹配必然包含的字面量"，search 之前先在小写文本上做 `in` 检查，
+不可能匹配的模式（大多数编码、来源、语言模式）不再执行正则。
+
+推导只依赖正则本身，对任意模式（包括运行时修改或追加的）自动生效；
+无法推导时不做预检查，结果与直接执行正则完全一致。
+"""
+
+import re
+from typing import List, Optional, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+
+# IGNORECASE 下会匹配 ASCII 字母的非 ASCII 字符，折叠后 lower() 与原文逐字符对齐
+CASE_FOLD_FIXES = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+_FOLD_HAZARDS = ('\u0130', '\u0131', '\u017f', '\u212a')
+
+_LITERAL = _sre_parse.LITERAL
+_IN = _sre_parse.IN
+_BRANCH = _sre_parse.BRANCH
+_SUBPATTERN = _sre_parse.SUBPATTERN
+_REPEATS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+
+
+def fold_lower(text: str) -> str:
+    """生成与原文逐字符对齐的小写文本"""
+    if text.isascii():
+        return text.lower()
+    for char in _FOLD_HAZARDS:
+        if char in text:
+            return text.translate(CASE_FOLD_FIXES).lower()
+    return text.lower()
+
+
+def _literal_char(op, av) -> Optional[str]:
+    """单个字符节点在折叠小写文本中的字符（字面量或 [Ss] 这类大小写字符组；其余返回 None）"""
+    if op is _LITERAL:
+        chars = (chr(av),)
+    elif op is _IN and all(item[0] is _LITERAL for item in av):
+        chars = tuple(chr(item[1]) for item in av)
+    else:
+        return None
+    lowered = {char.lower() for char in chars}
+    if len(lowered) != 1:
+        return None
+    char = lowered.pop()
+    # 只接受 ASCII 和无大小写的字符（CJK 等），其他字母的 IGNORECASE 等价关系不一定与 lower() 一致
+    if not char.isascii() and char.upper() != char:
+        return None
+    return char
+
+
+def _leading_run(items) -> str:
+    """序列开头连续的字面量"""
+    run = []
+    for op, av in items:
+        char = _literal_char(op, av)
+        if char is None:
+            break
+        run.append(char)
+    return ''.join(run)
+
+
+def _sequence_literals(items) -> Optional[Set[str]]:
+    """序列匹配时必然出现的字面量集合（出现任一即可能匹配），取最长的一组"""
+    candidates = []
+    run: List[str] = []
+    for op, av in items:
+        char = _literal_char(op, av)
+        if char is not None:
+            run.append(char)
+            continue
+        if run:
+            prefix = ''.join(run)
+            candidates.append({prefix})
+            # 解析器会把分支的公共前缀提到分支之前（BluRay|BDMV → B(?:luRay|DMV)），前缀与各分支开头拼接
+            if op is _BRANCH:
+                candidates.append({prefix + _leading_run(branch) for branch in av[1]})
+            run = []
+        literals = None
+        if op is _SUBPATTERN:
+            literals = _sequence_literals(av[-1])
+        elif op is _BRANCH:
+            branches = [_sequence_literals(branch) for branch in av[1]]
+            if all(branches):
+                literals = set().union(*branches)
+        elif op in _REPEATS and av[0] >= 1:
+            literals = _sequence_literals(av[2])
+        if literals:
+            candidates.append(literals)
+    if run:
+        candidates.append({''.join(run)})
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: (min(map(len, literals)), -len(literals)))
+
+
+def required_literals(pattern: str) -> Optional[Tuple[str, ...]]:
+    """
+    推导模式（re.IGNORECASE）匹配时必然包含的小写字面量
+
+    例：r'(H\\.?264|[Xx]264|AVC)' → ('264', 'avc', 'x264')；r'[\\s._-](\\d{2,3})[\\s._-]' → None
+
+    Returns:
+        字面量元组（折叠小写文本中一个都不出现时模式不可能匹配），无法推导时返回 None
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except Exception:
+        return None
+    literals = _sequence_literals(parsed)
+    return tuple(sorted(literals)) if literals else None
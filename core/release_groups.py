@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制作组/字幕组识别
+内置组列表来自 MoviePilot 的 ReleaseGroupsMatcher，所有组名（含用户自定义组）
+编译为一个 Aho-Corasick 自动机，对文件名做一次线性扫描
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.recognizer_tables import fold_lower
+
+
+# 内置组（与 MoviePilot app/core/meta/releasegroup.py 保持一致，按站点分组）
+# 条目可以使用 (?:a|b|) 形式的分支，加载时展开为字面量组名
+RELEASE_GROUPS: Dict[str, List[str]] = {
+    "0ff": ['FF(?:(?:A|WE)B|CD|E(?:DU|B)|TV)'],
+    "1pt": [],
+    "52pt": [],
+    "audiences": ['Audies', 'AD(?:Audio|E(?:book|)|Music|Web)'],
+    "azusa": [],
+    "beitai": ['BeiTai'],
+    "btschool": ['Bts(?:CHOOL|HD|PAD|TV)', 'Zone'],
+    "carpt": ['CarPT'],
+    "chdbits": ['CHD(?:Bits|PAD|(?:|HK)TV|WEB|)', 'StBOX', 'OneHD', 'Lee', 'xiaopie'],
+    "discfan": [],
+    "dragonhd": [],
+    "eastgame": ['(?:(?:iNT|(?:HALFC|Mini(?:S|H|FH)D))-|)TLF'],
+    "filelist": [],
+    "gainbound": ['(?:DG|GBWE)B'],
+    "hares": ['Hares(?:(?:M|T)V|Web|)'],
+    "hd4fans": [],
+    "hdarea": ['HDA(?:pad|rea|TV)', 'EPiC'],
+    "hdatmos": [],
+    "hdbd": [],
+    "hdchina": ['HDC(?:hina|TV|)', 'k9611', 'tudou', 'iHD'],
+    "hddolby": ['D(?:ream|BTV)', '(?:HD|QHstudI)o'],
+    "hdfans": ['beAst(?:TV|)'],
+    "hdhome": ['HDH(?:ome|Pad|TV|WEB|)'],
+    "hdpt": ['HDPT(?:Web|)'],
+    "hdsky": ['HDS(?:ky|TV|Pad|WEB|)', 'AQLJ'],
+    "hdtime": [],
+    "HDU": [],
+    "hdvideo": [],
+    "hdzone": ['HDZ(?:one|)'],
+    "hhanclub": ['HHWEB'],
+    "hitpt": [],
+    "htpt": ['HTPT'],
+    "iptorrents": [],
+    "joyhd": [],
+    "keepfrds": ['FRDS', 'Yumi', 'cXcY'],
+    "lemonhd": ['L(?:eague(?:(?:C|H)D|(?:M|T)V|NF|WEB)|HD)', 'i18n', 'CiNT'],
+    "mteam": ['MTeam(?:TV|)', 'MPAD', 'MWeb'],
+    "nanyangpt": [],
+    "nicept": [],
+    "oshen": [],
+    "ourbits": ['Our(?:Bits|TV)', 'FLTTH', 'Ao', 'PbK', 'MGs', 'iLove(?:HD|TV)'],
+    "piggo": ['PiGo(?:NF|(?:H|WE)B)'],
+    "ptchina": [],
+    "pterclub": ['PTer(?:DIY|Game|(?:M|T)V|WEB|)'],
+    "pthome": ['PTH(?:Audio|eBook|music|ome|tv|WEB|)'],
+    "ptmsg": [],
+    "ptsbao": ['PTsbao', 'OPS', 'F(?:Fans(?:AIeNcE|BD|D(?:VD|IY)|TV|WEB)|HDMv)', 'SGXT'],
+    "pttime": [],
+    "putao": ['PuTao'],
+    "soulvoice": [],
+    "springsunday": ['CMCT(?:V|)'],
+    "sharkpt": ['Shark(?:WEB|DIY|TV|MV|)'],
+    "tccf": [],
+    "tjupt": ['TJUPT'],
+    "totheglory": ['TTG', 'WiKi', 'NGB', 'DoA', '(?:ARi|ExRE)N'],
+    "U2": [],
+    "ultrahd": [],
+    "others": ['B(?:MDru|eyondHD|TN)', 'C(?:fandora|trlhd|MRG)', 'DON', 'EVO', 'FLUX', 'HONE(?:yG|)',
+               'N(?:oGroup|T(?:b|G))', 'PandaMoon', 'SMURF', 'T(?:EPES|aengoo|rollHD )'],
+    "anime": ['ANi', 'HYSUB', 'KTXP', 'LoliHouse', 'MCE', 'Nekomoe kissaten', 'SweetSub', 'MingY',
+              '(?:Lilith|NC)-Raws', '织梦字幕组', '枫叶字幕组', '猎户手抄部', '喵萌奶茶屋', '漫猫字幕社',
+              '霜庭云花Sub', '北宇治字幕组', '氢气烤肉架', '云歌字幕组', '萌樱字幕组', '极影字幕社',
+              '悠哈璃羽字幕社',
+              '❀拨雪寻春❀', '沸羊羊(?:制作|字幕组)', '(?:桜|樱)都字幕组'],
+    "forge": ['FROG(?:E|Web|)'],
+    "ubits": ['UB(?:its|WEB|TV)'],
+}
+
+# 组名前必须是以下字符之一（与 MoviePilot 的后顾断言一致），例如 -FRDS、[LoliHouse]、@HDSky
+GROUP_PREFIXES = '-@[￡【&'
+
+_PREFIX_PATTERN = re.compile('[' + re.escape(GROUP_PREFIXES) + ']')
+_ASCII_ALNUM = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+
+def expand_pattern(pattern: str) -> List[str]:
+    """
+    展开组名中的 (?:a|b|) 分支为字面量组名
+    
+    Args:
+        pattern: 组名，例如 'HDC(?:hina|TV|)'
+    
+    Returns:
+        组名列表，例如 ['HDChina', 'HDCTV', 'HDC']
+    
+    Raises:
+        ValueError: 包含不支持的正则语法
+    """
+    def parse_sequence(index: int) -> Tuple[List[str], int]:
+        results = ['']
+        while index < len(pattern):
+            char = pattern[index]
+            if pattern.startswith('(?:', index):
+                options, index = parse_alternatives(index + 3)
+                results = [prefix + option for prefix in results for option in options]
+                continue
+            if char in '|)':
+                break
+            if char in '\\.*+?[]{}^$(':
+                raise ValueError(f"不支持的组名语法: {pattern}")
+            results = [prefix + char for prefix in results]
+            index += 1
+        return results, index
+    
+    def parse_alternatives(index: int) -> Tuple[List[str], int]:
+        options = []
+        while True:
+            sequence, index = parse_sequence(index)
+            options.extend(sequence)
+            if index >= len(pattern):
+                raise ValueError(f"组名括号不匹配: {pattern}")
+            if pattern[index] == ')':
+                return options, index + 1
+            index += 1
+    
+    names, index = parse_sequence(0)
+    if index != len(pattern):
+        raise ValueError(f"组名括号不匹配: {pattern}")
+    return names
+
+
+class ReleaseGroupMatcher:
+    """制作组/字幕组匹配器（Aho-Corasick 自动机）"""
+    
+    def __init__(self, custom_groups: Optional[Iterable[str]] = None, include_builtin: bool = True):
+        """
+        初始化匹配器
+        
+        Args:
+            custom_groups: 用户自定义组（字面量或 (?:a|b) 分支写法）
+            include_builtin: 是否包含内置组
+        """
+        self.groups: List[str] = []
+        self._seen = set()
+        self.lock = threading.Lock()
+        
+        if include_builtin:
+            for site_groups in RELEASE_GROUPS.values():
+                for pattern in site_groups:
+                    self._add_pattern(pattern)
+        for pattern in custom_groups or ():
+            self._add_pattern(pattern)
+        
+        self._build()
+    
+    def add_groups(self, patterns: Iterable[str]) -> int:
+        """
+        添加自定义组并重建自动机
+        
+        Args:
+            patterns: 组名列表
+        
+        Returns:
+            新增的组名数量
+        """
+        with self.lock:
+            before = len(self.groups)
+            for pattern in patterns:
+                self._add_pattern(pattern)
+            added = len(self.groups) - before
+            if added:
+                self._build()
+            return added
+    
+    def _add_pattern(self, pattern: str):
+        """展开并登记组名（忽略空白和重复）"""
+        for name in expand_pattern(pattern.strip()):
+            name = name.strip()
+            key = name.lower()
+            if name and key not in self._seen:
+                self._seen.add(key)
+                self.groups.append(name)
+    
+    def _build(self):
+        """构建自动机：goto 转移表、失败指针、输出（匹配到的组名长度）"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        
+        for name in self.groups:
+            state = 0
+            for char in name.lower():
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(len(name))
+        
+        # 按层次遍历计算失败指针，输出沿失败链合并
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+        
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(sorted(set(lengths), reverse=True)) for lengths in outputs]
+    
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """
+        查找文件名中的组名
+        
+        组名前须为 GROUP_PREFIXES 中的字符，组名后不能紧接英文字母或数字；
+        同一起点取最长组名，结果互不重叠。
+        
+        Args:
+            text: 文件名
+        
+        Returns:
+            [(起点, 终点), ...]，按位置排序
+        """
+        if not text:
+            return []
+        
+        low = fold_lower(text)
+        
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        size = len(low)
+        starts = {}
+        position = 0
+        
+        # 只有前缀字符之后的位置才可能是组名起点：每个前缀字符处从根状态开始扫描，
+        # 回到根状态后跳到下一个前缀字符，每个字符至多扫描一次
+        for prefix in _PREFIX_PATTERN.finditer(low):
+            if prefix.end() < position:
+                continue
+            state = 0
+            position = prefix.end()
+            while position < size:
+                char = low[position]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                position += 1
+                if not state:
+                    break
+                for length in outputs[state]:
+                    start = position - length
+                    if (
+                        start > 0
+                        and low[start - 1] in GROUP_PREFIXES
+                        and (position == size or low[position] not in _ASCII_ALNUM)
+                        and length > starts.get(start, 0)
+                    ):
+                        starts[start] = length
+        
+        spans = []
+        end = 0
+        for start in sorted(starts):
+            if start >= end:
+                end = start + starts[start]
+                spans.append((start, end))
+        return spans
+    
+    def match(self, text: str) -> List[str]:
+        """
+        匹配文件名中的组名
+        
+        Args:
+            text: 文件名
+        
+        Returns:
+            组名列表（按出现顺序去重，保留原文大小写）
+        """
+        names = []
+        for start, end in self.find(text):
+            name = text[start:end]
+            if name not in names:
+                names.append(name)
+        return names
+    
+    def strip(self, text: str, spans: Optional[List[Tuple[int, int]]] = None) -> str:
+        """
+        移除文件名中匹配到的组名
+        
+        Args:
+            text: 文件名
+            spans: 已查找到的组名位置（省略时重新查找）
+        
+        Returns:
+            移除组名后的文件名
+        """
+        if spans is None:
+            spans = self.find(text)
+        if not spans:
+            return text
+        parts = []
+        start = 0
+        for span_start, span_end in spans:
+            parts.append(text[start:span_start])
+            start = span_end
+        parts.append(text[start:])
+        return ''.join(parts)
+
+
+# 全局实例
+_release_group_matcher = None
+
+
+def get_release_group_matcher() -> ReleaseGroupMatcher:
+    """获取制作组匹配器实例（自定义组来自配置项 custom_release_groups）"""
+    global _release_group_matcher
+    if _release_group_matcher is None:
+        from core.config import get_config
+        
+        custom_groups = get_config().get('custom_release_groups', []) or []
+        _release_group_matcher = ReleaseGroupMatcher(custom_groups=[g for g in custom_groups if g])
+    return _release_group_matcher
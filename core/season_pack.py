@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+季包文件名模式推断
+同一目录下的整季文件名通常只有集数不同：
+    Show.S01E01.1080p.WEB-DL.x264-GRP.mkv
+    Show.S01E02.1080p.WEB-DL.x264-GRP.mkv
+对比同目录文件名，把数字以外部分完全相同、且只有一个数字位置变化的文件归为一个季包，
+得到共享模板和可变的集数位置。识别时季包只完整识别一次，其余文件只读取集数。
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+
+# 成为季包的最少文件数
+MIN_PACK_SIZE = 3
+
+# 按数字串切分文件名（奇数下标为数字串）
+_DIGIT_RUN = re.compile(r'(\d+)')
+
+
+@dataclass
+class SeasonPack:
+    """季包：同一目录下只有集数位置不同的一组文件"""
+    directory: str
+    template: str                                        # 共享模板（集数位置为 {episode}）
+    slot: int                                            # 集数所在的数字串序号
+    indexes: List[int] = field(default_factory=list)     # 成员在输入列表中的下标
+    episodes: List[int] = field(default_factory=list)    # 成员的集数（与 indexes 对应）
+    
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+
+def _skeleton(name: str) -> Tuple[Tuple[str, ...], List[str]]:
+    """文件名 -> (数字以外的片段, 数字串列表)"""
+    parts = _DIGIT_RUN.split(name)
+    return tuple(parts[0::2]), parts[1::2]
+
+
+def find_season_packs(file_paths: Sequence[str], min_size: int = MIN_PACK_SIZE) -> List[SeasonPack]:
+    """
+    在文件列表中查找季包
+    
+    Args:
+        file_paths: 文件路径列表
+        min_size: 成为季包的最少文件数
+    
+    Returns:
+        季包列表（不属于任何季包的文件不出现在结果中）
+    """
+    # 按 (目录, 文件名骨架) 分组
+    groups: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[int, List[str]]]] = {}
+    for index, file_path in enumerate(file_paths):
+        path = Path(file_path)
+        texts, numbers = _skeleton(path.name)
+        if not numbers:
+            continue
+        groups.setdefault((str(path.parent), texts), []).append((index, numbers))
+    
+    packs = []
+    for (directory, texts), members in groups.items():
+        if len(members) < min_size:
+            continue
+        
+        # 只允许一个数字位置变化（其余数字如分辨率、年份、季数必须一致）
+        first = members[0][1]
+        varying = [
+            slot for slot in range(len(first))
+            if any(numbers[slot] != first[slot] for _, numbers in members)
+        ]
+        if len(varying) != 1:
+            continue
+        slot = varying[0]
+        
+        parts = []
+        for position, text in enumerate(texts):
+            parts.append(text.replace('{', '{{').replace('}', '}}'))
+            if position < len(first):
+                parts.append('{episode}' if position == slot else first[position])
+        packs.append(SeasonPack(
+            directory=directory,
+            template=''.join(parts),
+            slot=slot,
+            indexes=[index for index, _ in members],
+            episodes=[int(numbers[slot]) for _, numbers in members],
+        ))
+    return packs
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨节点共享元数据缓存
+在本地元数据缓存（SQLite）前后各加一层：
+- 进程内 LRU：热点标题不访问数据库
+- Redis 共享层：一个节点（Web 副本、Celery worker）查到的结果，其他节点直接命中
+
+读取顺序：进程内 LRU → 本地 SQLite → Redis（命中后回填本地）
+写入时三层同时写入；Redis 键带命名空间和过期时间，值为紧凑 JSON（较大的详情 zlib 压缩）。
+Redis 不可用时打印一次警告并退回仅本地缓存，冷却一段时间后再尝试。
+
+参考 reference/nas-tools/app/utils/tmdb_cache.py（tmdb:/media: 键前缀、按条目设置过期时间），
+序列化改为 JSON（不使用 pickle，其他节点读取时不会执行任意代码）。
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.lru_cache import LRUCache
+from core.metadata_cache import MISS, MetadataCache
+from core.title_key import canonical_key
+
+
+# 默认配置
+DEFAULT_NAMESPACE = "media-renamer"
+DEFAULT_LRU_SIZE = 10000
+RETRY_SECONDS = 30              # Redis 出错后多久再尝试
+COMPRESS_THRESHOLD = 512        # 超过该字节数的值压缩存储
+SCHEMA_VERSION = 3              # 键和序列化格式版本（写入键名，格式或标题规范化规则变化时旧键自然失效）
+
+
+def _dumps(value: Any) -> bytes:
+    """紧凑序列化：b'j' + JSON，较大的值为 b'z' + zlib(JSON)"""
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(data) > COMPRESS_THRESHOLD:
+        return b'z' + zlib.compress(data)
+    return b'j' + data
+
+
+def _loads(raw: Any) -> Any:
+    """反序列化 _dumps 的结果"""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    if raw[:1] == b'z':
+        return json.loads(zlib.decompress(raw[1:]).decode('utf-8'))
+    return json.loads(raw[1:].decode('utf-8'))
+
+
+class SharedMetadataCache:
+    """两级元数据缓存：进程内 LRU + 本地 SQLite，后接 Redis 共享层（接口与 MetadataCache 相同）"""
+    
+    def __init__(
+        self,
+        local: MetadataCache,
+        redis_client: Any = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        lru_size: int = DEFAULT_LRU_SIZE
+    ):
+        """
+        初始化缓存
+        
+        Args:
+            local: 本地元数据缓存（TTL 配置同样用于 Redis 层）
+            redis_client: Redis 客户端（redis.Redis 或兼容对象，None 表示仅本地）
+            namespace: Redis 键命名空间
+            lru_size: 进程内 LRU 条目数
+        """
+        self.local = local
+        self.redis = redis_client
+        self.prefix = f"{namespace}:v{SCHEMA_VERSION}"
+        self.lru = LRUCache(lru_size)
+        
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        
+        # 统计
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.redis_writes = 0
+    
+    # ---------- Redis 访问（出错时退回仅本地） ----------
+    
+    @property
+    def redis_available(self) -> bool:
+        """Redis 层当前是否可用"""
+        return self.redis is not None and time.time() >= self._down_until
+    
+    def _redis_call(self, method: str, *args, **kwargs) -> Any:
+        """调用 Redis 方法；不可用或出错时返回 None"""
+        if not self.redis_available:
+            return None
+        try:
+            return getattr(self.redis, method)(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self.redis_errors += 1
+                if time.time() >= self._down_until:
+                    print(f"⚠ Redis 共享缓存不可用，{RETRY_SECONDS} 秒内仅使用本地缓存: {e}")
+                self._down_until = time.time() + RETRY_SECONDS
+            return None
+    
+    def _title_key(self, key: str) -> str:
+        return f"{self.prefix}:t:{key}"
+    
+    def _alias_key(self, key: str) -> str:
+        return f"{self.prefix}:a:{key}"
+    
+    def _media_key(self, provider: str, media_id: Any, is_tv: bool) -> str:
+        return f"{self.prefix}:m:{provider}:{int(is_tv)}:{media_id}"
+    
+    def _redis_get(self, key: str) -> Any:
+        """读取并反序列化 Redis 值，未命中返回 MISS"""
+        raw = self._redis_call('get', key)
+        if raw is None:
+            return MISS
+        try:
+            return _loads(raw)
+        except Exception:
+            return MISS
+    
+    def _redis_set(self, key: str, value: Any, ttl: int):
+        """序列化并写入 Redis（带过期时间）"""
+        if ttl > 0 and self._redis_call('set', key, _dumps(value), ex=int(ttl)) is not None:
+            self.redis_writes += 1
+    
+    # ---------- 标题缓存 ----------
+    
+    def get(self, title: str, year: Any = None, is_tv: bool = False) -> Any:
+        """
+        查询缓存（进程内 LRU → 本地 SQLite → Redis）
+        
+        Returns:
+            缓存值；负向结果返回 None；未命中返回 MISS
+        """
+        key = canonical_key(title, year, is_tv)
+        entry = self.lru.get(key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+        
+        value = self.local.get(title, year, is_tv)
+        if value is MISS and self.redis_available:
+            value = self._get_shared(key, title, year, is_tv)
+        
+        if value is not MISS:
+            self._remember(key, value)
+        return value
+    
+    def _get_shared(self, key: str, title: str, year: Any, is_tv: bool) -> Any:
+        """从 Redis 查询标题（查询键，其次别名 → 作品），命中后回填本地 SQLite"""
+        value = self._redis_get(self._title_key(key))
+        if value is not MISS:
+            self.redis_hits += 1
+            self.local.put(title, year, is_tv, value)
+            return value
+        
+        media = self._find_shared_media(key, title, year, is_tv)
+        if media is not None:
+            self.redis_hits += 1
+            return media['title']
+        
+        self.redis_misses += 1
+        return MISS
+    
+    def _remember(self, key: str, value: Optional[str]):
+        """写入进程内 LRU（过期时间与本地缓存一致）"""
+        ttl = self.local.positive_ttl if value is not None else self.local.negative_ttl
+        if ttl > 0:
+            self.lru.put(key, (value, time.time() + ttl))
+    
+    def put(self, title: str, year: Any, is_tv: bool, value: Optional[str]):
+        """写入缓存（三层同时写入）"""
+        key = canonical_key(title, year, is_tv)
+        self.local.put(title, year, is_tv, value)
+        self._remember(key, value)
+        ttl = self.local.positive_ttl if value is not None else self.local.negative_ttl
+        self._redis_set(self._title_key(key), value, ttl)
+    
+    # ---------- 作品元数据 ----------
+    
+    def put_media(
+        self,
+        provider: str,
+        media_id: Any,
+        is_tv: bool,
+        title: str,
+        aliases: Iterable[Tuple[str, Any]] = (),
+        details: Optional[Dict[str, Any]] = None
+    ):
+        """按作品 ID 写入元数据并登记别名（本地和 Redis 同时写入）"""
+        aliases = list(aliases)
+        self.local.put_media(provider, media_id, is_tv, title, aliases, details)
+        if not self.redis_available:
+            return
+        
+        # 本地合并后的记录（details 为 None 时保留已有详情）
+        media = self.local.get_media(provider, media_id, is_tv)
+        if media is None:
+            return
+        ttl = self.local.positive_ttl
+        self._redis_set(self._media_key(provider, media_id, is_tv), [media['title'], media['details']], ttl)
+        for alias, year in aliases:
+            if alias:
+                self._redis_set(self._alias_key(canonical_key(alias, year, is_tv)), [provider, str(media_id)], ttl)
+    
+    def get_media(self, provider: str, media_id: Any, is_tv: bool) -> Optional[Dict[str, Any]]:
+        """按作品 ID 查询元数据（本地未命中时查询 Redis 并回填）"""
+        media = self.local.get_media(provider, media_id, is_tv)
+        if media is not None or not self.redis_available:
+            return media
+        return self._load_shared_media(provider, str(media_id), is_tv, [])
+    
+    def find_media(self, title: str, year: Any = None, is_tv: bool = False) -> Optional[Dict[str, Any]]:
+        """经别名查询作品元数据（本地未命中时查询 Redis 并回填）"""
+        media = self.local.find_media(title, year, is_tv)
+        if media is not None or not self.redis_available:
+            return media
+        return self._find_shared_media(canonical_key(title, year, is_tv), title, year, is_tv)
+    
+    def _find_shared_media(self, key: str, title: str, year: Any, is_tv: bool) -> Optional[Dict[str, Any]]:
+        """经 Redis 别名查询作品"""
+        alias = self._redis_get(self._alias_key(key))
+        if alias is MISS:
+            return None
+        provider, media_id = alias
+        return self._load_shared_media(provider, media_id, is_tv, [(title, year)])
+    
+    def _load_shared_media(self, provider: str, media_id: str, is_tv: bool,
+                           aliases: list) -> Optional[Dict[str, Any]]:
+        """从 Redis 读取作品元数据并回填本地（同时登记别名）"""
+        value = self._redis_get(self._media_key(provider, media_id, is_tv))
+        if value is MISS:
+            return None
+        title, details = value
+        self.local.put_media(provider, media_id, is_tv, title, aliases, details)
+        return {
+            'provider': provider,
+            'media_id': media_id,
+            'is_tv': is_tv,
+            'title': title,
+            'details': details,
+        }
+    
+    # ---------- 维护与统计 ----------
+    
+    def purge_expired(self) -> int:
+        """删除本地已过期条目（Redis 键自行过期）"""
+        return self.local.purge_expired()
+    
+    def clear(self):
+        """清空本地缓存和本命名空间下的 Redis 键"""
+        self.local.clear()
+        self.lru.clear()
+        keys = self._redis_call('scan_iter', match=f"{self.prefix}:*")
+        if keys is not None:
+            batch = []
+            for key in keys:
+                batch.append(key)
+                if len(batch) >= 500:
+                    self._redis_call('delete', *batch)
+                    batch = []
+            if batch:
+                self._redis_call('delete', *batch)
+    
+    def export_rows(self, chunk_size: int = 5000):
+        """导出本地缓存（Redis 层由各节点共享，不导出）"""
+        return self.local.export_rows(chunk_size)
+    
+    def import_rows(self, kind: str, rows: list) -> int:
+        """导入到本地缓存"""
+        return self.local.import_rows(kind, rows)
+    
+    def __len__(self) -> int:
+        return len(self.local)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计（本地统计 + LRU 和 Redis 层统计）"""
+        return {
+            **self.local.get_stats(),
+            'lru': self.lru.get_stats(),
+            'redis': {
+                'enabled': self.redis is not None,
+                'available': self.redis_available,
+                'namespace': self.prefix,
+                'hits': self.redis_hits,
+                'misses': self.redis_misses,
+                'writes': self.redis_writes,
+                'errors': self.redis_errors,
+            },
+        }
+    
+    def close(self):
+        """关闭本地数据库连接"""
+        self.local.close()
+
+
+def create_redis_client(url: str) -> Any:
+    """
+    创建 Redis 客户端（未安装 redis 包时返回 None）
+    
+    Args:
+        url: Redis 地址（如 redis://redis:6379/0）
+    
+    Returns:
+        redis.Redis 实例或 None
+    """
+    try:
+        import redis
+    except ImportError:
+        print("ℹ 未安装 redis 包，仅使用本地元数据缓存")
+        return None
+    # 超时较短：Redis 不可达时尽快退回本地缓存
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+def wrap_shared_cache(local: MetadataCache, config) -> Any:
+    """
+    按配置为本地缓存加上共享层（配置 redis_url 或环境变量 REDIS_URL 时启用）
+    
+    Args:
+        local: 本地元数据缓存
+        config: 配置管理器
+    
+    Returns:
+        SharedMetadataCache，未配置 Redis 时返回 local 本身
+    """
+    url = config.get('redis_url') or os.getenv('REDIS_URL')
+    if not url or not config.get('shared_cache_enabled', True):
+        return local
+    return SharedMetadataCache(
+        local,
+        create_redis_client(url),
+        namespace=config.get('shared_cache_namespace', DEFAULT_NAMESPACE) or DEFAULT_NAMESPACE,
+        lru_size=int(config.get('shared_cache_lru_size', DEFAULT_LRU_SIZE))
+    )
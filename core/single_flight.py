@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单飞（single-flight）调用合并
+同一个键的并发调用只执行一次：第一个调用者执行，其余调用者等待并共享它的结果（或异常）
+用于合并多个工作线程（以及异步解析器的协程）对同一标题的并发在线查询
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """进行中的调用（结果保存在 Future 中，线程和协程都可以等待）"""
+    
+    __slots__ = ('future', 'waiters')
+    
+    def __init__(self):
+        self.future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """单飞调用合并器（线程安全）"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0      # 实际执行次数
+        self.coalesced = 0     # 被合并（等待共享结果）的调用次数
+    
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行调用（同一键已有进行中的调用时等待其结果）
+        
+        Args:
+            key: 调用键
+            func: 无参函数
+        
+        Returns:
+            (结果, 是否为共享结果)；执行者抛出的异常会同样抛给所有等待者
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return call.future.result(), True
+        
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result, False
+    
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        异步执行调用（与 do 共用进行中的调用：协程和线程对同一键的调用同样只执行一次）
+        
+        Args:
+            key: 调用键
+            func: 返回协程的无参函数
+        
+        Returns:
+            (结果, 是否为共享结果)
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(call.future), True
+        
+        try:
+            result = await func()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result, False
+    
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """加入同一键进行中的调用，没有时创建，返回 (调用, 是否为执行者)"""
+        with self.lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.executed += 1
+            return call, True
+    
+    def _finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None):
+        """结束调用：先移出进行中的调用，再把结果（或异常）交给等待者"""
+        with self.lock:
+            del self._calls[key]
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+    
+    def in_flight(self) -> int:
+        """进行中的调用数"""
+        with self.lock:
+            return len(self._calls)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取合并统计"""
+        total = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': self.in_flight(),
+            'coalesce_rate': self.coalesced / total if total > 0 else 0.0,
+        }
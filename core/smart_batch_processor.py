@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 import uuid
 
+from core.recognition_result import RecognitionResult
+
 
 class ProcessingStats:
     """处理统计"""
@@ -24,6 +26,10 @@ class ProcessingStats:
             "skipped": 0,
             "chinese_title_queries": 0,
             "template_renders": 0,
+            "season_pack_files": 0,
+            "identity_lookups": 0,
+            "metadata_requests": 0,
+            "sidecar_files": 0,
             "start_time": None,
             "end_time": None,
             "duration": 0,
@@ -95,22 +101,29 @@ class SmartBatchProcessor:
         use_queue: bool = False,
         use_rate_limit: bool = False,
         max_workers: int = 4,
-        rate_limit: int = 10
+        rate_limit: int = 10,
+        infer_season_packs: bool = True,
+        async_resolution: bool = True
     ):
         from core.chinese_title_resolver import IntegratedRecognizer
         from core.template_engine import get_template_engine
         from core.events import get_event_bus, EventTypes
+        from core.quality_scorer import get_quality_scorer
+        from core.config import get_config
         
         self.recognizer = IntegratedRecognizer(tmdb_api_key, douban_cookie)
         self.template_engine = get_template_engine()
+        self.quality_scorer = get_quality_scorer()
         self.event_bus = get_event_bus()
         self.stats = ProcessingStats()
+        self.infer_season_packs = infer_season_packs
         
         # v2.3.0: 队列管理和速率限制
         self.use_queue = use_queue
         self.use_rate_limit = use_rate_limit
         self.queue_manager = None
         self.rate_limiter = None
+        self.provider_limiters: Dict[str, Any] = {}
         
         if use_queue:
             from core.queue_manager import get_queue_manager
@@ -123,6 +136,34 @@ class SmartBatchProcessor:
                 max_requests=rate_limit,
                 time_window=1.0
             )
+            # 每个提供方单独限速，与任务提交及其他提供方互不占用配额
+            self.provider_limiters = {
+                provider: RateLimiter(algorithm='token_bucket', max_requests=rate_limit, time_window=1.0)
+                for provider in ('douban', 'tmdb')
+            }
+        
+        # 批量识别时并发查询标题（每个提供方的请求由各自的速率限制器约束）
+        self.async_recognizer = None
+        if async_resolution:
+            from core.async_resolver import AsyncIntegratedRecognizer
+            
+            self.async_recognizer = AsyncIntegratedRecognizer(
+                self.recognizer, rate_limiters=self.provider_limiters or None
+            )
+        
+        # 已刮削的文件按 .nfo 确定标题，不查询网络
+        self.sidecars = None
+        if get_config().get('nfo_sidecars', True):
+            from core.nfo_sidecar import SidecarResolver
+            
+            self.sidecars = SidecarResolver(self.recognizer)
+        
+        # 按作品补全 TMDB 详情（集标题、播出日期等模板字段）
+        self.enricher = None
+        if tmdb_api_key and get_config().get('metadata_enrichment', True):
+            from core.metadata_enricher import MetadataEnricher
+            
+            self.enricher = MetadataEnricher(self.recognizer.title_resolver.cache, tmdb_api_key)
         
         # 默认配置
         self.default_template = {
@@ -157,10 +198,36 @@ class SmartBatchProcessor:
         
         results = []
         
+        # 批量识别（季包只完整识别一次，批内重复文件名只识别一次，重复扫描命中 LRU 缓存）
+        try:
+            infos = self._recognize_batch(file_paths)
+        except Exception as e:
+            print(f"⚠ 批量识别失败，改为逐个识别: {e}")
+            infos = [None] * len(file_paths)
+        
+        # 按作品补全详情（每部作品一次请求，与集数无关）
+        if self.enricher is not None:
+            try:
+                self.stats.stats["metadata_requests"] += self.enricher.enrich(infos)
+            except Exception as e:
+                print(f"⚠ 元数据补全失败: {e}")
+        
+        # 批量计算质量分数
+        scores = [None] * len(file_paths)
+        if file_paths and infos[0] is not None:
+            try:
+                scores = self.quality_scorer.score_batch(infos)
+            except Exception as e:
+                print(f"⚠ 批量评分失败，改为逐个评分: {e}")
+        
+        # 按模板批量渲染文件名（每个模板只编译一次）
+        new_names = self._render_names(file_paths, infos, template_name)
+        
         for i, file_path in enumerate(file_paths):
             try:
                 # 处理单个文件
-                result = self._process_single_file(file_path, template_name)
+                score = int(scores[i]) if scores[i] is not None else None
+                result = self._process_single_file(file_path, template_name, infos[i], score, new_names[i])
                 
                 # 更新统计
                 self.stats.update(result['success'], result.get('error'))
@@ -210,38 +277,185 @@ class SmartBatchProcessor:
             'stats': self.stats.get_summary()
         }
     
-    def _process_single_file(self, file_path: str, template_name: str = None) -> Dict[str, Any]:
-        """处理单个文件"""
+    def _recognize_batch(self, file_paths: List[str]) -> List[RecognitionResult]:
+        """
+        批量识别：先按目录推断季包，季包成员由一次完整识别 + 集数位置得到结果，
+        其余文件（及未通过校验的季包）逐个完整识别
+        
+        Args:
+            file_paths: 文件路径列表
+        
+        Returns:
+            识别结果列表（与输入顺序一致）
+        """
+        names = [Path(file_path).name for file_path in file_paths]
+        infos = self._recognize_packs(file_paths, names)
+        
+        # 其余文件按身份分组，每个 (标题, 年份, 类型) 只查询一次中文标题
+        remaining = [index for index, info in enumerate(infos) if info is None]
+        if remaining:
+            lookups = self.recognizer.identity_lookups
+            remaining_names = [names[index] for index in remaining]
+            if self.async_recognizer is not None:
+                recognized = self.async_recognizer.recognize_many_sync(remaining_names)
+            else:
+                recognized = self.recognizer.recognize_many_with_chinese_title(remaining_names)
+            for index, info in zip(remaining, recognized):
+                infos[index] = info
+            self.stats.stats["identity_lookups"] += self.recognizer.identity_lookups - lookups
+        return infos
+    
+    def _recognize_packs(self, file_paths: List[str], names: List[str]) -> List[Optional[RecognitionResult]]:
+        """
+        按 .nfo 和季包识别
+        
+        Returns:
+            识别结果列表（与输入顺序一致，不属于这两类的文件为 None）
+        """
+        infos: List[Optional[RecognitionResult]] = [None] * len(file_paths)
+        
+        for index, info in self._resolve_sidecars(file_paths).items():
+            infos[index] = info
+        
+        if self.infer_season_packs:
+            from core.season_pack import find_season_packs
+            
+            for pack in find_season_packs(file_paths):
+                # 已由 .nfo 确定的成员不再按季包推断，其余成员逐个识别
+                if any(infos[index] is not None for index in pack.indexes):
+                    continue
+                pack_infos = self._recognize_pack(names, pack)
+                if pack_infos is None:
+                    continue
+                for index, info in zip(pack.indexes, pack_infos):
+                    infos[index] = info
+                self.stats.stats["season_pack_files"] += len(pack)
+        return infos
+    
+    def _resolve_sidecars(self, file_paths: List[str]) -> Dict[int, RecognitionResult]:
+        """
+        按 .nfo 识别（结果不写入按文件名索引的识别结果缓存，由调用方直接使用）
+        
+        Returns:
+            序号 -> 识别结果（只包含有可用 .nfo 的文件）
+        """
+        if self.sidecars is None:
+            return {}
+        try:
+            resolved = self.sidecars.resolve(file_paths)
+        except Exception as e:
+            print(f"⚠ .nfo 识别失败: {e}")
+            return {}
+        if resolved:
+            print(f"✓ 按 .nfo 识别: {len(resolved)} 个文件")
+        self.stats.stats["sidecar_files"] += len(resolved)
+        return resolved
+    
+    def _recognize_pack(self, names: List[str], pack) -> Optional[List[RecognitionResult]]:
+        """
+        识别季包：完整识别第一个成员，用最后一个成员校验推断出的集数位置
+        
+        Args:
+            names: 全部文件名
+            pack: SeasonPack
+        
+        Returns:
+            成员识别结果（与 pack.indexes 对应）；模式不成立时返回 None
+        """
+        first = names[pack.indexes[0]]
+        info = self.recognizer.recognize_with_chinese_title(first)
+        if not info['is_tv'] or info['episode'] != pack.episodes[0]:
+            return None
+        
+        # 校验：另一个成员单独解析（不查询元数据）得到相同的标题/季数和推断的集数
+        advanced = self.recognizer.advanced_recognizer
+        expected = advanced.recognize(first)
+        probe = advanced.recognize(names[pack.indexes[-1]])
+        if (probe['title'] != expected['title'] or probe['season'] != expected['season']
+                or probe['episode'] != pack.episodes[-1]):
+            return None
+        
+        results = []
+        for index, episode in zip(pack.indexes, pack.episodes):
+            member = info.copy()
+            member.original_name = names[index]
+            member.episode = episode
+            results.append(member)
+        print(f"✓ 季包: {pack.template} ({len(pack)} 个文件)")
+        return results
+    
+    def _render_names(
+        self,
+        file_paths: List[str],
+        infos: List[Optional[RecognitionResult]],
+        template_name: str = None
+    ) -> List[Optional[str]]:
+        """
+        按模板分组批量渲染文件名
+        
+        Returns:
+            新文件名列表（识别失败或渲染出错的文件为 None，由逐个处理时渲染并报告错误）
+        """
+        new_names: List[Optional[str]] = [None] * len(file_paths)
+        groups: Dict[str, List[int]] = {}
+        for index, info in enumerate(infos):
+            if info is not None:
+                groups.setdefault(self._template_name(info, template_name), []).append(index)
+        
+        for name, indexes in groups.items():
+            try:
+                rendered = self.template_engine.render_many(
+                    name, [self._template_context(file_paths[index], infos[index]) for index in indexes]
+                )
+            except Exception:
+                continue
+            for index, new_name in zip(indexes, rendered):
+                new_names[index] = new_name
+        return new_names
+    
+    def _template_name(self, info: RecognitionResult, template_name: str = None) -> str:
+        """文件使用的模板（未指定时按类型选择默认模板）"""
+        if template_name:
+            return template_name
+        return self.default_template['tv'] if info['is_tv'] else self.default_template['movie']
+    
+    def _template_context(self, file_path: str, info: RecognitionResult) -> Dict[str, Any]:
+        """模板渲染上下文（识别结果 + 扩展名 + 补全字段）"""
+        context = info.template_context(Path(file_path).suffix[1:])  # 移除点号
+        if self.enricher is not None:
+            context.update(self.enricher.template_fields(info))
+        return context
+    
+    def _process_single_file(
+        self,
+        file_path: str,
+        template_name: str = None,
+        info: Optional[RecognitionResult] = None,
+        quality_score: Optional[int] = None,
+        new_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """处理单个文件（info / quality_score / new_name 为批量识别、评分和渲染的结果时跳过对应步骤）"""
         try:
             # 1. 识别文件（自动获取中文标题）
             print(f"识别文件: {Path(file_path).name}")
-            info = self.recognizer.recognize_with_chinese_title(Path(file_path).name)
+            if info is None:
+                info = self.recognizer.recognize_with_chinese_title(Path(file_path).name)
             
             # 统计中文标题查询
             if info.get('original_title'):
                 self.stats.stats["chinese_title_queries"] += 1
             
             # 2. 确定模板
-            if not template_name:
-                template_name = self.default_template['tv'] if info['is_tv'] else self.default_template['movie']
+            template_name = self._template_name(info, template_name)
             
-            # 3. 生成新文件名
-            context = {
-                'title': info['title'],
-                'year': info['year'],
-                'season': info['season'],
-                'episode': info['episode'],
-                'resolution': info['resolution'],
-                'video_codec': info['video_codec'],
-                'audio_codec': info['audio_codec'],
-                'source': info['source'],
-                'ext': Path(file_path).suffix[1:],  # 移除点号
-            }
-            
-            new_name = self.template_engine.render(template_name, context)
+            # 3. 生成新文件名（识别结果本身保留在结果中，不再复制为字典）
+            if new_name is None:
+                new_name = self.template_engine.render(template_name, self._template_context(file_path, info))
             self.stats.stats["template_renders"] += 1
             
             # 4. 返回结果
+            if quality_score is None:
+                quality_score = self.quality_scorer.score(info)
             return {
                 'file_path': file_path,
                 'success': True,
@@ -249,7 +463,7 @@ class SmartBatchProcessor:
                 'new_name': new_name,
                 'info': info,
                 'template': template_name,
-                'quality_score': self.recognizer.advanced_recognizer.get_quality_score(info),
+                'quality_score': quality_score,
                 'message': f"成功: {Path(file_path).name} → {new_name}"
             }
             
@@ -296,6 +510,13 @@ class SmartBatchProcessor:
         results = []
         completed_count = 0
         
+        # 预先批量识别（.nfo、季包、按身份分组查询中文标题），结果随任务数据传入，任务中不再识别
+        try:
+            infos = self._recognize_batch(file_paths)
+        except Exception as e:
+            print(f"⚠ 批量识别失败，改为逐个识别: {e}")
+            infos = [None] * len(file_paths)
+        
         # 提交所有任务到队列
         task_ids = []
         for i, file_path in enumerate(file_paths):
@@ -309,8 +530,8 @@ class SmartBatchProcessor:
             # 提交任务
             self.queue_manager.submit(
                 task_id=task_id,
-                data={'file_path': file_path, 'template_name': template_name},
-                callback=lambda data: self._process_single_file(data['file_path'], data['template_name']),
+                data={'file_path': file_path, 'template_name': template_name, 'info': infos[i]},
+                callback=lambda data: self._process_single_file(data['file_path'], data['template_name'], data['info']),
                 priority=priority,
                 timeout=60
             )
@@ -357,6 +578,32 @@ class SmartBatchProcessor:
             'stats': self.stats.get_summary()
         }
     
+    def select_best(
+        self,
+        results: List[Dict[str, Any]],
+        k: int = 1,
+        profile: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按媒体身份去重，每部电影/每集保留质量最高的 k 个处理结果
+        
+        Args:
+            results: process_batch 返回的 results
+            k: 每个身份保留数量
+            profile: 评分方案（默认使用配置中的 quality_profile）
+        
+        Returns:
+            保留的结果（按输入顺序）
+        """
+        candidates = [result for result in results if result.get('success') and result.get('info') is not None]
+        if not candidates:
+            return []
+        
+        infos = [result['info'] for result in candidates]
+        selected = self.quality_scorer.top_k(infos, k=k, profile=profile)
+        keep = sorted(index for indexes in selected.values() for index in indexes)
+        return [candidates[index] for index in keep]
+    
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         stats = self.stats.get_summary()
@@ -368,8 +615,22 @@ class SmartBatchProcessor:
         # 添加速率限制统计
         if self.use_rate_limit and self.rate_limiter:
             stats['rate_limit_stats'] = self.rate_limiter.get_stats()
+            stats['provider_rate_limit_stats'] = {
+                provider: limiter.get_stats() for provider, limiter in self.provider_limiters.items()
+            }
+        
+        # 添加识别缓存统计
+        stats['recognizer_cache'] = self.recognizer.get_cache_stats()
+        
+        if self.sidecars is not None:
+            stats['sidecars'] = self.sidecars.get_stats()
         
         return stats
+    
+    def close(self):
+        """释放处理器自己创建的资源（异步标题查询的线程池）"""
+        if self.async_recognizer is not None:
+            self.async_recognizer.close()
 
 
 # 全局实例
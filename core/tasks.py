@@ -12,6 +12,7 @@ from core.celery_app import celery_app
 from core.models import db, Task, ProcessHistory
 from core.smart_batch_processor import SmartBatchProcessor
 from core.template_engine import get_template_engine
+from core.recognition_result import to_jsonable
 
 
 @celery_app.task(bind=True, name='tasks.process_files')
@@ -28,6 +29,7 @@ def process_files_task(self, user_id, files, template='movie_default', use_queue
     """
     task_id = self.request.id
     total = len(files)
+    processor = None
     
     try:
         # 更新任务状态
@@ -94,6 +96,10 @@ def process_files_task(self, user_id, files, template='movie_default', use_queue
         # 任务失败
         update_task_status(task_id, user_id, 'failed', 0, total, error_message=str(e))
         raise
+    finally:
+        # 每个任务创建自己的处理器，结束时释放其线程池
+        if processor is not None:
+            processor.close()
 
 
 @celery_app.task(name='tasks.cleanup_old_tasks')
@@ -170,7 +176,7 @@ def save_history(user_id, original_name, result, template):
         status='success' if result.get('success') else 'failed',
         error_message=result.get('error'),
         template_used=template,
-        metadata=result.get('info', {})
+        metadata=to_jsonable(result.get('info', {}))
     )
     
     db.session.add(history)
@@ -3,10 +3,172 @@
 """
 模板引擎
 支持灵活的文件命名模板
+
+模板第一次使用时编译为渲染函数：字面量片段、占位符的取值方式和格式规范都预先确定，
+渲染时只按顺序取值、拼接，再执行清理规则（不含触发字符的规则直接跳过）。
+编译结果按 (模板名称, 模板内容哈希) 缓存，add_template 修改模板时失效。
 """
 
 import re
-from typing import Dict, Any, Optional
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+
+# 占位符：{key} 或 {key:format}，例如 {season:02d} -> 01
+_PLACEHOLDER = re.compile(r'\{(\w+)(?::([^}]+))?\}')
+
+# 上下文缺少或为 None 时使用的默认值
+DEFAULT_CONTEXT = {
+    'title': 'Unknown',
+    'year': '',
+    'season': 0,
+    'episode': 0,
+    'resolution': '',
+    'video_codec': '',
+    'audio_codec': '',
+    'source': '',
+    'platform': '',
+    'edition': '',
+    'tmdb_id': '',
+    'original_title': '',
+    'episode_title': '',
+    'air_date': '',
+    'quality': '',
+    'ext': 'mkv',
+}
+
+# 未知占位符在上下文中不存在时的标记（渲染为空字符串）
+_MISSING = object()
+
+# 渲染函数：上下文 -> 文件名
+RenderFunc = Callable[[Dict[str, Any]], str]
+
+# 清理第一步：各种空白统一为单个空格
+# （只有出现连续空白或空格以外的空白时才需要；空格以外的空白字符都是不可打印字符）
+_WHITESPACE = re.compile(r'\s+')
+
+# 其余清理规则（按顺序）：(触发子串, 正则, 替换)，文本中不含任何触发子串时跳过
+# 第一步之后文本中的空白只有空格，触发子串据此列出
+_CLEANUP_RULES = (
+    (('()', '( )', '(  '), re.compile(r'\(\s*\)'), ''),            # 空括号
+    (('[]', '[ ]', '[  '), re.compile(r'\[\s*\]'), ''),            # 空方括号
+    (('-.', '_.', ' .'), re.compile(r'[-_\s]+\.'), '.'),            # 扩展名前的分隔符
+    (('--', '__', '-_', '_-'), re.compile(r'[-_]{2,}'), '-'),       # 多个连字符合并
+    (('  ',), re.compile(r'\s{2,}'), ' '),                          # 多个空格合并
+    (('//',), re.compile(r'/+'), '/'),                              # 路径分隔符
+)
+
+
+def clean_result(text: str) -> str:
+    """清理渲染结果：合并空白，移除空括号和多余的分隔符"""
+    if '  ' in text or not text.isprintable():
+        text = _WHITESPACE.sub(' ', text)
+    for triggers, pattern, replacement in _CLEANUP_RULES:
+        for trigger in triggers:
+            if trigger in text:
+                text = pattern.sub(replacement, text)
+                break
+    return text.strip()
+
+
+def _quality(context: Dict[str, Any]) -> str:
+    """quality 字段：上下文未提供时由分辨率和来源生成"""
+    value = context.get('quality')
+    if value:
+        return value
+    parts = [str(part) for part in (context.get('resolution'), context.get('source')) if part]
+    return '-'.join(parts) if parts else 'Unknown'
+
+
+def _value_getter(key: str) -> Callable[[Dict[str, Any]], Any]:
+    """占位符取值函数（应用默认值；未知且不存在的键返回 _MISSING）"""
+    if key == 'quality':
+        return _quality
+    if key in DEFAULT_CONTEXT:
+        default = DEFAULT_CONTEXT[key]
+        
+        def get(context):
+            value = context.get(key)
+            return default if value is None else value
+        return get
+    return lambda context: context.get(key, _MISSING)
+
+
+def _compile_placeholder(key: str, format_spec: Optional[str]) -> Callable[[Dict[str, Any]], str]:
+    """编译单个占位符：取值 + 格式化（数字格式先转换类型，失败时输出原值）"""
+    if not format_spec and key in DEFAULT_CONTEXT and key != 'quality':
+        # 最常见的情况：已知字段，无格式规范
+        default = str(DEFAULT_CONTEXT[key])
+        
+        def render(context):
+            value = context.get(key)
+            return default if value is None else str(value)
+        return render
+    
+    get = _value_getter(key)
+    if not format_spec:
+        def render(context):
+            value = get(context)
+            return '' if value is _MISSING else str(value)
+    elif 'd' in format_spec or 'f' in format_spec:
+        convert, zero = (int, 0) if 'd' in format_spec else (float, 0.0)
+        
+        def render(context):
+            value = get(context)
+            if value is _MISSING:
+                return ''
+            try:
+                number = convert(value) if value else zero
+            except (ValueError, TypeError):
+                return str(value)
+            try:
+                return format(number, format_spec)
+            except (ValueError, TypeError):
+                return str(number)
+    else:
+        def render(context):
+            value = get(context)
+            if value is _MISSING:
+                return ''
+            try:
+                return format(value, format_spec)
+            except (ValueError, TypeError):
+                return str(value)
+    return render
+
+
+def compile_template(template: str) -> RenderFunc:
+    """
+    把模板编译为渲染函数
+    
+    Args:
+        template: 模板内容
+    
+    Returns:
+        渲染函数：上下文 -> 清理后的文件名
+    """
+    parts: List[str] = []
+    slots: List[Tuple[int, Callable[[Dict[str, Any]], str]]] = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(template):
+        if match.start() > position:
+            parts.append(template[position:match.start()])
+        slots.append((len(parts), _compile_placeholder(match.group(1), match.group(2))))
+        parts.append('')
+        position = match.end()
+    if position < len(template):
+        parts.append(template[position:])
+    
+    if not slots:
+        text = clean_result(''.join(parts))
+        return lambda context: text
+    
+    def render(context: Dict[str, Any]) -> str:
+        output = parts.copy()
+        for index, placeholder in slots:
+            output[index] = placeholder(context)
+        return clean_result(''.join(output))
+    return render
 
 
 class TemplateEngine:
@@ -26,6 +188,7 @@ class TemplateEngine:
             'tv_simple': '{title}/S{season:02d}/{title} - S{season:02d}E{episode:02d}.{ext}',
             'tv_detailed': '{title}/Season {season:02d}/{title} - S{season:02d}E{episode:02d} [{resolution} {video_codec} {audio_codec} {source}].{ext}',
             'tv_quality': '{title}/Season {season:02d}/{title} - S{season:02d}E{episode:02d} [{quality}].{ext}',
+            'tv_episode_title': '{title}/Season {season:02d}/{title} - S{season:02d}E{episode:02d} - {episode_title}.{ext}',
             
             # NAS-Tools 风格
             'nas_movie': '{title} ({year})/{title} ({year}) [{resolution} {video_codec} {audio_codec}].{ext}',
@@ -47,6 +210,10 @@ class TemplateEngine:
         # 用户自定义模板
         self.custom_templates = {}
     
+        # 编译缓存：(模板名称, 模板内容哈希) -> (模板内容, 渲染函数)
+        self._compiled: Dict[Tuple[str, int], Tuple[str, RenderFunc]] = {}
+        self._lock = threading.Lock()
+    
     def render(self, template_name: str, context: Dict[str, Any]) -> str:
         """
         渲染模板
@@ -58,21 +225,52 @@ class TemplateEngine:
         Returns:
             渲染后的字符串
         """
-        # 获取模板
+        return self.compile(template_name)(context)
+    
+    def render_many(self, template_name: str, contexts: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        用同一模板批量渲染（模板只查找、编译一次）
+        
+        Args:
+            template_name: 模板名称
+            contexts: 上下文序列
+        
+        Returns:
+            渲染结果列表（与输入顺序一致）
+        """
+        render = self.compile(template_name)
+        return [render(context) for context in contexts]
+    
+    def compile(self, template_name: str) -> RenderFunc:
+        """
+        获取模板的渲染函数（按名称和内容哈希缓存，模板内容变化后自动重新编译）
+        
+        Args:
+            template_name: 模板名称
+        
+        Returns:
+            渲染函数：上下文 -> 文件名
+        """
         template = self.get_template(template_name)
         if not template:
             raise ValueError(f"模板不存在: {template_name}")
         
-        # 预处理上下文
-        context = self._prepare_context(context)
-        
-        # 渲染模板
-        result = self._render_template(template, context)
+        key = (template_name, hash(template))
+        entry = self._compiled.get(key)
+        if entry is None or entry[0] != template:
+            entry = (template, compile_template(template))
+            with self._lock:
+                self._compiled[key] = entry
+        return entry[1]
         
-        # 清理结果
-        result = self._clean_result(result)
-        
-        return result
+    def invalidate(self, template_name: Optional[str] = None):
+        """清除编译缓存（不指定名称时清除全部）"""
+        with self._lock:
+            if template_name is None:
+                self._compiled.clear()
+            else:
+                for key in [key for key in self._compiled if key[0] == template_name]:
+                    del self._compiled[key]
     
     def get_template(self, name: str) -> Optional[str]:
         """获取模板"""
@@ -84,8 +282,9 @@ class TemplateEngine:
         return self.templates.get(name)
     
     def add_template(self, name: str, template: str):
-        """添加自定义模板"""
+        """添加自定义模板（同名模板的编译结果失效）"""
         self.custom_templates[name] = template
+        self.invalidate(name)
     
     def list_templates(self) -> Dict[str, str]:
         """列出所有模板"""
@@ -93,99 +292,6 @@ class TemplateEngine:
         all_templates.update(self.custom_templates)
         return all_templates
     
-    def _prepare_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """预处理上下文数据"""
-        prepared = context.copy()
-        
-        # 确保必要的字段存在
-        defaults = {
-            'title': 'Unknown',
-            'year': '',
-            'season': 0,
-            'episode': 0,
-            'resolution': '',
-            'video_codec': '',
-            'audio_codec': '',
-            'source': '',
-            'quality': '',
-            'ext': 'mkv',
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in prepared or prepared[key] is None:
-                prepared[key] = default_value
-        
-        # 生成 quality 字段（如果不存在）
-        if not prepared['quality']:
-            quality_parts = []
-            if prepared['resolution']:
-                quality_parts.append(str(prepared['resolution']))
-            if prepared['source']:
-                quality_parts.append(str(prepared['source']))
-            prepared['quality'] = '-'.join(quality_parts) if quality_parts else 'Unknown'
-        
-        return prepared
-    
-    def _render_template(self, template: str, context: Dict[str, Any]) -> str:
-        """渲染模板（支持格式化）"""
-        result = template
-        
-        # 处理格式化占位符 {key:format}
-        # 例如: {season:02d} -> 01
-        pattern = r'\{(\w+)(?::([^}]+))?\}'
-        
-        def replace_placeholder(match):
-            key = match.group(1)
-            format_spec = match.group(2)
-            
-            if key not in context:
-                return ''
-            
-            value = context[key]
-            
-            # 如果有格式化规范
-            if format_spec:
-                try:
-                    # 处理数字格式化
-                    if 'd' in format_spec:  # 整数格式
-                        value = int(value) if value else 0
-                        return f'{value:{format_spec}}'
-                    elif 'f' in format_spec:  # 浮点数格式
-                        value = float(value) if value else 0.0
-                        return f'{value:{format_spec}}'
-                    else:
-                        return f'{value:{format_spec}}'
-                except (ValueError, TypeError):
-                    return str(value)
-            
-            return str(value)
-        
-        result = re.sub(pattern, replace_placeholder, result)
-        
-        return result
-    
-    def _clean_result(self, text: str) -> str:
-        """清理渲染结果"""
-        # 移除多余的空格
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 移除空的括号和方括号
-        text = re.sub(r'\(\s*\)', '', text)
-        text = re.sub(r'\[\s*\]', '', text)
-        
-        # 移除多余的分隔符
-        text = re.sub(r'[-_\s]+\.', '.', text)  # 移除扩展名前的分隔符
-        text = re.sub(r'[-_]{2,}', '-', text)   # 多个连字符合并
-        text = re.sub(r'\s{2,}', ' ', text)     # 多个空格合并
-        
-        # 清理路径分隔符
-        text = re.sub(r'/+', '/', text)
-        
-        # 移除首尾空格
-        text = text.strip()
-        
-        return text
-    
     def validate_template(self, template: str) -> tuple[bool, Optional[str]]:
         """
         验证模板是否有效
@@ -199,14 +305,15 @@ class TemplateEngine:
                 return False, "括号不匹配"
             
             # 检查占位符是否有效
-            pattern = r'\{(\w+)(?::([^}]+))?\}'
-            matches = re.findall(pattern, template)
+            matches = _PLACEHOLDER.findall(template)
             
             valid_keys = {
                 'title', 'year', 'season', 'episode',
                 'resolution', 'video_codec', 'audio_codec',
                 'source', 'quality', 'ext', 'hdr',
-                'language', 'subtitle', 'release_group'
+                'language', 'subtitle', 'release_group',
+                'platform', 'edition', 'tmdb_id', 'original_title',
+                'episode_title', 'air_date'
             }
             
             for key, format_spec in matches:
@@ -224,9 +331,15 @@ class TemplateEngine:
                 'audio_codec': 'AAC',
                 'source': 'WEB-DL',
                 'quality': '1080p-WEB-DL',
+                'platform': 'Netflix',
+                'edition': "Director's Cut",
+                'tmdb_id': 1399,
+                'original_title': 'Game of Thrones',
+                'episode_title': 'Winter Is Coming',
+                'air_date': '2011-04-17',
                 'ext': 'mkv',
             }
-            self._render_template(template, test_context)
+            compile_template(template)(test_context)
             
             return True, None
             
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地标题索引
+从 TMDB 每日 ID 导出文件（movie_ids / tv_series_ids，JSON Lines，可为 .gz）
+和本地的别名文件构建 SQLite 索引，离线把英文/原始标题映射为中文标题
+
+别名文件为 JSON Lines，每行一个作品，格式与 TMDB alternative_titles 接口一致：
+    {"id": 603, "titles": [{"iso_3166_1": "CN", "title": "黑客帝国"}, ...]}
+剧集接口的 "results" 键同样支持；也接受每行一个别名：
+    {"id": 603, "iso_3166_1": "CN", "title": "黑客帝国"}
+
+构建过程逐行流式读取，不把导出文件载入内存；索引只保留有中文标题的作品。
+标题按 core.title_key.canonical_title 规范化（索引记录键版本，规则变化后需重建）。
+导出行带有 release_date / first_air_date / year 时记录年份；TMDB 每日 ID 导出本身不含上映日期，
+这种索引里所有作品都没有年份。
+
+查询先按规范化标题精确匹配，未命中时用三元组（trigram）全文索引做相似匹配：
+- 查询带年份时只接受年份相差不超过 1 的作品
+- 候选中有多个不同的中文标题时视为未命中（不按热度猜测）
+- 精确匹配、中文标题唯一、且没有年份冲突（同名作品中没有被年份排除的）的结果可信，可以直接使用；
+  作品没有年份时，查询带年份也按此规则处理（不会因为缺少年份而每次都在线查询）
+- 相似匹配，以及同名作品有被年份排除、剩下的都没有年份的结果，只在无法在线查询时作为回退
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.title_key import KEY_VERSION, canonical_title
+
+
+# 默认索引路径
+DEFAULT_INDEX_PATH = "data/title_index.db"
+
+# 中文别名地区优先级（数值越小越优先）
+REGION_PRIORITY = {'CN': 0, 'SG': 1, 'TW': 2, 'HK': 3, 'MO': 4}
+_OTHER_PRIORITY = 9
+
+# 作品类型编码
+MOVIE = 0
+TV = 1
+
+# 相似匹配：候选数量和最低三元组相似度
+FUZZY_CANDIDATES = 50
+FUZZY_THRESHOLD = 0.8
+
+# 年份匹配允许的误差（上映日期跨年、地区上映时间不同）
+YEAR_TOLERANCE = 1
+
+# 构建时每批写入的行数
+_BATCH_SIZE = 10000
+
+_CJK = re.compile(r'[一-鿿]')
+_DIGITS = re.compile(r'\d+')
+
+
+def _trigrams(text: str) -> set:
+    """三元组集合（两端补空格，短标题也有三元组）"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _parse_year(value: Any) -> Optional[int]:
+    """年份或日期（"1968" / "1968-04-03" / 1968）中的年份，无法解析时返回 None"""
+    text = str(value or '')[:4]
+    return int(text) if text.isdigit() and text != '0000' else None
+
+
+def _open_lines(path: str) -> Iterator[Dict[str, Any]]:
+    """逐行读取 JSON Lines 文件（.gz 自动解压），跳过无法解析的行"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class TitleIndex:
+    """本地标题索引（只读查询，线程安全）"""
+    
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        打开索引
+        
+        Args:
+            db_path: 索引文件路径（必须已存在，使用 TitleIndexBuilder 构建）
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"标题索引不存在: {db_path}")
+        self.db_path = db_path
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.fuzzy = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'names_fts'"
+        ).fetchone() is not None
+        # 旧索引的作品表没有年份列：查询带年份时结果均视为未核对
+        self.has_year = any(
+            column[1] == 'year' for column in self.conn.execute('PRAGMA table_info(media)').fetchall()
+        )
+        
+        # 旧版本规范化规则构建的索引：精确匹配会漏掉部分标题
+        self.key_version = self._read_key_version()
+        if self.key_version != KEY_VERSION:
+            print(f"⚠ 标题索引的键版本为 {self.key_version}，当前为 {KEY_VERSION}，请重新构建: {db_path}")
+        
+        self.hits = 0
+        self.weak_hits = 0
+        self.ambiguous = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+    
+    def _read_key_version(self) -> int:
+        """索引构建时的键版本（没有 meta 表的旧索引为 1）"""
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'key_version'").fetchone()
+        except sqlite3.OperationalError:
+            return 1
+        return int(row[0]) if row else 1
+    
+    def lookup(self, title: str, year: Any = None, is_tv: bool = False) -> Optional[str]:
+        """
+        查询可信的中文标题（精确匹配、唯一，且没有年份冲突）
+        
+        Args:
+            title: 英文或原始标题
+            year: 年份
+            is_tv: 是否为电视剧
+        
+        Returns:
+            中文标题，未找到或结果不可信返回 None
+        """
+        match = self.match(title, year, is_tv)
+        return match[0] if match and match[1] else None
+    
+    def match(self, title: str, year: Any = None, is_tv: bool = False) -> Optional[Tuple[str, bool]]:
+        """
+        查询中文标题（包括相似匹配和未核对年份的结果）
+        
+        Args:
+            title: 英文或原始标题
+            year: 年份（已知时只接受相差不超过 YEAR_TOLERANCE 的作品）
+            is_tv: 是否为电视剧
+        
+        Returns:
+            (中文标题, 是否可信)，未找到或有多个不同的候选返回 None
+            可信：精确匹配，且年份已核对或候选中没有被年份排除的作品
+        """
+        norm = canonical_title(title)
+        if not norm:
+            return None
+        
+        media_type = TV if is_tv else MOVIE
+        year = _parse_year(year)
+        started = time.perf_counter()
+        with self.lock:
+            year_column = 'm.year' if self.has_year else 'NULL'
+            rows = self.conn.execute(f'''
+                SELECT DISTINCT c.title, {year_column} FROM names n
+                JOIN chinese c ON c.type = n.type AND c.id = n.id
+                LEFT JOIN media m ON m.type = n.type AND m.id = n.id
+                WHERE n.norm = ? AND n.type = ?
+            ''', (norm, media_type)).fetchall()
+            exact = bool(rows)
+            if not exact:
+                rows = self._lookup_fuzzy(norm, media_type)
+            
+            result = self._select(rows, year)
+            if result is not None and not exact:
+                result = (result[0], False)
+            
+            if result is None:
+                if rows:
+                    self.ambiguous += 1
+                else:
+                    self.misses += 1
+            elif result[1]:
+                self.hits += 1
+            else:
+                self.weak_hits += 1
+            self.lookup_seconds += time.perf_counter() - started
+        return result
+    
+    @staticmethod
+    def _select(rows: List[Tuple[str, Optional[int]]], year: Optional[int]) -> Optional[Tuple[str, bool]]:
+        """
+        从候选 (中文标题, 年份) 中选出唯一的中文标题
+        
+        Returns:
+            (中文标题, 年份是否没有冲突)；没有候选或有多个不同的中文标题时返回 None
+            年份相符，或没有候选因年份不符被排除（包括候选都没有年份）时视为没有冲突
+        """
+        verified = True
+        if year is not None:
+            kept = []
+            matched = conflicted = False
+            for chinese_title, media_year in rows:
+                if media_year is None:
+                    kept.append((chinese_title, media_year))
+                elif abs(media_year - year) <= YEAR_TOLERANCE:
+                    kept.append((chinese_title, media_year))
+                    matched = True
+                else:
+                    conflicted = True
+            rows = kept
+            # 同名的其他作品因年份被排除时，剩下没有年份的作品不一定是要找的那部
+            verified = matched or not conflicted
+        
+        titles = {chinese_title for chinese_title, _ in rows}
+        if len(titles) != 1:
+            return None
+        return titles.pop(), verified
+    
+    def _lookup_fuzzy(self, norm: str, media_type: int) -> List[Tuple[str, Optional[int]]]:
+        """
+        三元组相似匹配（在持有锁时调用）
+        相似度达到 FUZZY_THRESHOLD 且数字（续集编号、年份）与查询完全相同的候选，返回 [(中文标题, 年份)]
+        """
+        if not self.fuzzy or len(norm) < 3:
+            return []
+        
+        grams = {norm[i:i + 3] for i in range(len(norm) - 2)}
+        query = ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in grams)
+        year_column = 'm.year' if self.has_year else 'NULL'
+        rows = self.conn.execute(f'''
+            SELECT n.norm, c.title, {year_column} FROM names_fts f
+            JOIN names n ON n.rowid = f.rowid
+            JOIN chinese c ON c.type = n.type AND c.id = n.id
+            LEFT JOIN media m ON m.type = n.type AND m.id = n.id
+            WHERE names_fts MATCH ? AND n.type = ?
+            ORDER BY f.rank LIMIT ?
+        ''', (query, media_type, FUZZY_CANDIDATES)).fetchall()
+        
+        target = _trigrams(norm)
+        numbers = _DIGITS.findall(norm)
+        matches = []
+        for candidate, chinese_title, media_year in rows:
+            # "Part 2" 与 "Part 1"、"Rocky 2" 与 "Rocky 3" 相似度很高，但不是同一作品
+            if _DIGITS.findall(candidate) != numbers:
+                continue
+            grams = _trigrams(candidate)
+            if len(target & grams) / len(target | grams) >= FUZZY_THRESHOLD:
+                matches.append((chinese_title, media_year))
+        return matches
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引规模和查询统计"""
+        with self.lock:
+            counts = dict(self.conn.execute('SELECT type, COUNT(*) FROM chinese GROUP BY type').fetchall())
+            names = self.conn.execute('SELECT COUNT(*) FROM names').fetchone()[0]
+        lookups = self.hits + self.weak_hits + self.ambiguous + self.misses
+        return {
+            'db_path': self.db_path,
+            'size_bytes': os.path.getsize(self.db_path),
+            'movies': counts.get(MOVIE, 0),
+            'tv': counts.get(TV, 0),
+            'names': names,
+            'fuzzy': self.fuzzy,
+            'key_version': self.key_version,
+            'has_year': self.has_year,
+            'hits': self.hits,
+            'weak_hits': self.weak_hits,
+            'ambiguous': self.ambiguous,
+            'misses': self.misses,
+            'avg_lookup_us': self.lookup_seconds / lookups * 1e6 if lookups > 0 else 0.0,
+        }
+    
+    def close(self):
+        """关闭索引"""
+        with self.lock:
+            self.conn.close()
+
+
+class TitleIndexBuilder:
+    """标题索引构建器（写入临时文件，完成后替换目标文件）"""
+    
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        初始化构建器
+        
+        Args:
+            db_path: 索引输出路径
+        """
+        self.db_path = db_path
+        self.tmp_path = f"{db_path}.building"
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.execute('PRAGMA journal_mode=OFF')
+        self.conn.execute('PRAGMA synchronous=OFF')
+        self.conn.executescript('''
+            CREATE TABLE media (
+                type INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                original_title TEXT,
+                year INTEGER,
+                popularity REAL,
+                PRIMARY KEY (type, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE names (
+                norm TEXT NOT NULL,
+                type INTEGER NOT NULL,
+                id INTEGER NOT NULL
+            );
+            CREATE TABLE chinese (
+                type INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                PRIMARY KEY (type, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        self.conn.execute("INSERT INTO meta VALUES ('key_version', ?)", (str(KEY_VERSION),))
+        self.counts = {'media': 0, 'names': 0, 'chinese': 0, 'skipped': 0}
+    
+    def add_export(self, path: str, is_tv: bool = False) -> int:
+        """
+        导入 TMDB 每日 ID 导出文件
+        
+        Args:
+            path: movie_ids_*.json.gz 或 tv_series_ids_*.json.gz
+            is_tv: 是否为剧集导出
+        
+        Returns:
+            导入的作品数
+        """
+        media_type = TV if is_tv else MOVIE
+        title_key = 'original_name' if is_tv else 'original_title'
+        media_rows = []
+        name_rows = []
+        count = 0
+        for item in _open_lines(path):
+            media_id = item.get('id')
+            original = item.get(title_key) or item.get('original_title') or item.get('original_name')
+            if media_id is None or not original or item.get('adult'):
+                self.counts['skipped'] += 1
+                continue
+            year = _parse_year(item.get('release_date') or item.get('first_air_date') or item.get('year'))
+            media_rows.append((media_type, int(media_id), original, year, float(item.get('popularity') or 0.0)))
+            name_rows.append((canonical_title(original), media_type, int(media_id)))
+            # 原始标题本身是中文时直接作为中文标题
+            if _CJK.search(original):
+                self._add_chinese(media_type, int(media_id), original, _OTHER_PRIORITY)
+            count += 1
+            if len(media_rows) >= _BATCH_SIZE:
+                self._flush_export(media_rows, name_rows)
+        self._flush_export(media_rows, name_rows)
+        self.conn.commit()
+        self.counts['media'] += count
+        return count
+    
+    def _flush_export(self, media_rows: list, name_rows: list):
+        """批量写入作品和标题"""
+        if media_rows:
+            self.conn.executemany('INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?)', media_rows)
+            self.conn.executemany('INSERT INTO names VALUES (?, ?, ?)', name_rows)
+            self.counts['names'] += len(name_rows)
+            media_rows.clear()
+            name_rows.clear()
+    
+    def add_alternative_titles(self, path: str, is_tv: bool = False) -> int:
+        """
+        导入别名文件（中文别名成为中文标题，其余别名作为可查询的标题）
+        
+        Args:
+            path: JSON Lines 别名文件（可为 .gz）
+            is_tv: 是否为剧集别名
+        
+        Returns:
+            导入的别名数
+        """
+        media_type = TV if is_tv else MOVIE
+        name_rows = []
+        count = 0
+        for item in _open_lines(path):
+            media_id = item.get('id')
+            if media_id is None:
+                self.counts['skipped'] += 1
+                continue
+            titles = item.get('titles') or item.get('results')
+            if titles is None:
+                titles = [item]
+            for entry in titles:
+                title = entry.get('title') or entry.get('name')
+                if not title:
+                    continue
+                count += 1
+                if _CJK.search(title):
+                    region = (entry.get('iso_3166_1') or '').upper()
+                    self._add_chinese(media_type, int(media_id), title, REGION_PRIORITY.get(region, _OTHER_PRIORITY))
+                else:
+                    name_rows.append((canonical_title(title), media_type, int(media_id)))
+            if len(name_rows) >= _BATCH_SIZE:
+                self._flush_names(name_rows)
+        self._flush_names(name_rows)
+        self.conn.commit()
+        return count
+    
+    def _flush_names(self, name_rows: list):
+        """批量写入别名"""
+        if name_rows:
+            self.conn.executemany('INSERT INTO names VALUES (?, ?, ?)', name_rows)
+            self.counts['names'] += len(name_rows)
+            name_rows.clear()
+    
+    def _add_chinese(self, media_type: int, media_id: int, title: str, priority: int):
+        """写入中文标题（同一作品保留优先级最高的地区）"""
+        self.conn.execute('''
+            INSERT INTO chinese VALUES (?, ?, ?, ?)
+            ON CONFLICT (type, id) DO UPDATE SET title = excluded.title, priority = excluded.priority
+            WHERE excluded.priority < chinese.priority
+        ''', (media_type, media_id, title, priority))
+    
+    def finish(self, fuzzy: bool = True) -> Dict[str, int]:
+        """
+        完成构建：删除没有中文标题的作品和重复标题，建立索引并替换目标文件
+        
+        Args:
+            fuzzy: 是否建立三元组全文索引（SQLite 不支持 trigram 分词器时自动跳过）
+        
+        Returns:
+            索引规模统计
+        """
+        conn = self.conn
+        conn.executescript('''
+            DELETE FROM names WHERE NOT EXISTS (
+                SELECT 1 FROM chinese c WHERE c.type = names.type AND c.id = names.id
+            ) OR norm = '';
+            DELETE FROM names WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM names GROUP BY norm, type, id
+            );
+            DELETE FROM media WHERE NOT EXISTS (
+                SELECT 1 FROM chinese c WHERE c.type = media.type AND c.id = media.id
+            );
+            CREATE INDEX idx_names_norm ON names(norm, type);
+        ''')
+        if fuzzy:
+            try:
+                conn.executescript('''
+                    CREATE VIRTUAL TABLE names_fts USING fts5(
+                        norm, content='names', content_rowid='rowid', tokenize='trigram'
+                    );
+                    INSERT INTO names_fts(names_fts) VALUES ('rebuild');
+                ''')
+            except sqlite3.OperationalError as e:
+                print(f"⚠ 当前 SQLite 不支持三元组索引，跳过相似匹配: {e}")
+        conn.commit()
+        conn.execute('VACUUM')
+        
+        stats = {
+            'media': conn.execute('SELECT COUNT(*) FROM media').fetchone()[0],
+            'chinese': conn.execute('SELECT COUNT(*) FROM chinese').fetchone()[0],
+            'names': conn.execute('SELECT COUNT(*) FROM names').fetchone()[0],
+            'skipped': self.counts['skipped'],
+        }
+        conn.close()
+        os.replace(self.tmp_path, self.db_path)
+        return stats
+
+
+def build_index(
+    output: str = DEFAULT_INDEX_PATH,
+    movie_exports: Optional[List[str]] = None,
+    tv_exports: Optional[List[str]] = None,
+    movie_titles: Optional[List[str]] = None,
+    tv_titles: Optional[List[str]] = None,
+    fuzzy: bool = True
+) -> Dict[str, int]:
+    """
+    构建标题索引
+    
+    Args:
+        output: 索引输出路径
+        movie_exports: 电影 ID 导出文件
+        tv_exports: 剧集 ID 导出文件
+        movie_titles: 电影别名文件
+        tv_titles: 剧集别名文件
+        fuzzy: 是否建立三元组索引
+    
+    Returns:
+        索引规模统计
+    """
+    builder = TitleIndexBuilder(output)
+    for path in movie_exports or []:
+        print(f"导入电影导出: {path}")
+        print(f"  ✓ {builder.add_export(path, is_tv=False)} 部")
+    for path in tv_exports or []:
+        print(f"导入剧集导出: {path}")
+        print(f"  ✓ {builder.add_export(path, is_tv=True)} 部")
+    for path in movie_titles or []:
+        print(f"导入电影别名: {path}")
+        print(f"  ✓ {builder.add_alternative_titles(path, is_tv=False)} 条")
+    for path in tv_titles or []:
+        print(f"导入剧集别名: {path}")
+        print(f"  ✓ {builder.add_alternative_titles(path, is_tv=True)} 条")
+    print("建立索引...")
+    return builder.finish(fuzzy=fuzzy)
+
+
+# 全局实例
+_title_index = None
+_title_index_loaded = False
+
+
+def get_title_index() -> Optional[TitleIndex]:
+    """获取本地标题索引（索引文件不存在时返回 None）"""
+    global _title_index, _title_index_loaded
+    if not _title_index_loaded:
+        from core.config import get_config
+        
+        path = get_config().get('title_index_path', DEFAULT_INDEX_PATH) or DEFAULT_INDEX_PATH
+        if os.path.exists(path):
+            try:
+                _title_index = TitleIndex(path)
+                print(f"✓ 本地标题索引已加载: {path}")
+            except Exception as e:
+                print(f"⚠ 本地标题索引加载失败: {e}")
+        _title_index_loaded = True
+    return _title_index
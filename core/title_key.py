@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标题规范化键
+同一作品的不同写法（大小写、标点、& 与 and、罗马数字、冠词、残留的发布标签）
+规范化为同一个键；元数据缓存、别名表、本地标题索引、批量分组和单飞合并都使用这里的函数
+
+    "The.Lord.of.the.Rings" / "Lord of the Rings" / "the lord of the rings PROPER"
+        → "lord of the rings"
+    "Fast & Furious" / "Fast and Furious" → "fast and furious"
+    "Rocky II" / "Rocky 2" → "rocky 2"
+
+字符级处理用预先构建的转换表（str.translate）一次完成，词级处理用集合/字典查找；
+结果按标题缓存，同一批文件中的重复标题不重复计算。
+"""
+
+import string
+import unicodedata
+from functools import lru_cache
+from typing import Any
+
+
+# 键格式版本（规范化规则变化时递增；本地标题索引记录该版本，不一致时提示重建）
+KEY_VERSION = 3
+
+# 撇号：直接删除（Ocean's → oceans）
+_APOSTROPHES = "'’‘`´"
+
+# 视为分隔符的标点（ASCII 标点 + 常见全角/中文标点，NFKC 之后仍保留的部分）
+_SEPARATOR_CHARS = ''.join(
+    ch for ch in string.punctuation + '·・•—–‐‑‒―…“”„‟«»‹›《》〈〉【】〔〕「」『』、，。：；！？～'
+    if ch not in _APOSTROPHES and ch != '&'
+)
+
+# 字符转换表：撇号删除，& 展开为 and，其余标点和空白变为空格
+_TRANSLATE = str.maketrans({
+    **{ch: None for ch in _APOSTROPHES},
+    **{ch: ' ' for ch in _SEPARATOR_CHARS + string.whitespace},
+    '&': ' and ',
+})
+
+# 开头的冠词（后面还有其他词时去掉）
+_ARTICLES = frozenset(('the', 'a', 'an'))
+
+# 罗马数字（作为独立的词时转换为阿拉伯数字）
+# 不含单个字母 i / v / x：它们常是标题本身的一部分（"I Robot"、"Malcolm X"、"V"），转换后会与其他作品合并
+_ROMAN = {
+    'ii': '2', 'iii': '3', 'iv': '4', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9',
+    'xi': '11', 'xii': '12', 'xiii': '13', 'xiv': '14', 'xv': '15', 'xvi': '16',
+    'xvii': '17', 'xviii': '18', 'xix': '19', 'xx': '20',
+}
+
+# 结尾残留的发布标签（识别器未剥离时出现在标题末尾）
+# 不含 real / complete 这类常见的标题用词（"Too Real"、"The Complete"）
+_TRAILING_TAGS = frozenset((
+    'proper', 'repack', 'rerip', 'internal', 'limited', 'uncut', 'unrated',
+    'extended', 'remastered', 'remux', 'multi', 'dual', 'subbed', 'dubbed', 'retail',
+))
+
+# 标题缓存大小
+_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonical_title(title: str) -> str:
+    """
+    规范化标题
+    
+    Args:
+        title: 原始标题
+    
+    Returns:
+        规范化后的标题（小写，单个空格分隔）
+    """
+    if not title:
+        return ''
+    text = title if title.isascii() else unicodedata.normalize('NFKC', title)
+    words = text.casefold().translate(_TRANSLATE).split()
+    
+    # 结尾的发布标签（至少保留一个词）
+    while len(words) > 1 and words[-1] in _TRAILING_TAGS:
+        words.pop()
+    
+    # 开头的冠词（至少保留一个词）
+    if len(words) > 1 and words[0] in _ARTICLES:
+        del words[0]
+    
+    return ' '.join([_ROMAN.get(word, word) for word in words])
+
+
+def canonical_key(title: str, year: Any = None, is_tv: bool = False) -> str:
+    """
+    生成缓存/分组键：规范化标题 + 年份 + 类型
+    
+    例：("The.Matrix", 1999, False) → "matrix|1999|movie"
+    """
+    return f"{canonical_title(title or '')}|{year or ''}|{'tv' if is_tv else 'movie'}"
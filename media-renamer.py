@@ -28,6 +28,13 @@ def main():
   
   # 运行测试
   python media-renamer.py test
+  
+  # 从 TMDB 每日导出构建本地标题索引
+  python media-renamer.py index build --movies movie_ids_05_15_2024.json.gz --movie-titles movie_titles.jsonl
+  
+  # 导出/导入元数据缓存快照（新节点预热）
+  python media-renamer.py cache export cache_snapshot.jsonl.gz
+  python media-renamer.py cache import cache_snapshot.jsonl.gz
         '''
     )
     
@@ -59,6 +66,24 @@ def main():
     # version 命令
     version_parser = subparsers.add_parser('version', help='显示版本信息')
     
+    # index 命令
+    index_parser = subparsers.add_parser('index', help='本地标题索引（离线中文标题）')
+    index_parser.add_argument('action', choices=['build', 'stats', 'query'], help='build 构建 / stats 统计 / query 查询')
+    index_parser.add_argument('title', nargs='?', help='要查询的标题（query）')
+    index_parser.add_argument('--output', default=None, help='索引文件路径（默认 data/title_index.db）')
+    index_parser.add_argument('--movies', nargs='+', default=[], help='TMDB 电影 ID 导出文件（movie_ids_*.json.gz）')
+    index_parser.add_argument('--tv', nargs='+', default=[], help='TMDB 剧集 ID 导出文件（tv_series_ids_*.json.gz）')
+    index_parser.add_argument('--movie-titles', nargs='+', default=[], help='电影别名文件（JSON Lines）')
+    index_parser.add_argument('--tv-titles', nargs='+', default=[], help='剧集别名文件（JSON Lines）')
+    index_parser.add_argument('--no-fuzzy', action='store_true', help='不建立三元组相似匹配索引')
+    index_parser.add_argument('--is-tv', action='store_true', help='按剧集查询（query）')
+    index_parser.add_argument('--year', type=int, default=None, help='年份（query）')
+    
+    # cache 命令
+    cache_parser = subparsers.add_parser('cache', help='元数据缓存（快照导出/导入、统计）')
+    cache_parser.add_argument('action', choices=['export', 'import', 'stats'], help='export 导出 / import 导入 / stats 统计')
+    cache_parser.add_argument('path', nargs='?', help='快照文件路径（默认 data/cache_snapshot.jsonl.gz）')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -76,6 +101,10 @@ def main():
         run_tests(args)
     elif args.command == 'version':
         show_version()
+    elif args.command == 'index':
+        manage_index(args)
+    elif args.command == 'cache':
+        manage_cache(args)
 
 
 def process_file(args):
@@ -91,6 +120,7 @@ def process_file(args):
         [args.file],
         template_name=args.template
     )
+    processor.close()
     
     if result['results']:
         r = result['results'][0]
@@ -158,6 +188,7 @@ def batch_process(args):
             progress_callback=progress_callback,
             template_name=args.template
         )
+    processor.close()
     
     # 显示结果
     print("\n" + "=" * 60)
@@ -188,6 +219,95 @@ def manage_config(args):
         print("请使用 --show 或 --set 参数")
 
 
+def manage_index(args):
+    """本地标题索引管理"""
+    import time
+    from core.title_index import DEFAULT_INDEX_PATH, TitleIndex, build_index
+    
+    path = args.output or DEFAULT_INDEX_PATH
+    
+    if args.action == 'build':
+        if not (args.movies or args.tv or args.movie_titles or args.tv_titles):
+            print("✗ 请至少指定一个导出文件或别名文件（--movies / --tv / --movie-titles / --tv-titles）")
+            return
+        
+        started = time.time()
+        stats = build_index(
+            output=path,
+            movie_exports=args.movies,
+            tv_exports=args.tv,
+            movie_titles=args.movie_titles,
+            tv_titles=args.tv_titles,
+            fuzzy=not args.no_fuzzy
+        )
+        print(f"\n✓ 索引已写入: {path} ({time.time() - started:.1f}秒)")
+        print(f"  作品: {stats['chinese']}  标题: {stats['names']}  跳过: {stats['skipped']}")
+        return
+    
+    try:
+        index = TitleIndex(path)
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+        return
+    
+    if args.action == 'stats':
+        for key, value in index.get_stats().items():
+            print(f"  {key}: {value}")
+    elif args.action == 'query':
+        if not args.title:
+            print("✗ 请指定要查询的标题")
+            return
+        started = time.perf_counter()
+        match = index.match(args.title, args.year, is_tv=args.is_tv)
+        elapsed = (time.perf_counter() - started) * 1e6
+        if match and match[1]:
+            print(f"✓ {args.title} → {match[0]} ({elapsed:.0f}µs)")
+        elif match:
+            print(f"⚠ {args.title} → {match[0]}（相似匹配或年份未核对，仅离线回退使用）({elapsed:.0f}µs)")
+        else:
+            print(f"✗ 未找到: {args.title} ({elapsed:.0f}µs)")
+
+
+def manage_cache(args):
+    """元数据缓存管理"""
+    import os
+    import time
+    from core.cache_snapshot import export_snapshot, get_snapshot_path, import_snapshot
+    from core.chinese_title_resolver import get_integrated_recognizer
+    from core.metadata_cache import get_metadata_cache
+    
+    path = args.path or get_snapshot_path()
+    cache = get_metadata_cache()
+    
+    if args.action == 'stats':
+        for key, value in cache.get_stats().items():
+            print(f"  {key}: {value}")
+        return
+    
+    # 识别结果缓存只在内存中：导出时带上 Web 服务退出时保存的快照中的识别结果
+    recognizer = get_integrated_recognizer()
+    started = time.time()
+    if args.action == 'export':
+        saved = get_snapshot_path()
+        if os.path.exists(saved) and os.path.abspath(saved) != os.path.abspath(path):
+            try:
+                import_snapshot(saved, cache, recognizer, kinds=('results',))
+            except (OSError, ValueError) as e:
+                print(f"⚠ 读取已保存快照中的识别结果失败: {e}")
+        counts = export_snapshot(path, cache, recognizer)
+        print(f"✓ 快照已导出: {path} ({time.time() - started:.1f}秒)")
+    else:
+        try:
+            counts = import_snapshot(path, cache, recognizer)
+        except (OSError, ValueError) as e:
+            print(f"✗ 导入失败: {e}")
+            return
+        print(f"✓ 快照已导入: {path} ({time.time() - started:.1f}秒)")
+        if counts['results']:
+            print(f"ℹ 识别结果只保存在内存中，Web 服务启动时从 {get_snapshot_path()} 加载")
+    print(f"  标题: {counts['entries']}  作品: {counts['media']}  别名: {counts['aliases']}  识别结果: {counts['results']}")
+
+
 def run_tests(args):
     """运行测试"""
     import subprocess
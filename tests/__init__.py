@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+单元测试（不访问外部网络）
+
+用法（在仓库根目录；pytest.ini 只收集 tests/，不进入 reference/）：
+    python -m pytest
+    python -m unittest discover -s tests -t .
+"""
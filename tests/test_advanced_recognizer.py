@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+高级识别器测试
+标题中的词与内置制作组名、版本标签相同时不能被当作标签移除
+"""
+
+import unittest
+
+from core.advanced_recognizer import AdvancedRecognizer
+from core.recognizer_tables import fold_lower, required_literals
+
+
+class ReleaseGroupPositionTest(unittest.TestCase):
+    """制作组自动机只接受括号内、末尾或年份/技术标签之后的组名"""
+    
+    def setUp(self):
+        self.recognizer = AdvancedRecognizer(cache_size=0)
+    
+    def test_hyphenated_titles_keep_group_words(self):
+        info = self.recognizer.recognize('The.Dead-Zone.1983.1080p.BluRay.x264-FRDS.mkv')
+        self.assertEqual(info.title, 'The Dead-Zone')
+        self.assertEqual(info.release_group, 'FRDS')
+        
+        info = self.recognizer.recognize('Stan-Lee.2023.1080p.WEB-DL.mkv')
+        self.assertEqual(info.title, 'Stan-Lee')
+    
+    def test_trailing_and_bracketed_groups(self):
+        info = self.recognizer.recognize('Movie.2020.1080p.WEB-DL-HHWEB.mkv')
+        self.assertEqual((info.title, info.release_group), ('Movie', 'HHWEB'))
+        
+        info = self.recognizer.recognize('Some.Movie.2019.1080p.BluRay.x264-[FRDS].mkv')
+        self.assertEqual((info.title, info.release_group), ('Some Movie', 'FRDS'))
+        
+        info = self.recognizer.recognize('Movie-FRDS.mkv')
+        self.assertEqual((info.title, info.release_group), ('Movie', 'FRDS'))
+    
+    def test_matched_groups_stripped_only_when_enabled(self):
+        filename = 'Show.S01E02.1080p.WEB-DL.H264-HHWEB@ADWeb.mkv'
+        info = self.recognizer.recognize(filename)
+        self.assertEqual(info.release_group, 'HHWEB@ADWeb')
+        self.assertIn('HHWEB', info.title)
+        
+        stripping = AdvancedRecognizer(cache_size=0, strip_release_groups=True)
+        info = stripping.recognize(filename)
+        self.assertEqual(info.release_group, 'HHWEB@ADWeb')
+        self.assertNotIn('HHWEB', info.title)
+        self.assertEqual(stripping.recognize('The.Dead-Zone.1983.1080p.BluRay.x264-FRDS.mkv').title, 'The Dead-Zone')
+
+
+
+class EditionPositionTest(unittest.TestCase):
+    """版本标签只在年份/季集/技术标签之后识别"""
+    
+    def setUp(self):
+        self.recognizer = AdvancedRecognizer(cache_size=0)
+    
+    def test_titles_containing_edition_words(self):
+        info = self.recognizer.recognize('The.Final.Cut.2004.1080p.BluRay.x264.mkv')
+        self.assertEqual((info.title, info.edition), ('The Final Cut', None))
+        
+        info = self.recognizer.recognize('The.Directors.Cut.2019.1080p.mkv')
+        self.assertEqual((info.title, info.edition), ('The Directors Cut', None))
+        
+        info = self.recognizer.recognize('The.Extended.Family.mkv')
+        self.assertEqual((info.title, info.edition), ('The Extended Family', None))
+    
+    def test_editions_after_year_or_season(self):
+        info = self.recognizer.recognize('Blade.Runner.1982.Final.Cut.1080p.BluRay.mkv')
+        self.assertEqual((info.title, info.edition), ('Blade Runner', 'Final Cut'))
+        
+        info = self.recognizer.recognize('Show.S01E01.Extended.1080p.NF.WEB-DL.mkv')
+        self.assertEqual((info.title, info.edition, info.platform), ('Show', 'Extended', 'Netflix'))
+
+
+
+class PatternPrefilterTest(unittest.TestCase):
+    """模式预检查的字面量推导，以及运行时修改 patterns 直接生效"""
+    
+    def test_required_literals(self):
+        self.assertEqual(required_literals(r'(H\.?264|[Xx]264|AVC)'), ('264', 'avc', 'x264'))
+        self.assertEqual(required_literals(r'(BluRay|Blu-Ray|BDMV|BD)'), ('bd', 'bdmv', 'blu-ray', 'bluray'))
+        self.assertEqual(required_literals(r'第(\d{1,2})[季期]'), ('第',))
+        self.assertIsNone(required_literals(r'[\s._-](\d{2,3})[\s._-]'))
+        self.assertIsNone(required_literals(r'(?:^|[^\d])(\d{4})'))
+    
+    def test_case_fold_hazards(self):
+        # 开尔文符号在 IGNORECASE 下匹配 k，折叠小写文本中也是 k
+        self.assertIn('4k', fold_lower('Movie 4\u212a'))
+        info = AdvancedRecognizer(cache_size=0).recognize('Movie.2019.4\u212a.mkv')
+        self.assertEqual(info.resolution, '4\u212a')
+    
+    def test_pattern_edits_apply_without_recompiling(self):
+        recognizer = AdvancedRecognizer(cache_size=0)
+        self.assertIsNone(recognizer.recognize('Movie.2019.1080p.NVENC.mkv').video_codec)
+        recognizer.patterns['video_codec'].append(r'(NVENC)')
+        self.assertEqual(recognizer.recognize('Movie.2019.1080p.NVENC.mkv').video_codec, 'NVENC')
+
+
+if __name__ == '__main__':
+    unittest.main()
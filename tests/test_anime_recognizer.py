@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动漫文件名识别测试
+字幕组命名的标题、集号、季号，以及 " - 年份" 不被当作集号
+"""
+
+import unittest
+
+from core.advanced_recognizer import AdvancedRecognizer
+from core.anime_recognizer import looks_like_anime, parse_anime
+
+
+class ParseAnimeTest(unittest.TestCase):
+    """parse_anime 的括号结构解析"""
+    
+    def test_dash_episode(self):
+        info = parse_anime('[LoliHouse] Sousou no Frieren - 12 [WebRip 1080p HEVC-10bit AAC].mkv')
+        self.assertEqual(info['title'], 'Sousou no Frieren')
+        self.assertEqual(info['episode'], 12)
+        self.assertEqual(info['resolution'], '1080p')
+        self.assertEqual(info['release_group'], 'LoliHouse')
+    
+    def test_four_digit_episode(self):
+        info = parse_anime('[Sakurato] One Piece - 1071 [1080p].mkv')
+        self.assertEqual((info['title'], info['episode']), ('One Piece', 1071))
+    
+    def test_bracket_episode_and_year(self):
+        info = parse_anime('[Nekomoe kissaten] Title [2023][05][1080p].mp4')
+        self.assertEqual((info['title'], info['year'], info['episode']), ('Title', '2023', 5))
+    
+    def test_dash_year_is_not_episode(self):
+        filename = '[YTS.MX] Oppenheimer - 2023 [1080p].mp4'
+        self.assertTrue(looks_like_anime(filename))
+        self.assertIsNone(parse_anime(filename))
+        self.assertIsNone(parse_anime('[Group] Movie [2019][1080p].mkv'))
+    
+    def test_non_fansub_names(self):
+        self.assertFalse(looks_like_anime('The.Matrix.1999.1080p.BluRay.mkv'))
+
+
+class AnimeRecognitionTest(unittest.TestCase):
+    """识别器对字幕组命名与 " - 年份" 电影的处理"""
+    
+    def setUp(self):
+        self.recognizer = AdvancedRecognizer(cache_size=0)
+    
+    def test_dash_year_movie_stays_movie(self):
+        info = self.recognizer.recognize('[YTS.MX] Oppenheimer - 2023 [1080p].mp4')
+        self.assertFalse(info.is_tv)
+        self.assertIsNone(info.episode)
+        self.assertEqual(info.year, '2023')
+        self.assertIn('Oppenheimer', info.title)
+    
+    def test_fansub_episode(self):
+        info = self.recognizer.recognize('[LoliHouse] Sousou no Frieren - 12 [WebRip 1080p HEVC-10bit AAC].mkv')
+        self.assertTrue(info.is_tv)
+        self.assertEqual((info.title, info.episode), ('Sousou no Frieren', 12))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步元数据解析引擎测试
+豆瓣/TMDB 由本地 HTTP 桩服务器代替（可配置延迟和失败），提供方查询经真实的 HTTP 请求完成；
+ProviderHttpClient 本身（连接池、重试、TMDB 代理）同样对桩服务器测试
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+import types
+import unittest
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import requests
+from requests.utils import select_proxy
+
+from core.async_resolver import AsyncTitleResolver
+from core.chinese_title_resolver import ChineseTitleResolver
+from core.http_client import ProviderHttpClient
+from core.metadata_cache import MISS, MetadataCache
+from core.rate_limiter import RateLimiter
+
+
+# 桩服务器的标题表：英文标题 -> (中文标题, 年份, ID)
+TITLES = {
+    'The Matrix': ('黑客帝国', '1999', 603),
+    'Inception': ('盗梦空间', '2010', 27205),
+    'Interstellar': ('星际穿越', '2014', 157336),
+    'Heat': ('盗火线', '1995', 949),
+    'Alien': ('异形', '1979', 348),
+    'Up': ('飞屋环游记', '2009', 14160),
+    'Cars': ('赛车总动员', '2006', 920),
+    'Coco': ('寻梦环游记', '2017', 354912),
+}
+
+
+class StubProviders:
+    """豆瓣/TMDB 桩服务器（每个提供方单独设置延迟和失败的标题，记录请求数、最大并发数和连接）"""
+    
+    def __init__(self):
+        self.delay = {'douban': 0.0, 'tmdb': 0.0}
+        self.failing = set()
+        # (提供方, 标题) -> 依次返回的错误状态，用完后正常响应
+        self.errors: Dict[Any, list] = {}
+        self.requests = {'douban': [], 'tmdb': []}
+        self.hosts = []
+        self.ports = []
+        self.active = {'douban': 0, 'tmdb': 0}
+        self.max_active = {'douban': 0, 'tmdb': 0}
+        self.lock = threading.Lock()
+        
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # 支持 keep-alive（每个响应都带 Content-Length）
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                stub._handle(self)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def _handle(self, request: BaseHTTPRequestHandler):
+        parts = urlsplit(request.path)
+        provider = 'douban' if parts.path.startswith('/j/') else 'tmdb'
+        query = parse_qs(parts.query)
+        title = (query.get('q') or query.get('query'))[0]
+        with self.lock:
+            self.requests[provider].append(title)
+            self.hosts.append(request.headers.get('Host'))
+            self.ports.append(request.client_address[1])
+            errors = self.errors.get((provider, title))
+            status = errors.pop(0) if errors else None
+            self.active[provider] += 1
+            self.max_active[provider] = max(self.max_active[provider], self.active[provider])
+        try:
+            time.sleep(self.delay[provider])
+            if (provider, title) in self.failing:
+                status = 500
+            if status is not None:
+                request.send_response(status)
+                request.send_header('Content-Length', '0')
+                request.end_headers()
+                return
+            body = json.dumps(self._payload(provider, title), ensure_ascii=False).encode('utf-8')
+            request.send_response(200)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        finally:
+            with self.lock:
+                self.active[provider] -= 1
+    
+    def _payload(self, provider: str, query: str) -> Any:
+        # 豆瓣查询为 "标题 年份"
+        title = next((name for name in TITLES if query == name or query.startswith(f"{name} ")), None)
+        if provider == 'douban':
+            if title is None:
+                return []
+            chinese_title, year, media_id = TITLES[title]
+            return [{'id': str(media_id), 'title': chinese_title, 'sub_title': title, 'year': year}]
+        if title is None:
+            return {'results': []}
+        chinese_title, year, media_id = TITLES[title]
+        return {'results': [{
+            'id': media_id, 'title': chinese_title, 'original_title': title, 'release_date': f"{year}-01-01",
+        }]}
+    
+    def count(self, provider: str) -> int:
+        with self.lock:
+            return len(self.requests[provider])
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubHttpClient:
+    """把提供方地址改写到桩服务器的 HTTP 客户端（接口与 ProviderHttpClient.get_json 相同）"""
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+    
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                 timeout=None) -> Any:
+        target = f"{self.base_url}{urlsplit(url).path}?{urlencode(params or {})}"
+        request = urllib.request.Request(target, headers=headers or {})
+        with urllib.request.urlopen(request, timeout=timeout or 10) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+
+class ProviderHttpClientTest(unittest.TestCase):
+    """真实的 ProviderHttpClient 对桩服务器的连接复用、重试和 TMDB 代理"""
+    
+    def setUp(self):
+        self.stub = StubProviders()
+        self.addCleanup(self.stub.close)
+    
+    def make_client(self, **options) -> ProviderHttpClient:
+        options.setdefault('retry_delay', 0.01)
+        client = ProviderHttpClient(**options)
+        self.addCleanup(client.close)
+        return client
+    
+    def test_session_reuses_connection(self):
+        client = self.make_client()
+        
+        for title in ('Heat', 'Up'):
+            data = client.get_json(f"{self.stub.base_url}/3/search/movie", params={'query': title})
+            self.assertEqual(data['results'][0]['original_title'], title)
+        
+        self.assertEqual(len(set(self.stub.ports)), 1)
+        self.assertEqual(client.get_stats()['127.0.0.1']['requests'], 2)
+    
+    def test_retries_transient_errors(self):
+        self.stub.errors[('tmdb', 'Heat')] = [503, 429]
+        client = self.make_client(retries=2)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = client.get_json(f"{self.stub.base_url}/3/search/movie", params={'query': 'Heat'})
+        
+        self.assertEqual(data['results'][0]['title'], '盗火线')
+        self.assertEqual(self.stub.count('tmdb'), 3)
+        self.assertEqual(client.get_stats()['127.0.0.1']['errors'], 2)
+    
+    def test_gives_up_after_retries_and_skips_client_errors(self):
+        self.stub.failing.add(('tmdb', 'Heat'))
+        self.stub.errors[('tmdb', 'Up')] = [404]
+        client = self.make_client(retries=1)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(requests.HTTPError):
+                client.get_json(f"{self.stub.base_url}/3/search/movie", params={'query': 'Heat'})
+            with self.assertRaises(requests.HTTPError) as raised:
+                client.get_json(f"{self.stub.base_url}/3/search/movie", params={'query': 'Up'})
+        
+        self.assertEqual(raised.exception.response.status_code, 404)
+        self.assertEqual(self.stub.requests['tmdb'], ['Heat', 'Heat', 'Up'])
+    
+    def test_tmdb_proxy_applies_to_tmdb_hosts_only(self):
+        client = self.make_client(tmdb_proxy=self.stub.base_url)
+        
+        # 桩服务器作为 HTTP 代理收到 TMDB 请求
+        data = client.get_json('http://api.themoviedb.org/3/search/movie', params={'query': 'Coco'})
+        
+        self.assertEqual(data['results'][0]['title'], '寻梦环游记')
+        self.assertEqual(self.stub.hosts, ['api.themoviedb.org'])
+        self.assertEqual(select_proxy('https://api.themoviedb.org/3/search/tv', client.session.proxies),
+                         self.stub.base_url)
+        self.assertIsNone(select_proxy('https://movie.douban.com/j/subject_suggest', client.session.proxies))
+
+
+class AsyncResolverTest(unittest.TestCase):
+    """AsyncTitleResolver 对桩服务器的并发、限速、对冲、单飞和缓存行为"""
+    
+    def setUp(self):
+        self.stub = StubProviders()
+        client = StubHttpClient(self.stub.base_url)
+        http_module = types.ModuleType('core.http_client')
+        http_module.get_http_client = lambda: client
+        patcher = mock.patch.dict(sys.modules, {'core.http_client': http_module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.stub.close)
+    
+    def make_resolver(self, douban: bool = True, tmdb: bool = True, **options) -> ChineseTitleResolver:
+        resolver = ChineseTitleResolver(
+            tmdb_api_key='test-key' if tmdb else None,
+            douban_cookie='bid=test' if douban else None,
+            cache=MetadataCache(':memory:'),
+            **options
+        )
+        for breaker in resolver.breakers.values():
+            breaker.reset()
+            self.addCleanup(breaker.reset)
+        return resolver
+    
+    def make_async(self, resolver: ChineseTitleResolver, **options) -> AsyncTitleResolver:
+        async_resolver = AsyncTitleResolver(resolver, **options)
+        self.addCleanup(async_resolver.close)
+        return async_resolver
+    
+    def test_resolve_many_queries_each_title_once(self):
+        resolver = self.make_resolver(hedge=False)
+        async_resolver = self.make_async(resolver)
+        queries = [('The Matrix', 1999, False), ('Inception', 2010, False), ('The.Matrix', 1999, False),
+                   ('Unknown Film', None, False)]
+        
+        titles = asyncio.run(async_resolver.resolve_many(queries))
+        
+        self.assertEqual(titles, ['黑客帝国', '盗梦空间', '黑客帝国', None])
+        self.assertEqual(self.stub.count('douban'), 3)
+        # 豆瓣没有结果的标题再查 TMDB
+        self.assertEqual(self.stub.requests['tmdb'], ['Unknown Film'])
+        self.assertEqual(resolver.query_count, 3)
+        
+        # 正向和负向结果都已缓存，再次解析不访问网络
+        titles = asyncio.run(async_resolver.resolve_many(queries))
+        self.assertEqual(titles, ['黑客帝国', '盗梦空间', '黑客帝国', None])
+        self.assertEqual(self.stub.count('douban') + self.stub.count('tmdb'), 4)
+        self.assertIsNone(resolver.cache.get('Unknown Film', None, False))
+    
+    def test_concurrency_limit_per_provider(self):
+        self.stub.delay['douban'] = 0.1
+        resolver = self.make_resolver(tmdb=False, hedge=False)
+        async_resolver = self.make_async(resolver, concurrency={'douban': 2})
+        
+        titles = asyncio.run(async_resolver.resolve_many([(title, None, False) for title in TITLES]))
+        
+        self.assertEqual(titles, [chinese_title for chinese_title, _, _ in TITLES.values()])
+        self.assertEqual(self.stub.max_active['douban'], 2)
+    
+    def test_rate_limiter_throttles_requests(self):
+        # 每秒 10 个请求，初始配额 4 个：8 个标题至少等待 0.4 秒
+        limiter = RateLimiter(max_requests=4, time_window=0.4)
+        resolver = self.make_resolver(tmdb=False, hedge=False)
+        async_resolver = self.make_async(resolver, concurrency={'douban': 8}, rate_limiters={'douban': limiter})
+        
+        started = time.perf_counter()
+        titles = asyncio.run(async_resolver.resolve_many([(title, None, False) for title in TITLES]))
+        
+        self.assertGreaterEqual(time.perf_counter() - started, 0.35)
+        self.assertEqual(self.stub.count('douban'), 8)
+        self.assertNotIn(None, titles)
+    
+    def test_rate_limiter_sleeps_until_slot(self):
+        # 滑动窗口 0.5 秒 2 个：第三个请求等待约 0.5 秒，期间只检查一次配额，不按固定间隔轮询
+        limiter = RateLimiter(algorithm='sliding_window', max_requests=2, time_window=0.5)
+        self.assertTrue(limiter.allow() and limiter.allow())
+        allow = mock.Mock(wraps=limiter.allow)
+        limiter.allow = allow
+        async_resolver = self.make_async(self.make_resolver(), rate_limiters={'douban': limiter})
+        
+        started = time.perf_counter()
+        asyncio.run(async_resolver._acquire_rate('douban'))
+        
+        self.assertGreaterEqual(time.perf_counter() - started, 0.45)
+        self.assertLessEqual(allow.call_count, 3)
+    
+    def test_hedged_query_uses_faster_provider(self):
+        self.stub.delay['douban'] = 1.0
+        resolver = self.make_resolver(hedge=True, hedge_delay=0.05)
+        async_resolver = self.make_async(resolver)
+        
+        started = time.perf_counter()
+        title = asyncio.run(async_resolver.resolve('Heat', 1995, False))
+        
+        self.assertEqual(title, '盗火线')
+        self.assertLess(time.perf_counter() - started, 0.9)
+        self.assertEqual(resolver.hedged_queries, 1)
+        self.assertEqual(resolver.hedge_wins, 1)
+        # TMDB 的结果按作品 ID 写入元数据缓存，原始标题登记为别名
+        self.assertEqual(resolver.cache.find_media('Heat', None, False)['media_id'], '949')
+    
+    def test_failure_is_not_cached(self):
+        self.stub.failing.add(('douban', 'Alien'))
+        resolver = self.make_resolver(tmdb=False, hedge=False)
+        async_resolver = self.make_async(resolver)
+        
+        title = asyncio.run(async_resolver.resolve('Alien', None, False))
+        
+        self.assertIsNone(title)
+        self.assertEqual(resolver.query_failures, 1)
+        self.assertIs(resolver.cache.get('Alien', None, False), MISS)
+        self.assertEqual(resolver.breakers['douban'].get_stats()['window_failures'], 1)
+    
+    def test_single_flight_shared_with_sync_resolver(self):
+        self.stub.delay['douban'] = 0.3
+        resolver = self.make_resolver(tmdb=False, hedge=False)
+        async_resolver = self.make_async(resolver)
+        results = []
+        
+        async def run():
+            task = asyncio.ensure_future(async_resolver.resolve('Coco', None, False))
+            await asyncio.sleep(0.1)
+            # 异步查询进行中：同步解析器的同一标题等待共享结果
+            thread = threading.Thread(target=lambda: results.append(resolver.resolve('Coco', None, False)))
+            thread.start()
+            results.append(await task)
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        
+        asyncio.run(run())
+        
+        self.assertEqual(results, ['寻梦环游记', '寻梦环游记'])
+        self.assertEqual(self.stub.count('douban'), 1)
+        self.assertEqual(resolver.single_flight.coalesced, 1)
+    
+    def test_cache_calls_run_off_event_loop(self):
+        resolver = self.make_resolver(hedge=False)
+        async_resolver = self.make_async(resolver)
+        threads = []
+        for name in ('get', 'put'):
+            method = getattr(resolver.cache, name)
+            patcher = mock.patch.object(
+                resolver.cache, name,
+                side_effect=lambda *args, method=method: (threads.append(threading.get_ident()), method(*args))[1]
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        titles = asyncio.run(async_resolver.resolve_many([('Up', None, False), ('Up', None, False)]))
+        
+        self.assertEqual(titles, ['飞屋环游记', '飞屋环游记'])
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
+    
+    def test_close_shuts_down_owned_executor_only(self):
+        resolver = self.make_resolver(hedge=False)
+        owned = AsyncTitleResolver(resolver)
+        owned.close()
+        self.assertTrue(owned.executor._shutdown)
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        shared = AsyncTitleResolver(resolver, executor=executor)
+        shared.close()
+        self.assertFalse(executor._shutdown)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别器基准回归门禁测试
+"""
+
+import contextlib
+import copy
+import io
+import unittest
+
+from benchmarks.recognizer.run import find_regressions
+
+
+def make_report(p50: float, exact: float, count: int = 20000) -> dict:
+    return {
+        'meta': {'count': count, 'seed': 42},
+        'cases': {'advanced': {'latency_us': {'p50': p50}, 'accuracy': {'exact': exact}}},
+    }
+
+
+class BenchmarkGateTest(unittest.TestCase):
+    """p50 延迟容差和准确率下降检查"""
+    
+    def setUp(self):
+        self.baseline = make_report(100.0, 0.79)
+    
+    def test_within_tolerance_passes(self):
+        self.assertEqual(find_regressions(make_report(114.0, 0.79), self.baseline, 0.15), [])
+        self.assertEqual(find_regressions(make_report(60.0, 0.80), self.baseline, 0.15), [])
+    
+    def test_slower_p50_fails(self):
+        regressions = find_regressions(make_report(116.0, 0.79), self.baseline, 0.15)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('p50', regressions[0])
+    
+    def test_accuracy_drop_fails_only_on_same_corpus(self):
+        regressions = find_regressions(make_report(100.0, 0.78), self.baseline)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('完全一致率', regressions[0])
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(find_regressions(make_report(100.0, 0.78, count=5000), self.baseline), [])
+    
+    def test_missing_case_is_skipped(self):
+        baseline = copy.deepcopy(self.baseline)
+        del baseline['cases']['advanced']
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(find_regressions(make_report(500.0, 0.0), baseline), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存快照测试（识别结果的有效期）
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+import types
+import unittest
+
+from core.cache_snapshot import SNAPSHOT_FORMAT, export_snapshot, import_snapshot
+from core.lru_cache import TimedLRUCache
+from core.metadata_cache import MetadataCache
+from core.recognition_result import RecognitionResult
+from core.title_key import KEY_VERSION
+
+
+DAY = 86400
+
+
+def make_recognizer() -> types.SimpleNamespace:
+    """只带识别结果缓存的识别器（快照只读写 result_cache）"""
+    return types.SimpleNamespace(result_cache=TimedLRUCache(100))
+
+
+class SnapshotResultTtlTest(unittest.TestCase):
+    """识别结果按写入时间过期，导入后保留原来的时间"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'snapshot.jsonl.gz')
+        self.cache = MetadataCache(':memory:', positive_ttl=30 * DAY)
+        self.addCleanup(self.cache.close)
+    
+    def test_expired_results_are_skipped(self):
+        source = make_recognizer()
+        fresh = time.time() - DAY
+        source.result_cache.put(('Heat.1995.mkv', True), RecognitionResult('Heat.1995.mkv', title='盗火线'), fresh)
+        source.result_cache.put(('Up.2009.mkv', True), RecognitionResult('Up.2009.mkv', title='飞屋环游记'),
+                                time.time() - 31 * DAY)
+        export_snapshot(self.path, self.cache, source)
+        
+        target = make_recognizer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = import_snapshot(self.path, self.cache, target)
+        
+        self.assertEqual(counts['results'], 1)
+        [(key, info, created_at)] = target.result_cache.timed_items()
+        self.assertEqual(key, ('Heat.1995.mkv', True))
+        self.assertEqual(info['title'], '盗火线')
+        self.assertEqual(created_at, fresh)
+        
+        # 有效期可以单独指定
+        target = make_recognizer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = import_snapshot(self.path, self.cache, target, result_ttl=60 * DAY)
+        self.assertEqual(counts['results'], 2)
+    
+    def test_version_2_results_use_snapshot_time(self):
+        record = ['results', 'Heat.1995.mkv', True, RecognitionResult('Heat.1995.mkv', title='盗火线').to_dict()]
+        for age, expected in ((DAY, 1), (31 * DAY, 0)):
+            with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+                header = {'format': SNAPSHOT_FORMAT, 'version': 2, 'key_version': KEY_VERSION,
+                          'created_at': time.time() - age}
+                f.write(json.dumps(header) + '\n')
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            
+            target = make_recognizer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                counts = import_snapshot(self.path, self.cache, target)
+            self.assertEqual(counts['results'], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨节点共享元数据缓存测试
+Redis 由进程内的替身代替（支持过期时间、SCAN 和模拟连接失败），两个节点各自使用内存 SQLite
+"""
+
+import contextlib
+import fnmatch
+import io
+import time
+import unittest
+from typing import Any, Dict, Optional, Tuple
+from unittest import mock
+
+from core.metadata_cache import MISS, MetadataCache
+from core.shared_cache import SCHEMA_VERSION, SharedMetadataCache, _dumps, _loads
+from core.title_key import canonical_key
+
+
+class FakeRedis:
+    """进程内 Redis 替身（get / set ex / scan_iter / delete；down 为 True 时所有调用抛出 ConnectionError）"""
+    
+    def __init__(self):
+        self.data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self.calls = 0
+        self.down = False
+    
+    def _check(self):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('Connection refused')
+    
+    def get(self, key: str) -> Optional[bytes]:
+        self._check()
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+    
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self._check()
+        self.data[key] = (value, time.time() + ex if ex else None)
+        return True
+    
+    def ttl(self, key: str) -> float:
+        return self.data[key][1] - time.time()
+    
+    def scan_iter(self, match: str = '*'):
+        self._check()
+        return iter([key for key in list(self.data) if fnmatch.fnmatchcase(key, match)])
+    
+    def delete(self, *keys: str) -> int:
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+class SharedCacheTest(unittest.TestCase):
+    """LRU → SQLite → Redis 的读穿透、写回、Redis 不可用时的退化和键命名空间"""
+    
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.node_a = self.make_node()
+        self.node_b = self.make_node()
+    
+    def make_node(self, namespace: str = 'test') -> SharedMetadataCache:
+        local = MetadataCache(':memory:', positive_ttl=3600, negative_ttl=60)
+        node = SharedMetadataCache(local, self.redis, namespace=namespace, lru_size=100)
+        self.addCleanup(node.close)
+        return node
+    
+    def title_key(self, title: str, year: Any = None, is_tv: bool = False, namespace: str = 'test') -> str:
+        return f"{namespace}:v{SCHEMA_VERSION}:t:{canonical_key(title, year, is_tv)}"
+    
+    def test_put_writes_all_layers(self):
+        self.node_a.put('The Matrix', 1999, False, '黑客帝国')
+        
+        key = canonical_key('The Matrix', 1999, False)
+        self.assertEqual(self.node_a.lru.get(key)[0], '黑客帝国')
+        self.assertEqual(self.node_a.local.get('The Matrix', 1999, False), '黑客帝国')
+        raw, _ = self.redis.data[self.title_key('The Matrix', 1999)]
+        self.assertEqual(_loads(raw), '黑客帝国')
+        self.assertAlmostEqual(self.redis.ttl(self.title_key('The Matrix', 1999)), 3600, delta=5)
+    
+    def test_read_through_backfills_local_layers(self):
+        self.node_a.put('The Matrix', 1999, False, '黑客帝国')
+        
+        # 另一节点：LRU 和 SQLite 都未命中，从 Redis 读取并回填
+        self.assertIs(self.node_b.local.get('The.Matrix', 1999, False), MISS)
+        self.assertEqual(self.node_b.get('The.Matrix', 1999, False), '黑客帝国')
+        self.assertEqual(self.node_b.redis_hits, 1)
+        self.assertEqual(self.node_b.local.get('The Matrix', 1999, False), '黑客帝国')
+        
+        # 之后由进程内 LRU 命中，不再访问 SQLite 和 Redis
+        calls = self.redis.calls
+        local_hits = self.node_b.local.hits
+        self.assertEqual(self.node_b.get('the matrix', 1999, False), '黑客帝国')
+        self.assertEqual(self.redis.calls, calls)
+        self.assertEqual(self.node_b.local.hits, local_hits)
+    
+    def test_negative_results_are_shared_with_negative_ttl(self):
+        self.node_a.put('Unknown Film', None, False, None)
+        
+        self.assertAlmostEqual(self.redis.ttl(self.title_key('Unknown Film')), 60, delta=5)
+        self.assertIsNone(self.node_b.get('Unknown Film', None, False))
+        self.assertIs(self.node_b.get('Other Film', None, False), MISS)
+        self.assertEqual(self.node_b.redis_misses, 1)
+    
+    def test_media_and_aliases_are_shared(self):
+        details = {'overview': '剧情' * 400}
+        self.node_a.put_media('tmdb', 603, False, '黑客帝国', [('The Matrix', 1999), ('The Matrix', None)], details)
+        
+        # 较大的详情压缩存储
+        raw, _ = self.redis.data[f"test:v{SCHEMA_VERSION}:m:tmdb:0:603"]
+        self.assertEqual(raw[:1], b'z')
+        
+        # 标题查询经 Redis 别名 → 作品命中，作品和别名回填到本地 SQLite
+        self.assertEqual(self.node_b.get('The Matrix', None, False), '黑客帝国')
+        self.assertEqual(self.node_b.local.find_media('The Matrix', None, False)['media_id'], '603')
+        self.assertEqual(self.node_b.get_media('tmdb', 603, False)['details'], details)
+        self.assertEqual(self.node_b.find_media('The.Matrix', 1999, False)['title'], '黑客帝国')
+    
+    def test_redis_unavailable_falls_back_to_local(self):
+        self.redis.down = True
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.node_a.put('Heat', 1995, False, '盗火线')
+            self.assertEqual(self.node_a.get('Heat', 1995, False), '盗火线')
+            self.assertIs(self.node_a.get('Alien', 1979, False), MISS)
+            self.node_a.put('Alien', 1979, False, '异形')
+        
+        # 只警告一次，冷却期间不再访问 Redis
+        self.assertEqual(output.getvalue().count('Redis 共享缓存不可用'), 1)
+        self.assertEqual(self.node_a.redis_errors, 1)
+        self.assertEqual(self.redis.calls, 1)
+        self.assertFalse(self.node_a.redis_available)
+        self.assertEqual(self.node_a.local.get('Alien', 1979, False), '异形')
+        self.assertFalse(self.node_a.get_stats()['redis']['available'])
+        
+        # 冷却结束、Redis 恢复后重新写入共享层
+        self.redis.down = False
+        with mock.patch('core.shared_cache.time.time', return_value=time.time() + 3600):
+            self.assertTrue(self.node_a.redis_available)
+            self.node_a.put('Up', 2009, False, '飞屋环游记')
+        self.assertIn(self.title_key('Up', 2009), self.redis.data)
+    
+    def test_key_namespace_and_schema_version(self):
+        self.assertEqual(self.node_a.prefix, f"test:v{SCHEMA_VERSION}")
+        self.node_a.put('The Matrix', 1999, False, '黑客帝国')
+        self.node_a.put_media('tmdb', 603, False, '黑客帝国', [('The Matrix', 1999)])
+        prefix = f"test:v{SCHEMA_VERSION}:"
+        self.assertTrue(all(key.startswith(prefix) for key in self.redis.data))
+        
+        # 旧版本键和其他命名空间的键不会被读取
+        old_key = f"test:v{SCHEMA_VERSION - 1}:t:{canonical_key('Heat', 1995, False)}"
+        self.redis.set(old_key, _dumps('旧格式'))
+        self.redis.set(self.title_key('Heat', 1995, namespace='other'), _dumps('其他命名空间'))
+        self.assertIs(self.node_b.get('Heat', 1995, False), MISS)
+        
+        # clear 只删除本命名空间、本版本的键
+        self.node_a.clear()
+        self.assertEqual(sorted(self.redis.data), sorted([old_key, self.title_key('Heat', 1995, namespace='other')]))
+        self.assertIs(self.node_a.get('The Matrix', 1999, False), MISS)
+
+
+if __name__ == '__main__':
+    unittest.main()
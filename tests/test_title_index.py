@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地标题索引可信度测试
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from core.title_index import TitleIndex, build_index
+
+
+def write_lines(path: str, rows: list):
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class TitleIndexTrustTest(unittest.TestCase):
+    """TMDB 每日导出不含年份时，精确、唯一且没有年份冲突的结果可信"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        
+        # 每日 ID 导出：没有上映日期
+        export = os.path.join(self.tmp.name, 'movie_ids.json')
+        write_lines(export, [
+            {'id': 603, 'original_title': 'The Matrix', 'popularity': 80.0},
+            {'id': 1, 'original_title': 'Dune', 'popularity': 50.0},
+        ])
+        # 带年份的导出行（同名的另一部作品）
+        dated = os.path.join(self.tmp.name, 'movie_dated.json')
+        write_lines(dated, [
+            {'id': 2, 'original_title': 'Dune', 'popularity': 60.0, 'release_date': '2021-09-15'},
+        ])
+        titles = os.path.join(self.tmp.name, 'movie_titles.json')
+        write_lines(titles, [
+            {'id': 603, 'titles': [{'iso_3166_1': 'CN', 'title': '黑客帝国'}]},
+            {'id': 1, 'titles': [{'iso_3166_1': 'CN', 'title': '沙丘'}]},
+            {'id': 2, 'titles': [{'iso_3166_1': 'CN', 'title': '沙丘'}]},
+        ])
+        
+        path = os.path.join(self.tmp.name, 'index.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_index(path, movie_exports=[export, dated], movie_titles=[titles])
+        self.index = TitleIndex(path)
+        self.addCleanup(self.index.close)
+    
+    def test_exact_match_without_year_is_trusted(self):
+        self.assertEqual(self.index.match('The Matrix', 1999), ('黑客帝国', True))
+        self.assertEqual(self.index.lookup('The Matrix', 1999), '黑客帝国')
+        self.assertEqual(self.index.lookup('The Matrix'), '黑客帝国')
+    
+    def test_year_conflict_is_not_trusted(self):
+        # 2021 年的 Dune 被年份排除，剩下没有年份的那部不一定是要找的
+        self.assertEqual(self.index.match('Dune', 1984), ('沙丘', False))
+        self.assertIsNone(self.index.lookup('Dune', 1984))
+        self.assertEqual(self.index.lookup('Dune', 2021), '沙丘')
+
+
+if __name__ == '__main__':
+    unittest.main()